@@ -2,6 +2,8 @@
 ASGI config for Trello project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Serve it (e.g. ``uvicorn Trello.asgi:application``) to use the board event
+streams, which hold one connection open per listening client.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
@@ -12,5 +14,8 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'Trello.settings')
+# serve the read-heavy GETs with async views (see ASYNC_READ_VIEWS in
+# settings); must be set before the settings are loaded
+os.environ.setdefault('ASYNC_READ_VIEWS', '1')
 
 application = get_asgi_application()
@@ -0,0 +1,84 @@
+"""
+Async read path for DRF views.
+
+DRF views are synchronous, so under ASGI every request holds a worker
+thread while it waits on the database. :class:`AsyncReadMixin` serves
+GET requests from an ``async def aget()`` handler instead: the user is
+authenticated with ``aauthenticate()`` where the authenticator offers
+it, and the handler uses Django's async ORM. Other methods keep going
+through the regular synchronous DRF ``dispatch()``.
+
+Whether the views are async is decided once, from
+``settings.ASYNC_READ_VIEWS``, when the URLconf is loaded.
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils.functional import classproperty
+from rest_framework import exceptions
+
+
+async def aauthenticate(request) -> None:
+    """
+    Authenticate a DRF ``Request`` without blocking the event loop.
+
+    Mirrors ``Request._authenticate()``. Authenticators without an
+    ``aauthenticate()`` coroutine are run in a thread.
+    """
+    for authenticator in request.authenticators:
+        if hasattr(authenticator, "aauthenticate"):
+            pending = authenticator.aauthenticate(request)
+        else:
+            pending = sync_to_async(authenticator.authenticate)(request)
+        try:
+            user_auth_tuple = await pending
+        except exceptions.APIException:
+            request._not_authenticated()
+            raise
+        if user_auth_tuple is not None:
+            request._authenticator = authenticator
+            request.user, request.auth = user_auth_tuple
+            return
+    request._not_authenticated()
+
+
+class AsyncReadMixin:
+    """
+    Serve GET with the view's ``aget()`` coroutine when
+    ``settings.ASYNC_READ_VIEWS`` is on.
+
+    Put it first in the bases of a DRF view. Permission classes are
+    still checked synchronously, so they must not query the database.
+    """
+
+    @classproperty
+    def view_is_async(cls) -> bool:
+        return settings.ASYNC_READ_VIEWS
+
+    def dispatch(self, request, *args, **kwargs):
+        if not self.view_is_async:
+            return super().dispatch(request, *args, **kwargs)
+        return self.adispatch(request, *args, **kwargs)
+
+    async def adispatch(self, request, *args, **kwargs):
+        if request.method != "GET":
+            return await sync_to_async(super().dispatch)(request, *args, **kwargs)
+
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await aauthenticate(request)
+            # the user is resolved already, so this does no I/O
+            self.initial(request, *args, **kwargs)
+            response = await self.aget(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def aget(self, request, *args, **kwargs):
+        raise NotImplementedError("Async read views must implement aget().")
@@ -0,0 +1,104 @@
+"""
+Serializer-free rendering for read-only list endpoints.
+
+Serializing a page of model instances through nested DRF serializers
+costs more CPU than the queries behind it. With
+``settings.FAST_READ_PATH`` on, views using :class:`FastListMixin`
+build their JSON-ready rows straight from ``values()`` dicts and encode
+them with orjson when it is installed. The bytes are the same as the
+ones the DRF serializer and ``JSONRenderer`` would produce.
+"""
+from django.conf import settings
+from django.http import HttpResponse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+
+from .instrumentation import span
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+
+def orjson_matches_drf() -> bool:
+    """
+    Return whether orjson encodes like ``JSONRenderer`` with the current
+    REST_FRAMEWORK settings: compact, unescaped unicode, no NaN.
+    """
+    return (
+        orjson is not None
+        and api_settings.COMPACT_JSON
+        and api_settings.UNICODE_JSON
+        and api_settings.STRICT_JSON
+    )
+
+
+def renders_plain_json(request) -> bool:
+    """Return whether content negotiation picked DRF's own ``JSONRenderer``."""
+    return type(getattr(request, "accepted_renderer", None)) is JSONRenderer
+
+
+def floats_match_repr(values) -> bool:
+    """
+    Return whether orjson writes these floats like ``repr()`` does.
+    Outside [1e-4, 1e16) it uses another exponent notation (1e-9 vs 1e-09).
+    """
+    return all(value == 0 or 1e-4 <= abs(value) < 1e16 for value in values)
+
+
+def render_json(data, exact_floats: bool = True) -> bytes:
+    """
+    Encode ``data`` exactly like DRF's ``JSONRenderer``, with orjson when
+    it can. Pass ``exact_floats=False`` when :func:`floats_match_repr`
+    failed for the floats in ``data``.
+    """
+    with span("render"):
+        if not exact_floats or not orjson_matches_drf():
+            return JSONRenderer().render(data)
+        # JSONRenderer escapes these two for embedding in JavaScript
+        return orjson.dumps(data).replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+
+
+class FastListMixin:
+    """
+    Serve the GET list of a generic view from ``values()`` rows when
+    ``settings.FAST_READ_PATH`` is on and the client negotiated JSON.
+
+    Views implement ``fast_values(queryset)``, returning the values
+    queryset to paginate, and ``fast_rows(rows)``, turning a page of it
+    into the rows the serializer would have produced, as a list plus
+    whether :func:`render_json` may use orjson for their floats.
+    Async views load the page through ``afast_rows(rows)``.
+    """
+
+    def use_fast_path(self, request) -> bool:
+        return settings.FAST_READ_PATH and renders_plain_json(request)
+
+    def list(self, request, *args, **kwargs):
+        if not self.use_fast_path(request):
+            return super().list(request, *args, **kwargs)
+        queryset = self.fast_values(self.filter_queryset(self.get_queryset()))
+        rows, exact_floats = self.fast_rows(self.paginate_queryset(queryset))
+        return self.fast_response(rows, exact_floats)
+
+    async def afast_list(self, queryset):
+        """Async version of the fast :meth:`list` for an already filtered queryset."""
+        page = await self.paginator.apaginate_queryset(self.fast_values(queryset), self.request, view=self)
+        rows, exact_floats = await self.afast_rows(page)
+        return self.fast_response(rows, exact_floats)
+
+    def fast_response(self, rows: list, exact_floats: bool) -> HttpResponse:
+        data = self.get_paginated_response(rows).data
+        return HttpResponse(
+            render_json(data, exact_floats), content_type=self.request.accepted_renderer.media_type
+        )
+
+    def fast_values(self, queryset):
+        raise NotImplementedError("Fast list views must implement fast_values().")
+
+    def fast_rows(self, rows: list) -> tuple[list, bool]:
+        raise NotImplementedError("Fast list views must implement fast_rows().")
+
+    async def afast_rows(self, rows: list) -> tuple[list, bool]:
+        raise NotImplementedError("Async fast list views must implement afast_rows().")
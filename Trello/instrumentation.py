@@ -0,0 +1,300 @@
+"""
+Per-request SQL and timing instrumentation.
+
+:class:`RequestMetricsMiddleware` collects, for each request, the number
+of queries, the total SQL time, the slowest statements and the time
+spent in named spans (``auth``, ``membership``, ``serialize``,
+``render``). Code opts into spans with :func:`span`; the metrics of the
+running request live in a context variable, so they follow the request
+into ``sync_to_async`` threads and async views.
+
+Counting is cheap and always on. A sample of requests
+(``REQUEST_METRICS_SAMPLE_RATE``) also gets a ``Server-Timing`` header
+and a log line on the ``trello_app`` logger; requests slower than
+``REQUEST_METRICS_SLOW_REQUEST_MS`` are logged whether sampled or not.
+SQL text is only kept for sampled requests and for statements slower
+than ``REQUEST_METRICS_SLOW_QUERY_MS``.
+
+Every request is also counted in the Prometheus metrics of
+:mod:`Trello.metrics`.
+
+Views declare how many queries a request may run with a
+``query_budget`` class attribute, or the :func:`query_budget` decorator
+for view functions. A request over budget raises
+:class:`QueryBudgetExceeded` when ``QUERY_BUDGET_RAISE`` is on (debug
+and tests) and is logged as an error otherwise.
+"""
+import heapq
+import logging
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional, Union
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from rest_framework import serializers
+
+from . import metrics as prometheus
+
+logger = logging.getLogger("trello_app")
+
+_current: ContextVar[Optional["RequestMetrics"]] = ContextVar("request_metrics", default=None)
+
+Budget = Union[int, dict[str, int]]
+
+
+class QueryBudgetExceeded(Exception):
+    """A request ran more queries than its view's budget."""
+
+
+def query_budget(budget: Budget):
+    """
+    Declare the query budget of a view class or function: a number, or
+    a dict of numbers per HTTP method.
+    """
+    def decorator(view):
+        view.query_budget = budget
+        return view
+    return decorator
+
+
+def view_query_budget(view_func, method: str) -> Optional[int]:
+    """Return the budget of a resolved view for ``method``, if it has one."""
+    budget = getattr(view_func, "query_budget", None)
+    if budget is None:
+        budget = getattr(getattr(view_func, "view_class", None), "query_budget", None)
+    if isinstance(budget, dict):
+        return budget.get(method)
+    return budget
+
+
+class RequestMetrics:
+    """Timings and queries of one request."""
+
+    def __init__(self, sampled: bool, keep_sql: bool = False):
+        self.sampled = sampled
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.sql_time = 0.0
+        self.slowest: list[tuple[float, int, str]] = []  # min-heap of the slowest statements
+        self.statements: Optional[list[str]] = [] if keep_sql else None
+        self.spans: dict[str, float] = {}
+        self.budget: Optional[int] = None
+        self._open: dict[str, int] = {}
+
+    def record_query(self, sql: str, duration: float) -> None:
+        self.queries += 1
+        self.sql_time += duration
+        if self.statements is not None:
+            self.statements.append(sql)
+        if not self.sampled and duration * 1000 < settings.REQUEST_METRICS_SLOW_QUERY_MS:
+            return
+        entry = (duration, self.queries, sql)
+        if len(self.slowest) < settings.REQUEST_METRICS_TOP_QUERIES:
+            heapq.heappush(self.slowest, entry)
+        elif duration > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, entry)
+
+    def add_span(self, name: str, duration: float) -> None:
+        self.spans[name] = self.spans.get(name, 0.0) + duration
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def server_timing(self, total: float) -> str:
+        """Return the ``Server-Timing`` header value."""
+        entries = [f'db;dur={self.sql_time * 1000:.1f};desc="{self.queries} queries"']
+        entries += [f"{name};dur={duration * 1000:.1f}" for name, duration in self.spans.items()]
+        entries.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(entries)
+
+    def as_dict(self, total: float) -> dict:
+        return {
+            "duration_ms": round(total * 1000, 1),
+            "queries": self.queries,
+            "sql_ms": round(self.sql_time * 1000, 1),
+            **{f"{name}_ms": round(duration * 1000, 1) for name, duration in self.spans.items()},
+            "slow_queries": [
+                {"ms": round(duration * 1000, 1), "sql": sql}
+                for duration, _, sql in sorted(self.slowest, reverse=True)
+            ],
+        }
+
+
+def current_metrics() -> Optional[RequestMetrics]:
+    """Return the metrics of the request being handled, if any."""
+    return _current.get()
+
+
+@contextmanager
+def span(name: str):
+    """
+    Add the time spent in the block to the ``name`` span of the current
+    request. Nested spans of the same name are counted once.
+    """
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    depth = metrics._open.get(name, 0)
+    metrics._open[name] = depth + 1
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics._open[name] = depth
+        if not depth:
+            metrics.add_span(name, time.perf_counter() - started)
+
+
+def record_sql(execute, sql, params, many, context):
+    """Database execute wrapper timing every statement of an instrumented request."""
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.record_query(sql, time.perf_counter() - started)
+
+
+def install_sql_recorder(sender=None, connection=None, **kwargs) -> None:
+    """Signal receiver adding :func:`record_sql` to a new database connection."""
+    if record_sql not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_sql)
+
+
+class TimedListSerializer(serializers.ListSerializer):
+    """List serializer counting the time spent building ``.data`` as ``serialize``."""
+
+    @property
+    def data(self):
+        with span("serialize"):
+            return super().data
+
+
+class TimedSerializerMixin:
+    """
+    Count the time spent building ``.data`` as ``serialize``. Pair it
+    with ``list_serializer_class = TimedListSerializer`` in ``Meta`` so
+    that ``many=True`` is timed too.
+    """
+
+    @property
+    def data(self):
+        with span("serialize"):
+            return super().data
+
+
+class RequestMetricsMiddleware:
+    """
+    Collect :class:`RequestMetrics` for every request; add the
+    ``Server-Timing`` header and log the sampled and the slow ones.
+    Works in both sync and async middleware chains.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        connection_created.connect(install_sql_recorder, dispatch_uid="trello_request_metrics")
+        connection_created.connect(prometheus.connection_opened, dispatch_uid="trello_prometheus")
+        for connection in connections.all(initialized_only=True):
+            install_sql_recorder(connection=connection)
+            prometheus.connection_opened(connection=connection)
+        prometheus.REGISTRY.start()
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        metrics = RequestMetrics(sampled=self.sample(), keep_sql=settings.QUERY_BUDGET_RAISE)
+        token = _current.set(metrics)
+        prometheus.IN_FLIGHT.inc()
+        try:
+            response = self.get_response(request)
+        finally:
+            prometheus.IN_FLIGHT.dec()
+            _current.reset(token)
+        return self.finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics(sampled=self.sample(), keep_sql=settings.QUERY_BUDGET_RAISE)
+        token = _current.set(metrics)
+        prometheus.IN_FLIGHT.inc()
+        try:
+            response = await self.get_response(request)
+        finally:
+            prometheus.IN_FLIGHT.dec()
+            _current.reset(token)
+        return self.finish(request, response, metrics)
+
+    @staticmethod
+    def sample() -> bool:
+        rate = settings.REQUEST_METRICS_SAMPLE_RATE
+        return rate >= 1 or (rate > 0 and random.random() < rate)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        metrics = _current.get()
+        if metrics is not None:
+            metrics.budget = view_query_budget(view_func, request.method)
+
+    def process_template_response(self, request, response):
+        """Time the rendering of DRF responses, which happens right after this hook."""
+        metrics = _current.get()
+        if metrics is not None:
+            started = time.perf_counter()
+
+            def rendered(response):
+                metrics.add_span("render", time.perf_counter() - started)
+
+            response.add_post_render_callback(rendered)
+        return response
+
+    def finish(self, request, response, metrics: RequestMetrics):
+        total = metrics.elapsed()
+        prometheus.observe_request(request, response, metrics, total)
+        if metrics.budget is not None and metrics.queries > metrics.budget:
+            self.over_budget(request, metrics)
+        if response.streaming:
+            return response
+        slow = total * 1000 >= settings.REQUEST_METRICS_SLOW_REQUEST_MS
+        if metrics.sampled and settings.REQUEST_METRICS_SERVER_TIMING:
+            response["Server-Timing"] = metrics.server_timing(total)
+        if metrics.sampled or slow:
+            self.log(request, response, metrics, total, slow)
+        return response
+
+    @staticmethod
+    def over_budget(request, metrics: RequestMetrics) -> None:
+        resolver_match = getattr(request, "resolver_match", None)
+        view = resolver_match.url_name if resolver_match else request.path
+        message = f"{request.method} {view} ran {metrics.queries} queries, over its budget of {metrics.budget}"
+        if settings.QUERY_BUDGET_RAISE:
+            statements = "\n".join(f"{index}. {sql}" for index, sql in enumerate(metrics.statements or [], 1))
+            raise QueryBudgetExceeded(f"{message}:\n{statements}")
+        logger.error(message, extra={"request_metrics": {"view": view, "queries": metrics.queries, "budget": metrics.budget}})
+
+    @staticmethod
+    def log(request, response, metrics: RequestMetrics, total: float, slow: bool) -> None:
+        resolver_match = getattr(request, "resolver_match", None)
+        data = {
+            "method": request.method,
+            "path": request.path,
+            "view": resolver_match.url_name if resolver_match else None,
+            "status": response.status_code,
+            **metrics.as_dict(total),
+        }
+        fields = " ".join(f"{key}={value}" for key, value in data.items() if key != "slow_queries")
+        logger.log(
+            logging.WARNING if slow else logging.INFO,
+            "request %s slow_queries=%d", fields, len(data["slow_queries"]),
+            extra={"request_metrics": data},
+        )
@@ -0,0 +1,283 @@
+"""
+Non-blocking logging with rotation, JSON output and request ids.
+
+With ``LOG_PIPELINE = "queue"`` the ``django`` and ``trello_app``
+loggers only have a :class:`QueueLogHandler`: the request thread formats
+the message and puts the record on a bounded in-memory queue, and a
+listener thread hands it to the handlers of the ``log_sink`` logger
+(the console and a :class:`SizedTimedRotatingFileHandler`). A slow disk
+then delays the listener, never a response. When the queue is full
+records are dropped and counted rather than blocking; the count is
+logged once there is room again.
+
+:class:`RequestIDMiddleware` gives every request a correlation id (the
+client's ``X-Request-ID`` when it is sane, a new one otherwise), echoes
+it in the response and, through :class:`RequestIDFilter`, stamps it on
+every record logged while handling the request.
+"""
+import functools
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import re
+import threading
+import time
+import uuid
+import weakref
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Optional
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+_request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+REQUEST_ID_HEADER = "X-Request-ID"
+VALID_REQUEST_ID = re.compile(r"[A-Za-z0-9._:-]{1,64}")
+
+# attributes every LogRecord has; anything else was passed as ``extra``
+_RECORD_ATTRS = frozenset(vars(logging.makeLogRecord({}))) | {"message", "asctime", "request_id"}
+
+
+def current_request_id() -> Optional[str]:
+    """Return the correlation id of the request being handled, if any."""
+    return _request_id.get()
+
+
+class RequestIDMiddleware:
+    """
+    Bind a correlation id to each request for the log records it
+    produces, and return it in the ``X-Request-ID`` response header.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        request.request_id = self.request_id(request)
+        token = _request_id.set(request.request_id)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_id.reset(token)
+        response[REQUEST_ID_HEADER] = request.request_id
+        return response
+
+    async def __acall__(self, request):
+        request.request_id = self.request_id(request)
+        token = _request_id.set(request.request_id)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request_id.reset(token)
+        response[REQUEST_ID_HEADER] = request.request_id
+        return response
+
+    @staticmethod
+    def request_id(request) -> str:
+        """Reuse the id set by a proxy or client, or make a new one."""
+        incoming = request.headers.get(REQUEST_ID_HEADER, "")
+        return incoming if VALID_REQUEST_ID.fullmatch(incoming) else uuid.uuid4().hex
+
+
+class RequestIDFilter(logging.Filter):
+    """Stamp records with the current request id (``-`` outside requests)."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, "request_id"):
+            # django.request logs 4xx/5xx responses after the middleware
+            # has returned, but passes the request along
+            request = getattr(record, "request", None)
+            record.request_id = _request_id.get() or getattr(request, "request_id", None) or "-"
+        return True
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line, with the ``extra`` fields of the record."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", "-"),
+            "module": record.module,
+            "process": record.process,
+        }
+        entry.update((key, value) for key, value in vars(record).items() if key not in _RECORD_ATTRS)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc_info"] = record.exc_text
+        if record.stack_info:
+            entry["stack_info"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+def _reopen_after_fork(ref: "weakref.ref[SizedTimedRotatingFileHandler]") -> None:
+    handler = ref()
+    if handler is not None:
+        handler.reopen()
+
+
+class SizedTimedRotatingFileHandler(logging.handlers.TimedRotatingFileHandler):
+    """
+    Rotate at ``when`` / ``interval`` like ``TimedRotatingFileHandler``
+    and also whenever the file would grow past ``max_bytes``. Files
+    rotated within the same period get ``.1``, ``.2``, ... suffixes.
+
+    Rotation renames the file, which is only safe with a single writer.
+    A ``{pid}`` in ``filename`` is replaced by the process id, also in
+    forked children, so that every gunicorn worker writes and rotates a
+    file of its own.
+    """
+
+    def __init__(self, filename, max_bytes: int = 0, **kwargs):
+        kwargs.setdefault("encoding", "utf-8")
+        self.filename_template = os.fspath(filename)
+        super().__init__(self._process_filename(), **kwargs)
+        self.max_bytes = max_bytes
+        if "{pid}" in self.filename_template and hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=functools.partial(_reopen_after_fork, weakref.ref(self)))
+
+    def _process_filename(self) -> str:
+        return self.filename_template.replace("{pid}", str(os.getpid()))
+
+    def reopen(self) -> None:
+        """Switch a forked child to its own file instead of the parent's."""
+        if self.stream is not None:
+            self.stream.close()
+            self.stream = None
+        self.baseFilename = os.path.abspath(self._process_filename())
+        self.rolloverAt = self.computeRollover(int(time.time()))
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if super().shouldRollover(record):
+            return True
+        if not self.max_bytes or (os.path.exists(self.baseFilename) and not os.path.isfile(self.baseFilename)):
+            return False
+        if self.stream is None:
+            self.stream = self._open()
+        return self.stream.tell() + len(self.format(record)) + 1 >= self.max_bytes
+
+    def rotation_filename(self, default_name: str) -> str:
+        name = super().rotation_filename(default_name)
+        candidate, index = name, 0
+        while os.path.exists(candidate):
+            index += 1
+            candidate = f"{name}.{index}"
+        return candidate
+
+
+class _SinkHandler(logging.Handler):
+    """Listener-side handler passing records to the handlers of the sink logger."""
+
+    def __init__(self, sink: str):
+        super().__init__()
+        self.sink = logging.getLogger(sink)
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        # handler levels and filters still apply; the logger levels were
+        # checked on the request thread
+        self.sink.handle(record)
+        return True
+
+
+class _Listener(logging.handlers.QueueListener):
+    def enqueue_sentinel(self) -> None:
+        # wait for room instead of failing when the queue is full
+        self.queue.put(self._sentinel)
+
+
+def _restart_after_fork(ref: "weakref.ref[QueueLogHandler]") -> None:
+    handler = ref()
+    if handler is not None and handler.listener is not None:
+        handler.restart()
+
+
+class QueueLogHandler(logging.handlers.QueueHandler):
+    """
+    Enqueue records on a bounded queue without ever blocking; a listener
+    thread passes them to the handlers of the ``sink`` logger.
+
+    ``dropped`` counts the records lost to a full queue. The listener is
+    restarted in forked children (gunicorn workers) and stopped, after
+    draining the queue, when logging shuts down.
+    """
+
+    def __init__(self, sink: str = "log_sink", queue_size: int = 10_000):
+        super().__init__(queue.Queue(queue_size))
+        self.sink = sink
+        self.dropped = 0
+        self._unreported = 0
+        self._drop_lock = threading.Lock()
+        self.listener = None
+        self.start()
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=functools.partial(_restart_after_fork, weakref.ref(self)))
+
+    def start(self) -> None:
+        self.listener = _Listener(self.queue, _SinkHandler(self.sink))
+        self.listener.start()
+
+    def restart(self) -> None:
+        """Start a new listener in a forked child; the parent's thread did not survive the fork."""
+        self.queue = queue.Queue(self.queue.maxsize)
+        self._drop_lock = threading.Lock()
+        self.start()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Format the message and traceback on the calling thread, since
+        the arguments may change or stop being valid once it moves on.
+        """
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.message = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = record.exc_text or logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._drop_lock:
+                self.dropped += 1
+                self._unreported += 1
+            return
+        if self._unreported:
+            self.report_drops()
+
+    def report_drops(self) -> None:
+        with self._drop_lock:
+            count, self._unreported = self._unreported, 0
+        if not count:
+            return
+        record = logging.makeLogRecord({
+            "name": "trello_app", "levelno": logging.WARNING, "levelname": "WARNING",
+            "msg": f"Log queue full: dropped {count} record(s) ({self.dropped} in total)",
+            "request_id": "-", "log_records_dropped": count,
+        })
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._drop_lock:
+                self._unreported += count
+
+    def close(self) -> None:
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+        super().close()
@@ -0,0 +1,384 @@
+"""
+Prometheus metrics, served as text at ``/metrics``.
+
+Counters, gauges and histograms are kept in per-thread shards, so
+recording a sample takes no lock: each thread only ever writes its own
+dict, and a scrape sums the shards. :class:`RequestMetricsMiddleware
+<Trello.instrumentation.RequestMetricsMiddleware>` records the request
+count, latency, queries and in-flight requests of every request under
+its URL name; the database connections, board response cache and
+dropped log records are read when scraped.
+
+With several worker processes (gunicorn) set ``METRICS_MULTIPROC_DIR``:
+every process then writes its samples to a file there every
+``METRICS_FLUSH_INTERVAL`` seconds and at exit, and a scrape, whichever
+worker answers it, adds up the files. Counters of workers that exited
+are kept; their gauges are dropped once gunicorn's ``child_exit`` hook
+calls :func:`mark_process_dead` (see ``gunicorn.conf.py``).
+"""
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+import weakref
+from bisect import bisect_left
+from typing import Callable, Iterable, Optional
+
+from django.conf import settings
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+ARCHIVE_FILE = "archive.json"
+
+Samples = dict[tuple[str, tuple[str, ...]], object]
+
+
+class Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.registry = registry or REGISTRY
+        self.registry.register(self)
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        shard = self.registry.shard()
+        key = (self.name, labels)
+        shard[key] = shard.get(key, 0) + amount
+
+
+class Gauge(Counter):
+    """A gauge that is moved up and down; summed across threads and live processes."""
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: tuple[float, ...] = LATENCY_BUCKETS, registry=None):
+        super().__init__(name, documentation, labelnames, registry)
+        self.buckets = buckets
+
+    def observe(self, value: float, *labels: str) -> None:
+        shard = self.registry.shard()
+        key = (self.name, labels)
+        counts = shard.get(key)
+        if counts is None:
+            # one count per bucket, one for +Inf, then the sum
+            counts = shard[key] = [0] * (len(self.buckets) + 2)
+        counts[bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+
+class Registry:
+    """
+    The metrics of this process and their per-thread sample shards.
+
+    ``collectors`` return samples read at scrape time; ``derivers`` add
+    samples computed from the totals of every process, like ratios.
+    """
+
+    def __init__(self):
+        self.metrics: dict[str, Metric] = {}
+        self.collectors: list[Callable[[], Samples]] = []
+        self.derivers: list[Callable[[Samples], Samples]] = []
+        # (thread, shard) of the threads that have recorded samples; the
+        # shards of finished threads are folded into _retired
+        self._shards: list[tuple[threading.Thread, dict]] = []
+        self._retired: Samples = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._flusher: Optional[threading.Thread] = None
+
+    def register(self, metric: Metric) -> None:
+        self.metrics[metric.name] = metric
+
+    def shard(self) -> dict:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._retire_finished()
+                self._shards.append((threading.current_thread(), shard))
+            return shard
+
+    def _retire_finished(self) -> None:
+        """
+        Fold the shards of finished threads into one dict, so that a
+        server starting a thread per request does not keep one shard per
+        request forever. Called with the lock held.
+        """
+        live = []
+        for thread, shard in self._shards:
+            if thread.is_alive():
+                live.append((thread, shard))
+            else:
+                _merge(self._retired, shard)
+        self._shards = live
+
+    def reset(self) -> None:
+        """Forget every sample, e.g. in a forked child or between tests."""
+        with self._lock:
+            self._shards = []
+            self._retired = {}
+            self._local = threading.local()
+
+    def local_samples(self) -> Samples:
+        """Return the samples of this process: its shards and collectors."""
+        with self._lock:
+            self._retire_finished()
+            shards = [shard for _, shard in self._shards]
+            samples: Samples = {}
+            _merge(samples, self._retired)
+        for shard in shards:
+            # copy() is atomic, the owning thread may be writing meanwhile
+            _merge(samples, shard.copy())
+        for collector in self.collectors:
+            _merge(samples, collector())
+        return samples
+
+    def collect(self) -> Samples:
+        """Return the samples of every process sharing the multiprocess directory, or of this one."""
+        directory = settings.METRICS_MULTIPROC_DIR
+        if not directory:
+            samples = self.local_samples()
+        else:
+            self.flush()
+            samples = {}
+            for name in sorted(os.listdir(directory)):
+                if name.endswith(".json"):
+                    _merge(samples, read_samples(os.path.join(directory, name)))
+        for derive in self.derivers:
+            samples.update(derive(samples))
+        return samples
+
+    def render(self) -> str:
+        """Return the samples in the Prometheus text exposition format."""
+        samples = self.collect()
+        by_metric: dict[str, list] = {}
+        for (name, labels), value in samples.items():
+            by_metric.setdefault(name, []).append((labels, value))
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for labels, value in sorted(by_metric.get(metric.name, ())):
+                pairs = list(zip(metric.labelnames, labels))
+                if metric.kind != "histogram":
+                    lines.append(f"{metric.name}{_labels(pairs)} {_number(value)}")
+                    continue
+                cumulative = 0
+                for bound, count in zip((*metric.buckets, float("inf")), value[:-1]):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else _number(bound)
+                    lines.append(f"{metric.name}_bucket{_labels(pairs + [('le', le)])} {_number(cumulative)}")
+                lines.append(f"{metric.name}_sum{_labels(pairs)} {_number(value[-1])}")
+                lines.append(f"{metric.name}_count{_labels(pairs)} {_number(cumulative)}")
+        return "\n".join(lines) + "\n"
+
+    # multiprocess mode
+
+    def start(self) -> None:
+        """Start writing this process's samples to ``METRICS_MULTIPROC_DIR``, if set."""
+        if not settings.METRICS_MULTIPROC_DIR or self._flusher is not None:
+            return
+        os.makedirs(settings.METRICS_MULTIPROC_DIR, exist_ok=True)
+        self._flusher = threading.Thread(target=self._flush_forever, name="metrics-flush", daemon=True)
+        self._flusher.start()
+
+    def _flush_forever(self) -> None:
+        while True:
+            time.sleep(settings.METRICS_FLUSH_INTERVAL)
+            try:
+                self.flush()
+            except OSError:
+                logging.getLogger("trello_app").exception("Writing metrics failed")
+
+    def flush(self) -> None:
+        directory = settings.METRICS_MULTIPROC_DIR
+        if directory:
+            write_samples(os.path.join(directory, f"metrics_{os.getpid()}.json"), self.local_samples())
+
+    def after_fork(self) -> None:
+        # the shards belong to the parent and the flusher thread did not survive
+        self._lock = threading.Lock()
+        self.reset()
+        if self._flusher is not None:
+            self._flusher = None
+            self.start()
+
+
+def _merge(into: Samples, samples: Samples) -> None:
+    for key, value in samples.items():
+        current = into.get(key)
+        if current is None:
+            into[key] = list(value) if isinstance(value, list) else value
+        elif isinstance(value, list):
+            into[key] = [a + b for a, b in zip(current, value)]
+        else:
+            into[key] = current + value
+
+
+def _labels(pairs: list[tuple[str, str]]) -> str:
+    if not pairs:
+        return ""
+    escaped = (
+        name + '="' + value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') + '"'
+        for name, value in pairs
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+def _number(value: float) -> str:
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def write_samples(path: str, samples: Samples) -> None:
+    """Atomically replace ``path`` with ``samples`` as JSON."""
+    rows = [[name, list(labels), value] for (name, labels), value in samples.items()]
+    temporary = f"{path}.{threading.get_ident()}.tmp"
+    with open(temporary, "w") as file:
+        json.dump(rows, file)
+    os.replace(temporary, path)
+
+
+def read_samples(path: str) -> Samples:
+    try:
+        with open(path) as file:
+            rows = json.load(file)
+    except (OSError, ValueError):
+        return {}
+    return {(name, tuple(labels)): value for name, labels, value in rows}
+
+
+def mark_process_dead(pid: int, directory: Optional[str] = None) -> None:
+    """
+    Fold the samples of an exited worker into the archive file, keeping
+    its counters and histograms and dropping its gauges. Meant for
+    gunicorn's ``child_exit`` hook, which runs in the master process.
+    """
+    directory = directory or settings.METRICS_MULTIPROC_DIR
+    path = os.path.join(directory, f"metrics_{pid}.json")
+    samples = read_samples(path)
+    kept = {
+        (name, labels): value for (name, labels), value in samples.items()
+        if name in REGISTRY.metrics and REGISTRY.metrics[name].kind != "gauge"
+    }
+    archive = os.path.join(directory, ARCHIVE_FILE)
+    totals = read_samples(archive)
+    _merge(totals, kept)
+    write_samples(archive, totals)
+    if os.path.exists(path):
+        os.remove(path)
+
+
+REGISTRY = Registry()
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=REGISTRY.after_fork)
+
+
+@atexit.register
+def _flush_at_exit() -> None:
+    if REGISTRY._flusher is not None:
+        REGISTRY.flush()
+
+
+REQUESTS = Counter(
+    "trello_http_requests_total", "HTTP requests by URL name, method and status.", ("view", "method", "status")
+)
+REQUEST_LATENCY = Histogram(
+    "trello_http_request_duration_seconds", "Time to build the response, by URL name.", ("view",)
+)
+IN_FLIGHT = Gauge("trello_http_requests_in_flight", "Requests being handled.")
+DB_QUERIES = Counter("trello_db_queries_total", "SQL statements run by requests, by URL name.", ("view",))
+DB_QUERY_SECONDS = Counter("trello_db_query_seconds_total", "Time spent in SQL by requests, by URL name.", ("view",))
+DB_CONNECTIONS_OPENED = Counter(
+    "trello_db_connections_opened_total", "Database connections opened, by alias.", ("alias",)
+)
+DB_CONNECTIONS_OPEN = Gauge("trello_db_connections_open", "Database connections currently open, by alias.", ("alias",))
+CACHE_REQUESTS = Counter(
+    "trello_board_cache_requests_total", "Board response cache lookups by URL name and result.", ("view", "result")
+)
+CACHE_HIT_RATIO = Gauge("trello_board_cache_hit_ratio", "Board response cache hit ratio by URL name.", ("view",))
+LOG_RECORDS_DROPPED = Counter("trello_log_records_dropped_total", "Log records dropped because the log queue was full.")
+
+
+def observe_request(request, response, metrics, duration: float) -> None:
+    """Record a finished request; called by RequestMetricsMiddleware."""
+    resolver_match = getattr(request, "resolver_match", None)
+    view = (resolver_match.url_name if resolver_match else None) or "unmatched"
+    REQUESTS.inc(view, request.method, str(response.status_code))
+    REQUEST_LATENCY.observe(duration, view)
+    DB_QUERIES.inc(view, amount=metrics.queries)
+    DB_QUERY_SECONDS.inc(view, amount=metrics.sql_time)
+
+
+_connections: dict[str, "weakref.WeakSet"] = {}
+
+
+def connection_opened(sender=None, connection=None, **kwargs) -> None:
+    """Signal receiver counting database connections and keeping track of them."""
+    DB_CONNECTIONS_OPENED.inc(connection.alias)
+    _connections.setdefault(connection.alias, weakref.WeakSet()).add(connection)
+
+
+def _collect_connections() -> Samples:
+    # every thread has its own connection objects; count the open ones
+    return {
+        (DB_CONNECTIONS_OPEN.name, (alias,)): sum(1 for wrapper in list(wrappers) if wrapper.connection is not None)
+        for alias, wrappers in list(_connections.items())
+    }
+
+
+def _collect_cache() -> Samples:
+    from boards.cache import stats
+
+    samples = {}
+    for view, counts in stats.snapshot()["endpoints"].items():
+        samples[(CACHE_REQUESTS.name, (view, "hit"))] = counts["hits"]
+        samples[(CACHE_REQUESTS.name, (view, "miss"))] = counts["misses"]
+    return samples
+
+
+def _collect_log_drops() -> Samples:
+    from .log_pipeline import QueueLogHandler
+
+    handlers = {
+        id(handler): handler
+        for name in ("django", "trello_app")
+        for handler in logging.getLogger(name).handlers
+        if isinstance(handler, QueueLogHandler)
+    }
+    return {(LOG_RECORDS_DROPPED.name, ()): sum(handler.dropped for handler in handlers.values())}
+
+
+def _derive_cache_hit_ratio(samples: Samples) -> Samples:
+    lookups: dict[str, dict[str, float]] = {}
+    for (name, labels), value in samples.items():
+        if name == CACHE_REQUESTS.name:
+            view, result = labels
+            lookups.setdefault(view, {})[result] = value
+    return {
+        (CACHE_HIT_RATIO.name, (view,)): counts.get("hit", 0) / sum(counts.values())
+        for view, counts in lookups.items()
+        if sum(counts.values())
+    }
+
+
+REGISTRY.collectors += [_collect_connections, _collect_cache, _collect_log_drops]
+REGISTRY.derivers.append(_derive_cache_hit_ratio)
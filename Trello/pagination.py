@@ -0,0 +1,183 @@
+import base64
+import json
+from typing import Optional
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination over a unique, indexed ordering.
+
+    Unlike OFFSET pagination, every page is fetched with a
+    ``WHERE (created_at, id) > (...)`` condition, so deep pages cost
+    the same as the first one. Cursors are opaque base64 tokens holding
+    the boundary row's ordering values and the paging direction.
+    """
+    ordering: tuple[str, ...] = ("created_at", "id")
+    page_size: int = api_settings.PAGE_SIZE or 50
+    page_size_query_param: str = "page_size"
+    max_page_size: int = 500
+    cursor_query_param: str = "cursor"
+    invalid_cursor_message: str = "Invalid cursor."
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self._prepare(queryset, request, view)
+        return self._set_page(list(queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Async version of :meth:`paginate_queryset` for async views."""
+        queryset = self._prepare(queryset, request, view)
+        return self._set_page([row async for row in queryset])
+
+    def _prepare(self, queryset, request, view):
+        """Return the queryset of the requested page plus one lookahead row."""
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        ordering = self.get_ordering(view)
+
+        self.position, self.reverse = self.decode_cursor(request)
+        if self.reverse:
+            ordering = tuple(self._invert(field) for field in ordering)
+
+        if self.position is not None:
+            try:
+                queryset = queryset.filter(self._after(ordering, self.position))
+            except (TypeError, ValueError, ValidationError):
+                raise NotFound(self.invalid_cursor_message)
+        self.ordering_fields = ordering
+        return queryset.order_by(*ordering)[: self.page_size + 1]
+
+    def _set_page(self, rows: list) -> list:
+        position, reverse = self.position, self.reverse
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        if reverse:
+            rows.reverse()
+            self.ordering_fields = tuple(self._invert(field) for field in self.ordering_fields)
+
+        self.page = rows
+        self.has_next = has_more if not reverse else position is not None
+        self.has_previous = position is not None if not reverse else has_more
+        return rows
+
+    def get_ordering(self, view) -> tuple[str, ...]:
+        return tuple(getattr(view, "keyset_ordering", None) or self.ordering)
+
+    def get_page_size(self, request) -> int:
+        value = request.query_params.get(self.page_size_query_param)
+        if value is None:
+            return self.page_size
+        try:
+            page_size = int(value)
+        except ValueError:
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_paginated_response(self, data):
+        return Response({
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_next_link(self) -> Optional[str]:
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self) -> Optional[str]:
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def encode_cursor(self, row, reverse: bool) -> str:
+        values = [self._value(row, field.lstrip("-")) for field in self.ordering_fields]
+        payload = json.dumps({"p": values, "r": int(reverse)}, default=self._encode_value, separators=(",", ":"))
+        token = base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None, False
+        try:
+            padded = token + "=" * (-len(token) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            position = payload["p"]
+            reverse = bool(payload.get("r"))
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def _after(self, ordering, position) -> Q:
+        """
+        Build ``(a, b, ...) > (x, y, ...)`` honouring each field's direction.
+        """
+        if len(position) != len(ordering):
+            raise NotFound(self.invalid_cursor_message)
+        condition = Q()
+        for index in reversed(range(len(ordering))):
+            field = ordering[index].lstrip("-")
+            lookup = "lt" if ordering[index].startswith("-") else "gt"
+            step = Q(**{f"{field}__{lookup}": position[index]})
+            if index < len(ordering) - 1:
+                step |= Q(**{field: position[index]}) & condition
+            condition = step
+        return condition
+
+    @staticmethod
+    def _invert(field: str) -> str:
+        return field[1:] if field.startswith("-") else f"-{field}"
+
+    @staticmethod
+    def _encode_value(value) -> str:
+        if hasattr(value, "isoformat"):
+            return value.isoformat()
+        return str(value)
+
+    @staticmethod
+    def _value(row, field: str):
+        if isinstance(row, dict):
+            return row[field]
+        return getattr(row, field)
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "The pagination cursor value.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Number of results to return per page.",
+                "schema": {"type": "integer"},
+            },
+        ]
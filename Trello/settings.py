@@ -65,8 +65,87 @@ AUTH_USER_MODEL = "accounts.User"
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "accounts.authentication.AsyncJWTAuthentication",
     ),
+    "DEFAULT_PAGINATION_CLASS": "Trello.pagination.KeysetPagination",
+    "PAGE_SIZE": 50,
+}
+
+# Cross-request cache of workspace roles (see workspaces.membership).
+# Writes invalidate it in-process; the TTL bounds staleness across workers.
+WORKSPACE_ROLE_CACHE_SIZE = 10000
+WORKSPACE_ROLE_CACHE_TTL = 30  # seconds
+
+# Serve GETs of the read-heavy list and report views with async handlers
+# (see Trello.async_views). Off by default, since under WSGI every async
+# view would need its own event loop; Trello/asgi.py turns it on.
+ASYNC_READ_VIEWS = os.environ.get("ASYNC_READ_VIEWS", "0") == "1"
+
+# Render task lists from values() rows, with orjson when installed,
+# instead of through TaskSerializer (see Trello.fast_read). Opt-in.
+FAST_READ_PATH = os.environ.get("FAST_READ_PATH", "0") == "1"
+
+# How dense task columns are rebalanced after a move (see tasks.ranking):
+# "thread" in the background after commit, or "inline".
+TASK_RANK_REBALANCE = "thread"
+
+# DONE tasks unchanged for this many days are moved to the archive tables
+# by `manage.py archive_done_tasks` (see tasks.archive).
+TASK_ARCHIVE_AFTER_DAYS = 180
+
+# Real-time board events (see boards.events). Use
+# "boards.events.RedisBroker" when running more than one ASGI worker.
+BOARD_EVENTS_BROKER = "boards.events.LocalBroker"
+BOARD_EVENTS_REDIS_URL = os.environ.get("BOARD_EVENTS_REDIS_URL", "redis://localhost:6379/0")
+BOARD_EVENTS_QUEUE_SIZE = 100  # events buffered per open stream
+BOARD_EVENTS_KEEPALIVE = 15  # seconds between keep-alive comments
+
+# Versioned cache of board-scoped GET responses (see boards.cache).
+# BOARD_RESPONSE_CACHE picks the backend: "locmem" (per process, also the
+# stand-in for Redis in tests), "file", "redis" (shared by all workers,
+# needs redis) or "none". Entries are keyed by board version, so writes
+# never delete keys; stale versions expire after the timeout.
+BOARD_RESPONSE_CACHE = os.environ.get("BOARD_RESPONSE_CACHE", "locmem")
+BOARD_RESPONSE_CACHE_BACKENDS = {
+    "locmem": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "board-responses"},
+    "file": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.environ.get("BOARD_RESPONSE_CACHE_DIR", str(BASE_DIR / "cache" / "board-responses")),
+    },
+    "redis": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.environ.get("BOARD_RESPONSE_CACHE_REDIS_URL", "redis://localhost:6379/1"),
+    },
+    "none": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"},
+}
+
+# Per-request instrumentation (see Trello.instrumentation): query count,
+# SQL time and auth/membership/serialize/render spans. Sampled requests
+# get a Server-Timing header and a log line; slow ones are always logged.
+REQUEST_METRICS_SAMPLE_RATE = float(os.environ.get("REQUEST_METRICS_SAMPLE_RATE", "0.01"))
+REQUEST_METRICS_SLOW_REQUEST_MS = int(os.environ.get("REQUEST_METRICS_SLOW_REQUEST_MS", "500"))
+REQUEST_METRICS_SLOW_QUERY_MS = 100  # keep the SQL of statements slower than this
+REQUEST_METRICS_TOP_QUERIES = 3  # slowest statements reported per request
+REQUEST_METRICS_SERVER_TIMING = True
+# Prometheus metrics at /metrics (Trello/metrics.py). Scrapes need
+# "Authorization: Bearer <METRICS_TOKEN>" when it is set, or come from
+# loopback. With several worker processes point
+# METRICS_MULTIPROC_DIR at a directory they share, emptied at startup.
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+METRICS_MULTIPROC_DIR = os.environ.get("METRICS_MULTIPROC_DIR", "")
+METRICS_FLUSH_INTERVAL = float(os.environ.get("METRICS_FLUSH_INTERVAL", "5"))
+# Requests over their view's query_budget raise in debug (and tests) and
+# are logged as errors in production.
+QUERY_BUDGET_RAISE = DEBUG
+
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "board_responses": {
+        **BOARD_RESPONSE_CACHE_BACKENDS[BOARD_RESPONSE_CACHE],
+        "KEY_PREFIX": "trello",
+        "TIMEOUT": 300,
+        "OPTIONS": {"MAX_ENTRIES": 10000} if BOARD_RESPONSE_CACHE in ("locmem", "file") else {},
+    },
 }
 
 SPECTACULAR_SETTINGS = {
@@ -78,6 +157,8 @@ SPECTACULAR_SETTINGS = {
 }
 
 MIDDLEWARE = [
+    'Trello.log_pipeline.RequestIDMiddleware',
+    'Trello.instrumentation.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -106,6 +187,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'Trello.wsgi.application'
+ASGI_APPLICATION = 'Trello.asgi.application'
 
 
 # Database
@@ -163,42 +245,75 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 LOG_DIR = os.path.join(BASE_DIR, "logs")
 os.makedirs(LOG_DIR, exist_ok=True)
 
+# "queue": request threads only enqueue log records; a listener thread
+# writes them out (see Trello/log_pipeline.py). "sync" writes them on
+# the request thread.
+LOG_PIPELINE = os.environ.get("LOG_PIPELINE", "queue")
+LOG_QUEUE_SIZE = int(os.environ.get("LOG_QUEUE_SIZE", "10000"))
+# logs/app.log is JSON lines, rotated at midnight and whenever it
+# reaches LOG_MAX_BYTES. Only one process may rotate a file: with several
+# workers put {pid} in LOG_FILE (gunicorn.conf.py does) for a file each.
+LOG_FILE = os.environ.get("LOG_FILE", "app.log")
+LOG_MAX_BYTES = int(os.environ.get("LOG_MAX_BYTES", str(50 * 1024 * 1024)))
+LOG_BACKUP_COUNT = int(os.environ.get("LOG_BACKUP_COUNT", "14"))
+LOG_HANDLERS = ["queue"] if LOG_PIPELINE == "queue" else ["console", "file"]
+
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
 
+    "filters": {
+        "request_id": {"()": "Trello.log_pipeline.RequestIDFilter"},
+    },
+
     "formatters": {
-        "verbose": {
-            "format": "{levelname} {asctime} {module} {message}",
-            "style": "{",
-        },
         "simple": {
-            "format": "{levelname} {message}",
+            "format": "{levelname} [{request_id}] {message}",
             "style": "{",
         },
+        "json": {
+            "()": "Trello.log_pipeline.JSONFormatter",
+        },
     },
 
     "handlers": {
         "file": {
             "level": "INFO",
-            "class": "logging.FileHandler",
-            "filename": os.path.join(BASE_DIR, "logs", "app.log"),
-            "formatter": "verbose",
+            "class": "Trello.log_pipeline.SizedTimedRotatingFileHandler",
+            "filename": os.path.join(LOG_DIR, LOG_FILE),
+            "when": "midnight",
+            "max_bytes": LOG_MAX_BYTES,
+            "backupCount": LOG_BACKUP_COUNT,
+            "formatter": "json",
+            "filters": ["request_id"],
         },
         "console": {
             "level": "DEBUG",
             "class": "logging.StreamHandler",
             "formatter": "simple",
+            "filters": ["request_id"],
+        },
+        "queue": {
+            "()": "Trello.log_pipeline.QueueLogHandler",
+            "sink": "log_sink",
+            "queue_size": LOG_QUEUE_SIZE,
+            "filters": ["request_id"],
         },
     },
 
     "loggers": {
         "django": {
-            "handlers": ["console", "file"],
+            "handlers": LOG_HANDLERS,
             "level": "INFO",
             "propagate": True,
         },
         "trello_app": {  
+            "handlers": LOG_HANDLERS,
+            "level": "DEBUG",
+            "propagate": False,
+        },
+        # where the queue listener sends records
+        "log_sink": {
             "handlers": ["console", "file"],
             "level": "DEBUG",
             "propagate": False,
@@ -16,6 +16,8 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
+from tasks.views import MyTaskListView
+from Trello.views import metrics_view
 from drf_spectacular.views import (
     SpectacularAPIView,
     SpectacularSwaggerView,
@@ -28,7 +30,9 @@ urlpatterns = [
     path('api/accounts/', include('accounts.urls')),
     path('api/workspaces/', include('workspaces.urls')),
     path("api/boards/", include("boards.urls")),
+    path("api/me/tasks/", MyTaskListView.as_view(), name="my-tasks"),
     path("api/", include("tasks.urls")),
+    path("metrics", metrics_view, name="metrics"),
 
     # Schema & Docs
     path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
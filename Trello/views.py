@@ -0,0 +1,36 @@
+import hmac
+import ipaddress
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+
+from .instrumentation import query_budget
+from .metrics import CONTENT_TYPE, REGISTRY
+
+
+def metrics_allowed(request) -> bool:
+    """
+    Let Prometheus in with ``Authorization: Bearer <METRICS_TOKEN>`` when
+    that setting is set, and from loopback addresses only otherwise.
+    Private addresses are not enough: behind a reverse proxy or NAT every
+    client appears to come from one.
+    """
+    token = settings.METRICS_TOKEN
+    if token:
+        return hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {token}")
+    try:
+        address = ipaddress.ip_address(request.META.get("REMOTE_ADDR", ""))
+    except ValueError:
+        return False
+    return address.is_loopback
+
+
+@query_budget(0)
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint: request, database, cache and logging
+    metrics of every worker in the text exposition format.
+    """
+    if not metrics_allowed(request):
+        return HttpResponseForbidden()
+    return HttpResponse(REGISTRY.render(), content_type=CONTENT_TYPE)
@@ -3,10 +3,11 @@ from rest_framework_simplejwt.views import (
     TokenObtainPairView,
     TokenRefreshView,
 )
+from Trello.instrumentation import query_budget
 from .views import UserRegisterView
 
 urlpatterns = [
     path("register/", UserRegisterView.as_view(), name="register"),
-    path("login/", TokenObtainPairView.as_view(), name="login"),
-    path("refresh/", TokenRefreshView.as_view(), name="refresh"),
+    path("login/", query_budget({"POST": 2})(TokenObtainPairView.as_view()), name="login"),
+    path("refresh/", query_budget({"POST": 2})(TokenRefreshView.as_view()), name="refresh"),
 ]
@@ -9,3 +9,4 @@ class UserRegisterView(generics.CreateAPIView):
     """
     queryset = User.objects.all()
     serializer_class = UserRegisterSerializer
+    query_budget = {"POST": 6}
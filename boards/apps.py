@@ -1,6 +1,16 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
 
 
 class BoardsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'boards'
+
+    def ready(self):
+        from workspaces.models import Workspace
+        from .models import Board
+        from .versioning import board_deleted, board_saved, workspace_saved
+
+        post_save.connect(board_saved, sender=Board)
+        post_save.connect(workspace_saved, sender=Workspace)
+        post_delete.connect(board_deleted, sender=Board)
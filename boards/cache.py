@@ -0,0 +1,88 @@
+"""
+Versioned cache of board-scoped GET responses.
+
+Every member of a board gets the same task list, labels and reports, so
+``BoardConditionalGetMixin`` keeps the rendered JSON of those responses
+in the ``board_responses`` cache (see ``settings.CACHES``). Entries are
+stored under the endpoint and its query string, with the board version
+as the cache version: a write bumps the version, and entries of older
+versions are never read again and expire on their own. Membership is
+checked on every request before the cache is consulted.
+
+Hit and miss counts are kept per process and URL name in ``stats``.
+"""
+import hashlib
+import threading
+from collections import Counter
+
+from django.core.cache import caches
+from django.http import HttpResponse
+
+CACHE_ALIAS = "board_responses"
+
+
+class CacheStats:
+    """Thread-safe hit and miss counters per endpoint."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = Counter()
+        self.misses = Counter()
+
+    def record(self, endpoint: str, hit: bool) -> None:
+        with self._lock:
+            (self.hits if hit else self.misses)[endpoint] += 1
+
+    def snapshot(self) -> dict:
+        """Return the counts and hit rates, overall and per endpoint."""
+        with self._lock:
+            hits, misses = Counter(self.hits), Counter(self.misses)
+        endpoints = {
+            endpoint: self._summary(hits[endpoint], misses[endpoint])
+            for endpoint in sorted(hits.keys() | misses.keys())
+        }
+        return {**self._summary(sum(hits.values()), sum(misses.values())), "endpoints": endpoints}
+
+    def clear(self) -> None:
+        with self._lock:
+            self.hits.clear()
+            self.misses.clear()
+
+    @staticmethod
+    def _summary(hits: int, misses: int) -> dict:
+        total = hits + misses
+        return {"hits": hits, "misses": misses, "hit_rate": hits / total if total else 0.0}
+
+
+stats = CacheStats()
+
+
+def response_cache():
+    return caches[CACHE_ALIAS]
+
+
+def response_key(board_id: int, request) -> str:
+    """
+    Return the cache key of a board response, without the board version.
+
+    The host is part of it because paginated responses carry absolute
+    links; query parameters are sorted so their order does not matter.
+    """
+    query = sorted((key, value) for key, values in request.GET.lists() for value in values)
+    identity = f"{request.scheme}://{request.get_host()}{request.path}?{query}"
+    return f"board:{board_id}:{hashlib.sha1(identity.encode()).hexdigest()}"
+
+
+def cached_response(entry: tuple) -> HttpResponse:
+    content_type, content = entry
+    return HttpResponse(content, content_type=content_type)
+
+
+def cache_entry(response):
+    """
+    Return the cacheable ``(content_type, content)`` of a rendered
+    response, or ``None`` for responses that are not plain 200s.
+    """
+    if response.status_code != 200 or response.streaming:
+        return None
+    return response["Content-Type"], response.content
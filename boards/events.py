@@ -0,0 +1,175 @@
+"""
+Real-time board events.
+
+Every committed task, label and board write publishes a small event
+(type, board, change sequence and object ids) to a broker. The broker
+delivers it to the :class:`BoardEventHub` of each process, which fans it
+out to the event streams open on that board (see
+``boards.views.BoardEventStreamView``). Clients fetch the changed rows
+with the delta sync endpoint, passing the last ``seq`` they saw.
+
+``settings.BOARD_EVENTS_BROKER`` selects the broker:
+
+* ``boards.events.LocalBroker`` (default) delivers in-process only. It
+  is enough for a single ASGI worker and is the stand-in used in tests.
+* ``boards.events.RedisBroker`` relays through Redis pub/sub so that
+  every worker sees every event. It needs the ``redis`` package.
+"""
+import asyncio
+import json
+import logging
+import threading
+from collections import defaultdict
+from functools import lru_cache
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger("trello_app")
+
+RESYNC = {"type": "resync"}
+
+
+class Subscription:
+    """
+    One open event stream on a board.
+
+    Events are handed over from any thread to the subscriber's event
+    loop. A subscriber that falls ``queue_size`` events behind gets its
+    backlog replaced by a single ``resync`` event.
+    """
+
+    def __init__(self, hub: "BoardEventHub", board_id: int, queue_size: int, loop=None):
+        self.hub = hub
+        self.board_id = board_id
+        self.loop = loop or asyncio.get_running_loop()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+    def put(self, event: dict) -> None:
+        self.loop.call_soon_threadsafe(self._put, event)
+
+    def _put(self, event: dict) -> None:
+        if self.queue.full():
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            event = RESYNC
+        self.queue.put_nowait(event)
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[dict]:
+        """Return the next event, or ``None`` after ``timeout`` seconds."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self) -> None:
+        self.hub.unsubscribe(self)
+
+
+class BoardEventHub:
+    """In-process fan-out of board events to open subscriptions."""
+
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._subscriptions: dict[int, set[Subscription]] = defaultdict(set)
+
+    def subscribe(self, board_id: int, loop=None) -> Subscription:
+        subscription = Subscription(self, board_id, self.queue_size, loop)
+        with self._lock:
+            self._subscriptions[board_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.board_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.board_id]
+
+    def subscriber_count(self, board_id: int) -> int:
+        with self._lock:
+            return len(self._subscriptions.get(board_id, ()))
+
+    def dispatch(self, board_id: int, event: dict) -> None:
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(board_id, ()))
+        for subscription in subscriptions:
+            subscription.put(event)
+
+
+class LocalBroker:
+    """Deliver events to the hub of this process only."""
+
+    def __init__(self, hub: BoardEventHub):
+        self.hub = hub
+
+    def publish(self, board_id: int, event: dict) -> None:
+        self.hub.dispatch(board_id, event)
+
+    def listen(self) -> None:
+        """Start receiving events from other processes, if the broker can."""
+
+
+class RedisBroker(LocalBroker):
+    """
+    Relay events through Redis pub/sub, one channel per board.
+
+    A daemon thread started on the first subscription forwards the
+    events of every board to the local hub.
+    """
+    channel_prefix = "board-events:"
+
+    def __init__(self, hub: BoardEventHub):
+        super().__init__(hub)
+        try:
+            import redis
+        except ImportError:
+            raise ImproperlyConfigured("RedisBroker requires the redis package.")
+        self.client = redis.Redis.from_url(settings.BOARD_EVENTS_REDIS_URL)
+        self._listener: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def publish(self, board_id: int, event: dict) -> None:
+        self.client.publish(f"{self.channel_prefix}{board_id}", json.dumps(event))
+
+    def listen(self) -> None:
+        with self._lock:
+            if self._listener is None:
+                self._listener = threading.Thread(target=self._forward, name="board-events", daemon=True)
+                self._listener.start()
+
+    def _forward(self) -> None:
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        pubsub.psubscribe(f"{self.channel_prefix}*")
+        for message in pubsub.listen():
+            try:
+                event = json.loads(message["data"])
+                self.hub.dispatch(event["board"], event)
+            except (KeyError, TypeError, ValueError):
+                logger.warning("Dropped malformed board event %r", message.get("data"))
+
+
+hub = BoardEventHub(queue_size=getattr(settings, "BOARD_EVENTS_QUEUE_SIZE", 100))
+
+
+@lru_cache(maxsize=None)
+def get_broker() -> LocalBroker:
+    """Return the broker configured by ``settings.BOARD_EVENTS_BROKER``."""
+    path = getattr(settings, "BOARD_EVENTS_BROKER", "boards.events.LocalBroker")
+    return import_string(path)(hub)
+
+
+def publish_board_event(board_id: int, event_type: str, seq: int, ids: Iterable[int] = ()) -> None:
+    """
+    Publish an event about a board once the current transaction commits.
+
+    Nothing is sent if the transaction rolls back; broker errors are
+    logged instead of failing the write.
+    """
+    event = {"type": event_type, "board": board_id, "seq": seq, "ids": list(ids)}
+    transaction.on_commit(lambda: get_broker().publish(board_id, event), robust=True)
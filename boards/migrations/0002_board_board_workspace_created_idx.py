@@ -0,0 +1,18 @@
+# Generated by Django 5.0.3 on 2026-10-18 18:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boards', '0001_initial'),
+        ('workspaces', '0003_workspace_workspace_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='board',
+            index=models.Index(fields=['workspace', 'created_at', 'id'], name='board_workspace_created_idx'),
+        ),
+    ]
@@ -2,6 +2,15 @@ from django.db import models
 from workspaces.models import Workspace
 
 
+class BoardQuerySet(models.QuerySet):
+    """
+    QuerySet for boards.
+    """
+    def with_related(self) -> "BoardQuerySet":
+        """Load the workspace and its owner rendered by BoardSerializer."""
+        return self.select_related("workspace__owner")
+
+
 class Board(models.Model):
     """
     Represents a project board inside a workspace.
@@ -10,12 +19,23 @@ class Board(models.Model):
         title (str): The title of the board.
         workspace (Workspace): The workspace this board belongs to.
         created_at (datetime): When the board was created.
+        version (int): Increased on every change to the board, its tasks or labels.
+        updated_at (datetime): When the version was last increased.
     """
     title: str = models.CharField(max_length=255)
     workspace = models.ForeignKey(
         Workspace, on_delete=models.CASCADE, related_name="boards"
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    version: int = models.PositiveBigIntegerField(default=1, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = BoardQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["workspace", "created_at", "id"], name="board_workspace_created_idx"),
+        ]
 
     def __str__(self) -> str:
         """Return human-readable representation of the board."""
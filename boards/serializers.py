@@ -1,8 +1,9 @@
 from rest_framework import serializers
+from Trello.instrumentation import TimedListSerializer, TimedSerializerMixin
 from .models import Board
 
 
-class BoardSerializer(serializers.ModelSerializer):
+class BoardSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for Board model.
     """
@@ -11,3 +12,4 @@ class BoardSerializer(serializers.ModelSerializer):
     class Meta:
         model = Board
         fields = ["id", "title", "workspace", "created_at"]
+        list_serializer_class = TimedListSerializer
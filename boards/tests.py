@@ -1,8 +1,16 @@
+import asyncio
+import json
 import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
 from django.urls import reverse
 from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
 from accounts.models import User
 from workspaces.models import Workspace, WorkspaceMember
+from boards.events import hub
+from boards.models import Board
+from tasks.models import Task
 
 @pytest.mark.django_db
 def test_create_board_by_owner():
@@ -18,3 +26,118 @@ def test_create_board_by_owner():
 
     assert response.status_code == 201
     assert workspace.boards.filter(title="Board 1").exists()
+
+
+@pytest.mark.django_db
+def test_board_detail_update_requires_owner_or_admin():
+    owner = User.objects.create_user(username="owner3", email="o3@example.com", password="pass1234")
+    member = User.objects.create_user(username="member3", email="m3@example.com", password="pass1234")
+    workspace = Workspace.objects.create(name="Workspace Z", owner=owner)
+    WorkspaceMember.objects.create(workspace=workspace, user=owner, role="OWNER")
+    WorkspaceMember.objects.create(workspace=workspace, user=member, role="MEMBER")
+    board = Board.objects.create(title="Board Z", workspace=workspace)
+    url = reverse("board-detail", kwargs={"workspace_pk": workspace.id, "pk": board.id})
+
+    client = APIClient()
+    client.force_authenticate(user=member)
+    assert client.get(url).status_code == 200
+    assert client.patch(url, {"title": "Renamed"}).status_code == 403
+    board.refresh_from_db()
+    assert board.title == "Board Z"
+
+    client.force_authenticate(user=owner)
+    assert client.patch(url, {"title": "Renamed"}).status_code == 200
+    board.refresh_from_db()
+    assert board.title == "Renamed"
+
+
+@pytest.mark.django_db
+def test_board_events_published_after_commit(django_capture_on_commit_callbacks):
+    owner = User.objects.create_user(username="owner4", email="o4@example.com", password="pass1234")
+    outsider = User.objects.create_user(username="outsider4", email="x4@example.com", password="pass1234")
+    workspace = Workspace.objects.create(name="Workspace E", owner=owner)
+    WorkspaceMember.objects.create(workspace=workspace, user=owner, role="OWNER")
+    board = Board.objects.create(title="Board E", workspace=workspace)
+
+    url = reverse("board-events", kwargs={"workspace_pk": workspace.id, "board_pk": board.id})
+    # a WSGI worker would hold the stream open forever
+    wsgi_client = APIClient()
+    wsgi_client.force_authenticate(user=owner)
+    assert wsgi_client.get(url).status_code == 501
+
+    def get(user):
+        headers = {"Authorization": f"Bearer {AccessToken.for_user(user)}"}
+        return async_to_sync(AsyncClient().get)(url, headers=headers)
+
+    assert get(outsider).status_code == 403
+    response = get(owner)
+    assert response.status_code == 200
+    assert response["Content-Type"] == "text/event-stream"
+
+    loop = asyncio.new_event_loop()
+    stream = response.streaming_content
+    try:
+        assert loop.run_until_complete(anext(stream)) == b"retry: 2000\n\n"
+        assert b"event: ready" in loop.run_until_complete(anext(stream))
+
+        with django_capture_on_commit_callbacks() as callbacks:
+            task = Task.objects.create(title="Live", board=board)
+        # events wait for the commit
+        assert hub.subscriber_count(board.id) == 1 and callbacks
+        for callback in callbacks:
+            callback()
+        chunk = loop.run_until_complete(asyncio.wait_for(anext(stream), 1)).decode()
+        assert chunk.startswith(f"id: {task.change_seq}\nevent: task.created\n")
+        event = json.loads(chunk.splitlines()[2].removeprefix("data: "))
+        assert event == {"type": "task.created", "board": board.id, "seq": task.change_seq, "ids": [task.id]}
+
+        with django_capture_on_commit_callbacks(execute=True):
+            board.delete()
+        assert b"event: board.deleted" in loop.run_until_complete(asyncio.wait_for(anext(stream), 1))
+        with pytest.raises(StopAsyncIteration):
+            loop.run_until_complete(anext(stream))
+        assert hub.subscriber_count(board.id) == 0
+    finally:
+        loop.close()
+
+
+@pytest.mark.django_db
+def test_board_responses_cached_per_version(django_assert_num_queries):
+    owner = User.objects.create_user(username="cacher", email="cacher@example.com", password="pass1234")
+    member = User.objects.create_user(username="reader", email="reader@example.com", password="pass1234")
+    workspace = Workspace.objects.create(name="Workspace", owner=owner)
+    WorkspaceMember.objects.create(workspace=workspace, user=owner, role="OWNER")
+    WorkspaceMember.objects.create(workspace=workspace, user=member, role="MEMBER")
+    board = Board.objects.create(title="Board", workspace=workspace)
+    Task.objects.create(title="First", board=board)
+    kwargs = {"workspace_pk": workspace.id, "board_pk": board.id}
+    url = reverse("task-list-create", kwargs=kwargs)
+
+    client = APIClient()
+    client.force_authenticate(user=owner)
+    first = client.get(url, {"page_size": 10, "status": "TODO"})
+
+    # another member, same query in another order: board version only, membership is cached
+    client.force_authenticate(user=member)
+    client.get(url, {"page_size": 10, "status": "TODO"})
+    with django_assert_num_queries(1):
+        cached = client.get(url, {"status": "TODO", "page_size": 10})
+    assert cached.status_code == 200
+    assert cached.content == first.content
+
+    # a write bumps the version, so the next read misses
+    client.post(url, {"title": "Second"})
+    response = client.get(url, {"page_size": 10, "status": "TODO"})
+    assert [task["title"] for task in response.json()["results"]] == ["First", "Second"]
+
+    # access is still checked on cached responses
+    outsider = User.objects.create_user(username="outsider", email="outsider@example.com", password="pass1234")
+    client.force_authenticate(user=outsider)
+    assert client.get(url, {"page_size": 10, "status": "TODO"}).status_code == 403
+
+    stats_url = reverse("board-cache-stats")
+    assert client.get(stats_url).status_code == 403
+    outsider.is_staff = True
+    outsider.save()
+    stats = client.get(stats_url).data
+    assert stats["endpoints"]["task-list-create"] == {"hits": 2, "misses": 2, "hit_rate": 0.5}
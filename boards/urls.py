@@ -1,8 +1,16 @@
 from django.urls import path, include
-from .views import BoardListCreateView, BoardDetailView
-from tasks.views import BoardReportView
+from .views import BoardCacheStatsView, BoardListCreateView, BoardDetailView, BoardEventStreamView
+from tasks.views import (
+    ArchivedTaskListView,
+    ArchivedTaskRestoreView,
+    BoardChangesView,
+    BoardReportView,
+    BoardSnapshotView,
+)
 
 urlpatterns = [
+    path("cache/stats/", BoardCacheStatsView.as_view(), name="board-cache-stats"),
+
     # boards under a workspace
     path("<int:workspace_pk>/", BoardListCreateView.as_view(), name="board-list-create"),
     path("<int:workspace_pk>/<int:pk>/", BoardDetailView.as_view(), name="board-detail"),
@@ -11,4 +19,13 @@ urlpatterns = [
     path("<int:workspace_pk>/<int:board_pk>/tasks/", include("tasks.urls")),
     path("<int:workspace_pk>/<int:board_pk>/labels/", include("labels.urls")),
     path("<int:workspace_pk>/<int:board_pk>/reports/", BoardReportView.as_view(), name="board-report"),
+    path("<int:workspace_pk>/<int:board_pk>/snapshot/", BoardSnapshotView.as_view(), name="board-snapshot"),
+    path("<int:workspace_pk>/<int:board_pk>/changes/", BoardChangesView.as_view(), name="board-changes"),
+    path("<int:workspace_pk>/<int:board_pk>/events/", BoardEventStreamView.as_view(), name="board-events"),
+    path("<int:workspace_pk>/<int:board_pk>/archive/", ArchivedTaskListView.as_view(), name="board-archive"),
+    path(
+        "<int:workspace_pk>/<int:board_pk>/archive/<int:pk>/restore/",
+        ArchivedTaskRestoreView.as_view(),
+        name="archived-task-restore",
+    ),
 ]
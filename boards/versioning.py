@@ -0,0 +1,195 @@
+import hashlib
+
+from django.db import connection
+from django.db.models import F
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.response import Response
+
+from Trello.fast_read import renders_plain_json
+from Trello.instrumentation import span
+from workspaces.membership import aget_member_role, get_member_role
+from .cache import cache_entry, cached_response, response_cache, response_key, stats
+from .events import publish_board_event
+from .models import Board
+
+
+def bump_board_version(*board_ids: int) -> dict[int, int]:
+    """
+    Mark the boards as changed: increase their version and touch
+    ``updated_at``.
+
+    Returns the new version of each board. The version doubles as the
+    board's change sequence, so callers stamp changed rows with it. The
+    row lock taken by the UPDATE serializes writers of the same board
+    until commit, which keeps sequence order and commit order the same.
+    """
+    board_ids = sorted({pk for pk in board_ids if pk is not None})
+    if not board_ids:
+        return {}
+    now = timezone.now()
+    if connection.vendor in ("postgresql", "sqlite"):
+        placeholders = ", ".join(["%s"] * len(board_ids))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {Board._meta.db_table} SET version = version + 1, updated_at = %s "
+                f"WHERE id IN ({placeholders}) RETURNING id, version",
+                [Board._meta.get_field("updated_at").get_db_prep_value(now, connection), *board_ids],
+            )
+            return dict(cursor.fetchall())
+    Board.objects.filter(pk__in=board_ids).update(version=F("version") + 1, updated_at=now)
+    return dict(Board.objects.filter(pk__in=board_ids).values_list("id", "version"))
+
+
+def board_saved(sender, instance: Board, created: bool, **kwargs) -> None:
+    """Signal receiver bumping the version after a board is edited."""
+    if not created:
+        seq = bump_board_version(instance.pk)[instance.pk]
+        publish_board_event(instance.pk, "board.updated", seq, [instance.pk])
+
+
+def announce_board_changes(board_ids) -> None:
+    """
+    Bump the boards and tell open streams, for changes outside the board
+    that its responses embed, like a workspace name or a username.
+    """
+    for board_id, seq in bump_board_version(*board_ids).items():
+        publish_board_event(board_id, "board.updated", seq, [board_id])
+
+
+def workspace_saved(sender, instance, created: bool, **kwargs) -> None:
+    """
+    Signal receiver bumping the boards of an edited workspace: board,
+    task and label responses show its name and owner.
+    """
+    if not created:
+        announce_board_changes(Board.objects.filter(workspace=instance).values_list("pk", flat=True))
+
+
+def board_deleted(sender, instance: Board, **kwargs) -> None:
+    """Signal receiver telling open streams that a board is gone."""
+    publish_board_event(instance.pk, "board.deleted", instance.version, [instance.pk])
+
+
+def board_etag(board_id: int, version: int, request) -> str:
+    """
+    Return a strong ETag for one representation of a board resource.
+
+    The path and query string are folded in because each endpoint and
+    page of a board is a separate representation of the same version.
+    """
+    digest = hashlib.sha1(request.get_full_path().encode()).hexdigest()[:12]
+    return f'"{board_id}-{version}-{digest}"'
+
+
+class BoardConditionalGetMixin:
+    """
+    Answer GETs on board-scoped views with ``304 Not Modified`` when the
+    client's ``If-None-Match`` still matches the board version, before
+    any rows are fetched or serialized. ``Last-Modified`` is sent for
+    information only.
+
+    Other JSON GETs are served from the versioned response cache of
+    boards.cache when ``cache_responses`` is on.
+    """
+    board_url_kwarg: str = "board_pk"
+    cache_responses: bool = True
+
+    def get(self, request, *args, **kwargs):
+        return self.conditional_get(super().get, request, *args, **kwargs)
+
+    def conditional_get(self, handler, request, *args, **kwargs):
+        """
+        Call ``handler`` only if the client's copy is out of date.
+        """
+        state = self._board_state().first()
+        if state is None:
+            raise PermissionDenied("Board not found.")
+        if get_member_role(request, state["workspace_id"]) is None:
+            raise PermissionDenied("You are not a member of this workspace.")
+
+        headers = self._validators(state, request)
+        # If-Modified-Since is not honoured: Last-Modified has whole-second
+        # precision, so a write in the same second would still get a 304
+        not_modified = get_conditional_response(request, etag=headers["ETag"])
+        if not_modified is not None:
+            return Response(status=not_modified.status_code, headers=headers)
+
+        if not self._cacheable(request):
+            return self._with_validators(handler(request, *args, **kwargs), headers)
+        key, version = response_key(self.kwargs[self.board_url_kwarg], request), state["version"]
+        entry = response_cache().get(key, version=version)
+        stats.record(request.resolver_match.url_name, entry is not None)
+        if entry is not None:
+            return self._with_validators(cached_response(entry), headers)
+
+        response = handler(request, *args, **kwargs)
+        entry = self._cache_entry(request, response)
+        if entry is not None:
+            response_cache().set(key, entry, version=version)
+        return self._with_validators(response, headers)
+
+    async def aconditional_get(self, handler, request, *args, **kwargs):
+        """
+        Async version of :meth:`conditional_get` for a coroutine ``handler``.
+        """
+        state = await self._board_state().afirst()
+        if state is None:
+            raise PermissionDenied("Board not found.")
+        if await aget_member_role(request, state["workspace_id"]) is None:
+            raise PermissionDenied("You are not a member of this workspace.")
+
+        headers = self._validators(state, request)
+        # If-Modified-Since is not honoured: Last-Modified has whole-second
+        # precision, so a write in the same second would still get a 304
+        not_modified = get_conditional_response(request, etag=headers["ETag"])
+        if not_modified is not None:
+            return Response(status=not_modified.status_code, headers=headers)
+
+        if not self._cacheable(request):
+            return self._with_validators(await handler(request, *args, **kwargs), headers)
+        key, version = response_key(self.kwargs[self.board_url_kwarg], request), state["version"]
+        entry = await response_cache().aget(key, version=version)
+        stats.record(request.resolver_match.url_name, entry is not None)
+        if entry is not None:
+            return self._with_validators(cached_response(entry), headers)
+
+        response = await handler(request, *args, **kwargs)
+        entry = self._cache_entry(request, response)
+        if entry is not None:
+            await response_cache().aset(key, entry, version=version)
+        return self._with_validators(response, headers)
+
+    def _cacheable(self, request) -> bool:
+        # other renderers (the browsable API) show per-user content
+        return self.cache_responses and renders_plain_json(request)
+
+    def _cache_entry(self, request, response):
+        """Render a DRF response now so that its bytes can be cached."""
+        if isinstance(response, Response):
+            response.accepted_renderer = request.accepted_renderer
+            response.accepted_media_type = request.accepted_media_type
+            response.renderer_context = self.get_renderer_context()
+            with span("render"):
+                response.render()
+        return cache_entry(response)
+
+    def _board_state(self):
+        return Board.objects.filter(pk=self.kwargs[self.board_url_kwarg]).values(
+            "workspace_id", "version", "updated_at"
+        )
+
+    def _validators(self, state: dict, request) -> dict:
+        return {
+            "ETag": board_etag(self.kwargs[self.board_url_kwarg], state["version"], request),
+            "Last-Modified": http_date(state["updated_at"].timestamp()),
+        }
+
+    @staticmethod
+    def _with_validators(response, headers: dict):
+        if response.status_code == 200:
+            for header, value in headers.items():
+                response[header] = value
+        return response
@@ -1,7 +1,23 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views import View
 from rest_framework import generics, permissions
-from workspaces.models import Workspace, WorkspaceMember
+from rest_framework.exceptions import APIException, NotAuthenticated
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework.settings import api_settings
+from workspaces.membership import ADMIN_ROLES, get_member_role
+from workspaces.models import Workspace
+from .cache import stats
+from .events import get_broker, hub
 from .models import Board
 from .serializers import BoardSerializer
+from .versioning import BoardConditionalGetMixin
 from rest_framework.exceptions import PermissionDenied
 from workspaces.permissions import IsWorkspaceMember, IsWorkspaceOwnerOrAdmin
 
@@ -14,6 +30,7 @@ class BoardListCreateView(generics.ListCreateAPIView):
     """
     serializer_class = BoardSerializer
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = {"GET": 6, "POST": 7}
 
     def get_workspace(self) -> Workspace:
         workspace_id = self.kwargs["workspace_pk"]
@@ -24,65 +41,123 @@ class BoardListCreateView(generics.ListCreateAPIView):
 
     def get_queryset(self):
         workspace = self.get_workspace()
-        membership = WorkspaceMember.objects.filter(
-            workspace=workspace, user=self.request.user
-        ).first()
-
-        if not membership:
+        if get_member_role(self.request, workspace.id) is None:
             raise PermissionDenied("You are not a member of this workspace.")
 
-        return Board.objects.filter(workspace=workspace)
+        return Board.objects.filter(workspace=workspace).with_related()
 
     def perform_create(self, serializer):
         workspace = self.get_workspace()
-        membership = WorkspaceMember.objects.filter(
-            workspace=workspace, user=self.request.user
-        ).first()
-
-        if membership.role not in ["OWNER", "ADMIN"]:
+        if get_member_role(self.request, workspace.id) not in ADMIN_ROLES:
             raise PermissionDenied("Only Owner/Admin can create boards.")
 
         serializer.save(workspace=workspace)
 
 
-class BoardDetailView(generics.RetrieveUpdateDestroyAPIView):
+class BoardDetailView(BoardConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     API endpoint to retrieve, update, or delete a specific board.
     Only Owner/Admin can update or delete.
     """
     serializer_class = BoardSerializer
     permission_classes = [permissions.IsAuthenticated, IsWorkspaceMember]
+    # DELETE cascades to every task and label, in queries that grow with them
+    query_budget = {"GET": 6, "PUT": 7, "PATCH": 7}
+    board_url_kwarg = "pk"
 
     def get_queryset(self):
         workspace_id = self.kwargs["workspace_pk"]
-        workspace = Workspace.objects.filter(pk=workspace_id).first()
-        if not workspace:
-            raise PermissionDenied("Workspace not found.")
-
-        membership = WorkspaceMember.objects.filter(
-            workspace=workspace, user=self.request.user
-        ).first()
-
-        if not membership:
+        if get_member_role(self.request, workspace_id) is None:
+            if not Workspace.objects.filter(pk=workspace_id).exists():
+                raise PermissionDenied("Workspace not found.")
             raise PermissionDenied("You are not a member of this workspace.")
 
-        return Board.objects.all()
+        return Board.objects.filter(workspace_id=workspace_id).with_related()
 
     def perform_update(self, serializer):
-        self.check_object_permissions(self.request, serializer.instance.workspace)
-        serializer.save()
-        board = self.get_object()
-        membership = WorkspaceMember.objects.filter(
-            workspace=board.workspace, user=self.request.user
-        ).first()
-        if membership.role not in ["OWNER", "ADMIN"]:
+        if get_member_role(self.request, serializer.instance.workspace_id) not in ADMIN_ROLES:
             raise PermissionDenied("Only Owner/Admin can update boards.")
         serializer.save()
 
     def perform_destroy(self, instance):
-        membership = WorkspaceMember.objects.filter(
-            workspace=instance.workspace, user=self.request.user
-        ).first()
-        if membership.role not in ["OWNER", "ADMIN"]:
+        if get_member_role(self.request, instance.workspace_id) not in ADMIN_ROLES:
             raise PermissionDenied("Only Owner/Admin can delete boards.")
         instance.delete()
+
+
+class BoardEventStreamView(View):
+    """
+    API endpoint streaming the events of a board as Server-Sent Events.
+    Each event carries the board change sequence as its id; clients fetch
+    the changed rows from the changes endpoint with ?since=<id>.
+    Only workspace members can listen. Served by the ASGI application
+    only: a WSGI server would buffer the endless stream and hold the
+    worker forever, so it answers 501 there.
+    """
+
+    async def get(self, request, workspace_pk, board_pk):
+        if not isinstance(request, ASGIRequest):
+            return JsonResponse({"detail": "Live updates are only served by the ASGI application."}, status=501)
+        try:
+            seq = await sync_to_async(self.authorize)(request, workspace_pk, board_pk)
+        except APIException as exc:
+            return JsonResponse({"detail": exc.detail}, status=exc.status_code)
+
+        get_broker().listen()
+        response = StreamingHttpResponse(self.stream(board_pk, seq), content_type="text/event-stream")
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+    def authorize(self, request, workspace_pk: int, board_pk: int) -> int:
+        """
+        Authenticate like the DRF views and return the board's current
+        change sequence.
+        """
+        drf_request = Request(
+            request, authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+        )
+        if not drf_request.user.is_authenticated:
+            raise NotAuthenticated()
+        board = Board.objects.filter(pk=board_pk, workspace_id=workspace_pk).values("version").first()
+        if board is None:
+            raise PermissionDenied("Board not found.")
+        if get_member_role(drf_request, workspace_pk) is None:
+            raise PermissionDenied("You are not a member of this workspace.")
+        return board["version"]
+
+    async def stream(self, board_id: int, seq: int):
+        subscription = hub.subscribe(board_id)
+        try:
+            yield "retry: 2000\n\n"
+            yield self.format_event({"type": "ready", "board": board_id, "seq": seq, "ids": []})
+            while True:
+                event = await subscription.get(timeout=settings.BOARD_EVENTS_KEEPALIVE)
+                if event is None:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield self.format_event(event)
+                if event["type"] == "board.deleted":
+                    return
+        finally:
+            subscription.close()
+
+    @staticmethod
+    def format_event(event: dict) -> str:
+        lines = [f"event: {event['type']}", f"data: {json.dumps(event)}"]
+        if "seq" in event:
+            lines.insert(0, f"id: {event['seq']}")
+        return "\n".join(lines) + "\n\n"
+
+
+class BoardCacheStatsView(APIView):
+    """
+    API endpoint reporting the hits, misses and hit rate of the board
+    response cache, overall and per endpoint, for this worker process.
+    Only staff users can view it.
+    """
+    permission_classes = [permissions.IsAdminUser]
+    query_budget = 2
+
+    def get(self, request):
+        return Response(stats.snapshot())
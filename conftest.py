@@ -0,0 +1,41 @@
+import logging
+
+import pytest
+
+from boards.cache import response_cache, stats
+from workspaces.membership import role_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_role_cache():
+    """Keep cached workspace roles from leaking between tests."""
+    role_cache.clear()
+    yield
+    role_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def enforce_query_budgets(settings):
+    """Fail any request that runs more queries than its view's budget."""
+    settings.QUERY_BUDGET_RAISE = True
+
+
+@pytest.fixture(autouse=True)
+def clear_board_response_cache():
+    """Test databases reuse board ids and versions, so cached responses would leak."""
+    response_cache().clear()
+    stats.clear()
+    yield
+    response_cache().clear()
+
+
+@pytest.fixture
+def app_log(caplog):
+    """
+    ``caplog`` for the ``trello_app`` logger, which does not propagate to
+    the root logger that ``caplog`` listens on.
+    """
+    logger = logging.getLogger("trello_app")
+    logger.addHandler(caplog.handler)
+    yield caplog
+    logger.removeHandler(caplog.handler)
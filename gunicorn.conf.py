@@ -0,0 +1,30 @@
+"""
+Gunicorn settings, read from the working directory.
+
+With METRICS_MULTIPROC_DIR set, the workers share their Prometheus
+metrics through that directory (see Trello/metrics.py): it is emptied
+when the server starts, and the gauges of exited workers are dropped.
+
+Each worker logs to, and rotates, its own logs/app.<pid>.log; renaming
+a file other processes are still appending to would lose their records.
+"""
+import glob
+import os
+
+os.environ.setdefault("LOG_FILE", "app.{pid}.log")
+
+
+def on_starting(server):
+    directory = os.environ.get("METRICS_MULTIPROC_DIR")
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+        for path in glob.glob(os.path.join(directory, "*.json")):
+            os.remove(path)
+
+
+def child_exit(server, worker):
+    directory = os.environ.get("METRICS_MULTIPROC_DIR")
+    if directory:
+        from Trello.metrics import mark_process_dead
+
+        mark_process_dead(worker.pid, directory)
@@ -0,0 +1,139 @@
+"""
+Cold storage for completed tasks.
+
+``archive_tasks()`` moves DONE tasks that have not changed for a while,
+with their label links, from ``tasks_task`` into ``tasks_archivedtask``
+in batches, so that the hot table and every board query only see live
+rows. ``restore_tasks()`` moves them back with the same ids. Rows are
+copied with ``INSERT ... SELECT``, never loaded as models.
+
+Both keep the counters, search index, board versions, change sequences
+and tombstones in step, as the other task write paths do.
+"""
+from collections import Counter
+from datetime import datetime
+from typing import Iterable, Optional
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from boards.events import publish_board_event
+from boards.versioning import bump_board_version
+from . import counters
+from .changes import clear_tombstones, record_deletions
+from .models import ArchivedTask, ArchivedTaskLabel, Task
+from .search import get_search_backend
+from .signals import suspend_task_signals
+
+# columns shared by tasks_task and tasks_archivedtask, copied verbatim
+COPIED_COLUMNS = (
+    "id", "title", "description", "start_date", "due_date", "status", "assignee_id",
+    "board_id", "position", "created_at",
+)
+
+
+def archive_candidates(before: datetime, board_ids: Optional[Iterable[int]] = None):
+    """Return DONE tasks last changed before ``before``, oldest id first."""
+    queryset = Task.objects.filter(status="DONE", updated_at__lt=before)
+    if board_ids:
+        queryset = queryset.filter(board_id__in=list(board_ids))
+    return queryset.order_by("id")
+
+
+def archive_tasks(before: datetime, board_ids: Optional[Iterable[int]] = None, batch_size: int = 1000) -> int:
+    """
+    Archive completed tasks last changed before ``before``, one
+    transaction per batch. Returns the number of tasks archived.
+    """
+    total = 0
+    while True:
+        archived = _archive_batch(before, board_ids, batch_size)
+        total += archived
+        if archived < batch_size:
+            return total
+
+
+@transaction.atomic
+def _archive_batch(before: datetime, board_ids, batch_size: int) -> int:
+    rows = list(
+        archive_candidates(before, board_ids).select_for_update().values_list("id", "board_id")[:batch_size]
+    )
+    if not rows:
+        return 0
+    task_ids = [pk for pk, _ in rows]
+    by_board: dict[int, list[int]] = {}
+    for pk, board_id in rows:
+        by_board.setdefault(board_id, []).append(pk)
+
+    label_deltas = Counter()
+    label_deltas.subtract(counters.label_counts_for_tasks(task_ids))
+    _copy(
+        Task._meta.db_table, ArchivedTask._meta.db_table, COPIED_COLUMNS,
+        extra={"updated_at": "updated_at", "change_seq": "change_seq", "archived_at": "%s"},
+        params=[timezone.now()], task_ids=task_ids,
+    )
+    _copy_links(Task.labels.through._meta.db_table, ArchivedTaskLabel._meta.db_table, task_ids)
+    with suspend_task_signals():
+        Task.objects.filter(pk__in=task_ids).delete()
+
+    seqs = bump_board_version(*by_board)
+    for board_id, ids in by_board.items():
+        counters.apply_status_deltas(board_id, Counter({"DONE": -len(ids)}))
+        record_deletions(board_id, "task", ids, seqs[board_id])
+    counters.apply_label_deltas(label_deltas)
+    get_search_backend().remove_tasks(task_ids)
+    return len(rows)
+
+
+@transaction.atomic
+def restore_tasks(board_id: int, task_ids: Iterable[int]) -> list[int]:
+    """
+    Move archived tasks of a board back into the live table with their
+    original ids, as changed now. Returns the ids that were restored.
+    """
+    rows = list(
+        ArchivedTask.objects.filter(board_id=board_id, pk__in=list(task_ids))
+        .select_for_update()
+        .values_list("id", "status")
+    )
+    if not rows:
+        return []
+    task_ids = [pk for pk, _ in rows]
+    seq = bump_board_version(board_id)[board_id]
+
+    _copy(
+        ArchivedTask._meta.db_table, Task._meta.db_table, COPIED_COLUMNS,
+        extra={"updated_at": "%s", "change_seq": "%s"}, params=[timezone.now(), seq], task_ids=task_ids,
+    )
+    _copy_links(ArchivedTaskLabel._meta.db_table, Task.labels.through._meta.db_table, task_ids)
+    ArchivedTask.objects.filter(pk__in=task_ids).delete()
+    clear_tombstones(board_id, "task", task_ids)
+
+    counters.apply_status_deltas(board_id, Counter(status for _, status in rows))
+    counters.apply_label_deltas(counters.label_counts_for_tasks(task_ids))
+    get_search_backend().index_tasks(task_ids)
+    publish_board_event(board_id, "task.created", seq, task_ids)
+    return task_ids
+
+
+def _copy(source: str, target: str, columns, extra: dict, params: list, task_ids: list[int]) -> None:
+    """``INSERT INTO target (...) SELECT ... FROM source WHERE id IN (...)``."""
+    placeholders = ", ".join(["%s"] * len(task_ids))
+    target_columns = ", ".join([*columns, *extra])
+    source_columns = ", ".join([*columns, *extra.values()])
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {target} ({target_columns}) SELECT {source_columns} FROM {source} "
+            f"WHERE id IN ({placeholders})",
+            [*params, *task_ids],
+        )
+
+
+def _copy_links(source: str, target: str, task_ids: list[int]) -> None:
+    placeholders = ", ".join(["%s"] * len(task_ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {target} (task_id, label_id) SELECT task_id, label_id FROM {source} "
+            f"WHERE task_id IN ({placeholders})",
+            task_ids,
+        )
@@ -0,0 +1,79 @@
+"""
+Helpers shared by the benchmark management commands.
+"""
+import http.client
+import io
+import statistics
+import sys
+import time
+from urllib.parse import urlsplit
+
+from django.core.handlers.wsgi import WSGIHandler
+
+
+def latency_summary(name: str, timings: list[float], errors: int, elapsed: float) -> dict:
+    """
+    Summarize request timings (in seconds) measured over ``elapsed``
+    seconds as throughput and latency percentiles in milliseconds.
+    """
+    timings = sorted(timing * 1000 for timing in timings)
+
+    def percentile(value: float) -> float:
+        return timings[min(len(timings) - 1, int(len(timings) * value))]
+
+    return {
+        "name": name,
+        "requests": len(timings),
+        "errors": errors,
+        "rps": len(timings) / elapsed,
+        "p50_ms": statistics.median(timings),
+        "p95_ms": percentile(0.95),
+        "p99_ms": percentile(0.99),
+    }
+
+
+class WSGIClient:
+    """
+    Issue GETs through Django's WSGI handler in-process, without a web
+    server, so the timings measure Django and the database only.
+    """
+
+    def __init__(self, token: str):
+        self.handler = WSGIHandler()
+        self.token = token
+
+    def get(self, path: str) -> tuple[float, bool]:
+        """Return the duration of a GET and whether it answered 200."""
+        path, _, query = path.partition("?")
+        environ = {
+            "REQUEST_METHOD": "GET", "PATH_INFO": path, "QUERY_STRING": query, "SERVER_NAME": "localhost",
+            "SERVER_PORT": "80", "HTTP_HOST": "localhost", "HTTP_AUTHORIZATION": self.token,
+            "wsgi.input": io.BytesIO(), "wsgi.url_scheme": "http", "wsgi.errors": sys.stderr,
+        }
+        statuses = []
+        started = time.perf_counter()
+        response = self.handler(environ, lambda status, headers: statuses.append(status))
+        b"".join(response)
+        response.close()
+        return time.perf_counter() - started, statuses[0].startswith("200")
+
+
+class HTTPClient:
+    """Issue GETs against a running server, one connection per thread."""
+
+    def __init__(self, base_url: str, token: str):
+        parts = urlsplit(base_url)
+        self.connection_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        self.netloc = parts.netloc
+        self.token = token
+
+    def get(self, path: str) -> tuple[float, bool]:
+        connection = self.connection_class(self.netloc, timeout=30)
+        try:
+            started = time.perf_counter()
+            connection.request("GET", path, headers={"Authorization": self.token})
+            response = connection.getresponse()
+            response.read()
+            return time.perf_counter() - started, response.status == 200
+        finally:
+            connection.close()
@@ -0,0 +1,72 @@
+from typing import Iterable
+
+from django.utils import timezone
+
+from boards.events import publish_board_event
+from boards.models import Board
+from boards.versioning import bump_board_version
+from .models import Label, Task, Tombstone
+
+
+def mark_tasks_changed(board_id: int, task_ids: Iterable[int]) -> int:
+    """
+    Advance the board's change sequence and stamp the tasks with it.
+
+    Used for changes that do not go through ``Task.save()``, such as
+    label links. Returns the new sequence.
+    """
+    task_ids = list(task_ids)
+    seq = bump_board_version(board_id)[board_id]
+    Task.objects.filter(pk__in=task_ids).update(change_seq=seq, updated_at=timezone.now())
+    publish_board_event(board_id, "task.updated", seq, task_ids)
+    return seq
+
+
+def record_deletions(board_id: int, kind: str, object_ids: Iterable[int], seq: int) -> None:
+    """
+    Leave tombstones for objects deleted from a board at ``seq`` and
+    tell open event streams.
+    """
+    object_ids = list(object_ids)
+    Tombstone.objects.bulk_create(
+        Tombstone(board_id=board_id, kind=kind, object_id=pk, seq=seq) for pk in object_ids
+    )
+    publish_board_event(board_id, f"{kind}.deleted", seq, object_ids)
+
+
+def clear_tombstones(board_id: int, kind: str, object_ids: Iterable[int]) -> None:
+    """
+    Drop the tombstones of objects that are live on a board again
+    (restored from the archive or moved back), so the changes feed does
+    not list them as both changed and deleted.
+    """
+    Tombstone.objects.filter(board_id=board_id, kind=kind, object_id__in=list(object_ids)).delete()
+
+
+def changes_since(board_id: int, since: int) -> dict:
+    """
+    Return the tasks, labels and deletions of a board after ``since``.
+
+    ``since=0`` means a full sync: every live object and no tombstones.
+    The returned ``seq`` is read first, so rows changed while this runs
+    may be sent again on the next call but are never skipped.
+    """
+    seq = Board.objects.filter(pk=board_id).values_list("version", flat=True).first()
+    tasks = Task.objects.filter(board_id=board_id)
+    labels = Label.objects.filter(board_id=board_id)
+    tombstones = Tombstone.objects.none()
+    if since > 0:
+        tasks = tasks.filter(change_seq__gt=since)
+        labels = labels.filter(change_seq__gt=since)
+        tombstones = Tombstone.objects.filter(board_id=board_id, seq__gt=since)
+
+    deleted = {"tasks": [], "labels": []}
+    for kind, object_id in tombstones.order_by("seq").values_list("kind", "object_id"):
+        deleted[f"{kind}s"].append(object_id)
+
+    return {
+        "seq": seq,
+        "tasks": tasks.order_by("change_seq", "id").with_related(),
+        "labels": labels.order_by("change_seq", "id").with_related(),
+        "deleted": deleted,
+    }
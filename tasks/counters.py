@@ -0,0 +1,102 @@
+from collections import Counter
+from typing import Iterable, Optional
+
+from django.db import transaction
+from django.db.models import Count, F
+
+from .models import BoardStatusCount, Label, Task
+
+
+def apply_status_deltas(board_id: int, deltas: Counter) -> None:
+    """
+    Add ``deltas`` (status -> change) to the board's status counters.
+    """
+    for status, delta in deltas.items():
+        if not delta:
+            continue
+        updated = BoardStatusCount.objects.filter(board_id=board_id, status=status).update(
+            count=F("count") + delta
+        )
+        if not updated:
+            counter, created = BoardStatusCount.objects.get_or_create(
+                board_id=board_id, status=status, defaults={"count": delta}
+            )
+            if not created:
+                BoardStatusCount.objects.filter(pk=counter.pk).update(count=F("count") + delta)
+
+
+def apply_label_deltas(deltas: Counter) -> None:
+    """
+    Add ``deltas`` (label id -> change) to the labels' task counters,
+    with one UPDATE per distinct delta.
+    """
+    by_delta: dict[int, list[int]] = {}
+    for label_id, delta in deltas.items():
+        if delta:
+            by_delta.setdefault(delta, []).append(label_id)
+    for delta, label_ids in by_delta.items():
+        Label.objects.filter(pk__in=label_ids).update(task_count=F("task_count") + delta)
+
+
+def label_counts_for_tasks(task_ids: Iterable[int]) -> Counter:
+    """
+    Return how many of the given tasks carry each label.
+    """
+    rows = (
+        Task.labels.through.objects.filter(task_id__in=list(task_ids))
+        .values("label_id")
+        .annotate(count=Count("id"))
+        .values_list("label_id", "count")
+    )
+    return Counter(dict(rows))
+
+
+def rebuild_counters(board_ids: Optional[Iterable[int]] = None, dry_run: bool = False) -> list[str]:
+    """
+    Recompute status and label counters from the task table and fix
+    any that drifted.
+
+    Returns a description of every counter that was (or, with
+    ``dry_run``, would be) changed.
+    """
+    tasks = Task.objects.all()
+    counters = BoardStatusCount.objects.all()
+    labels = Label.objects.all()
+    if board_ids is not None:
+        board_ids = list(board_ids)
+        tasks = tasks.filter(board_id__in=board_ids)
+        counters = counters.filter(board_id__in=board_ids)
+        labels = labels.filter(board_id__in=board_ids)
+
+    actual = {
+        (row["board_id"], row["status"]): row["count"]
+        for row in tasks.values("board_id", "status").annotate(count=Count("id")).order_by()
+    }
+    stored = {(counter.board_id, counter.status): counter for counter in counters}
+
+    changes = []
+    to_create, to_update = [], []
+    for key in actual.keys() | stored.keys():
+        count = actual.get(key, 0)
+        counter = stored.get(key)
+        if counter is None:
+            to_create.append(BoardStatusCount(board_id=key[0], status=key[1], count=count))
+            changes.append(f"board {key[0]} status {key[1]}: 0 -> {count}")
+        elif counter.count != count:
+            changes.append(f"board {key[0]} status {key[1]}: {counter.count} -> {count}")
+            counter.count = count
+            to_update.append(counter)
+
+    stale_labels = []
+    for label in labels.annotate(actual=Count("tasks")):
+        if label.task_count != label.actual:
+            changes.append(f"label {label.pk}: {label.task_count} -> {label.actual}")
+            label.task_count = label.actual
+            stale_labels.append(label)
+
+    if not dry_run:
+        with transaction.atomic():
+            BoardStatusCount.objects.bulk_create(to_create)
+            BoardStatusCount.objects.bulk_update(to_update, ["count"])
+            Label.objects.bulk_update(stale_labels, ["task_count"])
+    return changes
@@ -0,0 +1,38 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from tasks.archive import archive_candidates, archive_tasks
+
+
+class Command(BaseCommand):
+    """
+    Move DONE tasks that have not changed for ``--days`` days into the
+    archive tables, in batches of one transaction each. Meant to run
+    from a scheduler such as cron, e.g. nightly.
+    """
+    help = "Archive old completed tasks out of the live task table."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days", type=int, default=settings.TASK_ARCHIVE_AFTER_DAYS,
+            help="Archive DONE tasks unchanged for this many days.",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--board", type=int, action="append", dest="boards",
+            help="Only archive tasks of this board (may be repeated).",
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Only count the tasks that would be archived.")
+
+    def handle(self, *args, days, batch_size, boards=None, dry_run=False, **options):
+        before = timezone.now() - timedelta(days=days)
+        if dry_run:
+            count = archive_candidates(before, boards).count()
+            self.stdout.write(f"{count} task(s) would be archived.")
+            return
+
+        count = archive_tasks(before, boards, batch_size=batch_size)
+        self.stdout.write(self.style.SUCCESS(f"{count} task(s) archived."))
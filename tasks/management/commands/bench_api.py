@@ -0,0 +1,162 @@
+import json
+import platform
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from boards.cache import response_cache
+from boards.models import Board
+from tasks.benchmarks import HTTPClient, WSGIClient, latency_summary
+from tasks.models import Label, Task
+from tasks.seeding import WORDS
+from workspaces.membership import role_cache
+
+
+class Command(BaseCommand):
+    """
+    Drive every read endpoint of the API under concurrent load against a
+    seeded database (see ``seed_bench``) and report throughput, latency
+    percentiles and queries per request as JSON.
+
+    Requests go through Django's WSGI handler in-process, or to a
+    running server with ``--base-url``. Queries are counted in-process
+    before the load run, on a request with empty role and response
+    caches and on a warm one. Save the output with ``--output`` and
+    pass it as ``--compare`` on a later run to fail on regressions.
+    """
+    help = "Load-benchmark the API endpoints on a seeded dataset and report JSON results."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=500, help="Requests per endpoint.")
+        parser.add_argument("--concurrency", type=int, default=8)
+        parser.add_argument("--endpoint", action="append", dest="endpoints", help="Only run this endpoint.")
+        parser.add_argument("--base-url", help="Benchmark a running server, e.g. http://localhost:8000.")
+        parser.add_argument("--output", help="Also write the results to this file.")
+        parser.add_argument("--compare", help="Results of an earlier run to compare against.")
+        parser.add_argument(
+            "--tolerance", type=float, default=0.2,
+            help="Relative p95 / throughput change that counts as a regression (default 0.2).",
+        )
+
+    def handle(self, *args, **options):
+        board = Board.objects.order_by("id").select_related("workspace").first()
+        if board is None:
+            raise CommandError("No data to benchmark: run `manage.py seed_bench` first.")
+        if settings.DEBUG:
+            self.stderr.write("DEBUG is on: every query is recorded, which slows every endpoint down.")
+
+        user = board.workspace.owner
+        token = f"Bearer {AccessToken.for_user(user)}"
+        endpoints = self.endpoints(board)
+        if options["endpoints"]:
+            unknown = set(options["endpoints"]) - endpoints.keys()
+            if unknown:
+                raise CommandError(f"Unknown endpoints: {', '.join(sorted(unknown))}")
+            endpoints = {name: endpoints[name] for name in options["endpoints"]}
+
+        local = WSGIClient(token)
+        client = HTTPClient(options["base_url"], token) if options["base_url"] else local
+        results = []
+        for name, path in endpoints.items():
+            queries = [self.count_queries(local, path, cold) for cold in (True, False)]
+            timings, errors, elapsed = self.load(client, path, options)
+            results.append({
+                **latency_summary(name, timings, errors, elapsed),
+                "path": path,
+                "queries_cold": queries[0],
+                "queries_warm": queries[1],
+            })
+
+        report = {
+            "meta": {
+                "vendor": connection.vendor,
+                "python": platform.python_version(),
+                "target": options["base_url"] or "wsgi (in-process)",
+                "concurrency": options["concurrency"],
+                "requests": options["requests"],
+                "dataset": {"tasks": Task.objects.count(), "boards": Board.objects.count()},
+                "response_cache": settings.BOARD_RESPONSE_CACHE,
+                "fast_read_path": settings.FAST_READ_PATH,
+            },
+            "endpoints": results,
+        }
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                file.write(output + "\n")
+        self.stdout.write(output)
+
+        if options["compare"]:
+            self.compare(report, options["compare"], options["tolerance"])
+
+    def endpoints(self, board: Board) -> dict[str, str]:
+        """Return the path of each benchmarked endpoint on the hottest board."""
+        workspace_id = board.workspace_id
+        board_kwargs = {"workspace_pk": workspace_id, "board_pk": board.pk}
+        task_id = Task.objects.filter(board=board).order_by("id").values_list("id", flat=True).first()
+        label_id = Label.objects.filter(board=board).order_by("id").values_list("id", flat=True).first()
+        paths = {
+            "workspace list": reverse("workspace-list-create"),
+            "workspace list with counts": reverse("workspace-list-create") + "?with_counts=true",
+            "workspace detail": reverse("workspace-detail", kwargs={"pk": workspace_id}),
+            "workspace dashboard": reverse("workspace-dashboard", kwargs={"workspace_pk": workspace_id}),
+            "workspace search": reverse("workspace-search", kwargs={"workspace_pk": workspace_id}) + f"?q={WORDS[0]}",
+            "board list": reverse("board-list-create", kwargs={"workspace_pk": workspace_id}),
+            "board detail": reverse("board-detail", kwargs={"workspace_pk": workspace_id, "pk": board.pk}),
+            "task list": reverse("task-list-create", kwargs=board_kwargs),
+            "task column": reverse("task-list-create", kwargs=board_kwargs) + "?status=TODO",
+            "label list": reverse("label-list-create", kwargs=board_kwargs),
+            "board report": reverse("board-report", kwargs=board_kwargs),
+            "board snapshot": reverse("board-snapshot", kwargs=board_kwargs),
+            "board changes": reverse("board-changes", kwargs=board_kwargs) + f"?since={max(board.version - 1, 0)}",
+            "board archive": reverse("board-archive", kwargs=board_kwargs),
+            "my tasks": reverse("my-tasks"),
+        }
+        if task_id is not None:
+            paths["task detail"] = reverse("task-detail", kwargs={**board_kwargs, "pk": task_id})
+        if label_id is not None:
+            paths["label detail"] = reverse("label-detail", kwargs={**board_kwargs, "pk": label_id})
+        return paths
+
+    @staticmethod
+    def count_queries(client: WSGIClient, path: str, cold: bool) -> int:
+        if cold:
+            role_cache.clear()
+            response_cache().clear()
+        with CaptureQueriesContext(connection) as context:
+            client.get(path)
+        return len(context)
+
+    @staticmethod
+    def load(client, path: str, options):
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["concurrency"]) as pool:
+            results = list(pool.map(lambda _: client.get(path), range(options["requests"])))
+        return [timing for timing, _ in results], sum(not ok for _, ok in results), time.perf_counter() - started
+
+    def compare(self, report: dict, baseline_path: str, tolerance: float) -> None:
+        """Print the change of every endpoint against a saved run; fail on regressions."""
+        with open(baseline_path) as file:
+            baseline = {endpoint["name"]: endpoint for endpoint in json.load(file)["endpoints"]}
+
+        regressions = []
+        for endpoint in report["endpoints"]:
+            before = baseline.get(endpoint["name"])
+            if before is None:
+                continue
+            p95 = endpoint["p95_ms"] / before["p95_ms"] - 1 if before["p95_ms"] else 0.0
+            rps = endpoint["rps"] / before["rps"] - 1 if before["rps"] else 0.0
+            queries = endpoint["queries_cold"] - before["queries_cold"]
+            self.stderr.write(
+                f"{endpoint['name']:<28} p95 {p95:+.0%}  rps {rps:+.0%}  queries {queries:+d}"
+            )
+            if p95 > tolerance or rps < -tolerance or queries > 0:
+                regressions.append(endpoint["name"])
+        if regressions:
+            raise CommandError(f"Regressed against {baseline_path}: {', '.join(regressions)}")
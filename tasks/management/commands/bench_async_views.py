@@ -0,0 +1,155 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.handlers.asgi import ASGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from boards.models import Board
+from tasks.benchmarks import WSGIClient, latency_summary
+from tasks.counters import rebuild_counters
+from tasks.models import Label, Task
+from workspaces.models import Workspace, WorkspaceMember
+
+User = get_user_model()
+
+SERVERS = ("wsgi", "asgi")
+
+
+class Command(BaseCommand):
+    """
+    Drive the read-heavy endpoints through Django's WSGI handler (sync
+    views, a thread per in-flight request) and its ASGI handler (async
+    views, one event loop) with the same concurrent load, and report
+    requests/sec and latency percentiles for each.
+
+    The handlers are called in-process, so the numbers measure Django
+    and the database rather than a particular web server. Each server
+    runs in its own subprocess because ``ASYNC_READ_VIEWS`` is fixed
+    when the URLconf loads.
+    """
+    help = "Compare the async ASGI read path with the sync WSGI path under concurrent load."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--server", choices=(*SERVERS, "both"), default="both")
+        parser.add_argument("--requests", type=int, default=2_000, help="Requests per endpoint.")
+        parser.add_argument("--concurrency", type=int, default=32)
+        parser.add_argument("--tasks", type=int, default=200, help="Tasks on the benchmark board.")
+        parser.add_argument("--json", action="store_true", help="Print machine-readable results.")
+
+    def handle(self, *args, **options):
+        if settings.DEBUG:
+            self.stderr.write("DEBUG is on: every query is recorded, which slows both servers down.")
+
+        if options["server"] == "both":
+            results = [self.run_subprocess(server, options) for server in SERVERS]
+        else:
+            results = [self.run(options["server"], options)]
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        for result in results:
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{result['server']} (concurrency {result['concurrency']})"))
+            for endpoint in result["endpoints"]:
+                self.stdout.write(
+                    f"{endpoint['name']:<16} {endpoint['rps']:>8.1f} req/s  "
+                    f"p50={endpoint['p50_ms']:.1f}ms p99={endpoint['p99_ms']:.1f}ms errors={endpoint['errors']}"
+                )
+
+    def run_subprocess(self, server: str, options) -> dict:
+        env = {**os.environ, "ASYNC_READ_VIEWS": "1" if server == "asgi" else "0"}
+        command = [
+            sys.executable, "-m", "django", "bench_async_views", "--json", "--server", server,
+            "--requests", str(options["requests"]), "--concurrency", str(options["concurrency"]),
+            "--tasks", str(options["tasks"]),
+        ]
+        completed = subprocess.run(command, env=env, capture_output=True, text=True)
+        if completed.returncode:
+            raise CommandError(completed.stderr)
+        return json.loads(completed.stdout)[0]
+
+    def run(self, server: str, options) -> dict:
+        if settings.ASYNC_READ_VIEWS != (server == "asgi"):
+            raise CommandError(f"Set ASYNC_READ_VIEWS={int(server == 'asgi')} to benchmark {server}.")
+        token, paths = self.seed(options["tasks"])
+        endpoints = []
+        for name, path in paths.items():
+            if server == "wsgi":
+                timings, errors, elapsed = self.load_wsgi(path, token, options)
+            else:
+                timings, errors, elapsed = asyncio.run(self.load_asgi(path, token, options))
+            endpoints.append(latency_summary(name, timings, errors, elapsed))
+        return {"server": server, "concurrency": options["concurrency"], "endpoints": endpoints}
+
+    def seed(self, task_count: int):
+        """Create (once) a user with a workspace and a board of tasks."""
+        user, created = User.objects.get_or_create(username="bench_async", defaults={"email": "bench@example.com"})
+        if created:
+            workspace = Workspace.objects.create(name="Bench", owner=user)
+            WorkspaceMember.objects.create(workspace=workspace, user=user, role="OWNER")
+            board = Board.objects.create(title="Bench", workspace=workspace)
+            labels = [Label.objects.create(name=f"Label {i}", board=board) for i in range(3)]
+            tasks = Task.objects.bulk_create(
+                Task(title=f"Task {i}", board=board, assignee=user) for i in range(task_count)
+            )
+            Task.labels.through.objects.bulk_create(
+                Task.labels.through(task_id=task.pk, label_id=labels[i % 3].pk) for i, task in enumerate(tasks)
+            )
+            rebuild_counters([board.pk])
+        board = Board.objects.filter(workspace__owner=user).first()
+        kwargs = {"workspace_pk": board.workspace_id, "board_pk": board.pk}
+        paths = {
+            "task list": reverse("task-list-create", kwargs=kwargs),
+            "board report": reverse("board-report", kwargs=kwargs),
+            "workspace list": reverse("workspace-list-create"),
+        }
+        return f"Bearer {AccessToken.for_user(user)}", paths
+
+    def load_wsgi(self, path: str, token: str, options):
+        client = WSGIClient(token)
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["concurrency"]) as pool:
+            results = list(pool.map(lambda _: client.get(path), range(options["requests"])))
+        return [timing for timing, _ in results], sum(not ok for _, ok in results), time.perf_counter() - started
+
+    async def load_asgi(self, path: str, token: str, options):
+        handler = ASGIHandler()
+        limit = asyncio.Semaphore(options["concurrency"])
+        never = asyncio.Event()
+
+        async def request() -> tuple[float, bool]:
+            scope = {
+                "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+                "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"",
+                "root_path": "", "headers": [(b"host", b"localhost"), (b"authorization", token.encode())],
+                "client": ("127.0.0.1", 0), "server": ("localhost", 80),
+            }
+            messages = [{"type": "http.request", "body": b"", "more_body": False}]
+            statuses = []
+
+            async def receive():
+                if messages:
+                    return messages.pop()
+                await never.wait()
+
+            async def send(message):
+                if message["type"] == "http.response.start":
+                    statuses.append(message["status"])
+
+            async with limit:
+                started = time.perf_counter()
+                await handler(scope, receive, send)
+                return time.perf_counter() - started, statuses[0] == 200
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(request() for _ in range(options["requests"])))
+        return [timing for timing, _ in results], sum(not ok for _, ok in results), time.perf_counter() - started
@@ -0,0 +1,99 @@
+import json
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from boards.models import Board
+from tasks.counters import rebuild_counters
+from tasks.models import Label, Task
+from tasks.rows import task_rows, task_values
+from tasks.serializers import TaskSerializer
+from Trello.fast_read import orjson_matches_drf, render_json
+from workspaces.models import Workspace, WorkspaceMember
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    """
+    Time rendering one page of a task list through TaskSerializer and
+    JSONRenderer against the values() rows of tasks.rows, encoded with
+    orjson (when installed) and with the stdlib encoder, and check that
+    all of them produce the same bytes.
+    """
+    help = "Microbenchmark the serializer-free task list path against the DRF serializer."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tasks", type=int, default=500, help="Tasks on the page.")
+        parser.add_argument("--labels", type=int, default=3, help="Labels per task.")
+        parser.add_argument("--repeat", type=int, default=50)
+        parser.add_argument("--json", action="store_true", help="Print machine-readable results.")
+
+    def handle(self, *args, **options):
+        board = self.seed(options["tasks"], options["labels"])
+        queryset = Task.objects.filter(board=board).with_related().order_by("created_at", "id")
+
+        def drf() -> bytes:
+            return JSONRenderer().render(TaskSerializer(queryset, many=True).data)
+
+        def fast(use_orjson: bool):
+            def run() -> bytes:
+                rows, exact_floats = task_rows(list(task_values(queryset)))
+                return render_json(rows, exact_floats and use_orjson)
+            return run
+
+        cases = {"drf serializer": drf, "values + stdlib json": fast(False)}
+        if orjson_matches_drf():
+            cases["values + orjson"] = fast(True)
+
+        expected = drf()
+        results = []
+        for name, render in cases.items():
+            identical = render() == expected
+            timings = []
+            for _ in range(options["repeat"]):
+                started = time.perf_counter()
+                render()
+                timings.append((time.perf_counter() - started) * 1000)
+            results.append({
+                "name": name,
+                "tasks": options["tasks"],
+                "median_ms": statistics.median(timings),
+                "min_ms": min(timings),
+                "identical": identical,
+            })
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        baseline = results[0]["median_ms"]
+        for result in results:
+            self.stdout.write(
+                f"{result['name']:<22} median={result['median_ms']:8.2f}ms min={result['min_ms']:8.2f}ms "
+                f"x{baseline / result['median_ms']:.1f} identical={result['identical']}"
+            )
+
+    def seed(self, task_count: int, label_count: int) -> Board:
+        """Create (once) a board with ``task_count`` labelled tasks."""
+        title = f"Fast read {task_count}x{label_count}"
+        board = Board.objects.filter(title=title).first()
+        if board is not None:
+            return board
+        user, _ = User.objects.get_or_create(username="bench_fast_read", defaults={"email": "fast@example.com"})
+        workspace = Workspace.objects.create(name="Bench", owner=user)
+        WorkspaceMember.objects.create(workspace=workspace, user=user, role="OWNER")
+        board = Board.objects.create(title=title, workspace=workspace)
+        labels = [Label.objects.create(name=f"Label {i}", board=board) for i in range(label_count)]
+        tasks = Task.objects.bulk_create(
+            Task(title=f"Task {i}", description="Details " * 10, board=board, assignee=user,
+                 position=(i + 1) * Task.POSITION_STEP)
+            for i in range(task_count)
+        )
+        Task.labels.through.objects.bulk_create(
+            Task.labels.through(task_id=task.pk, label_id=label.pk) for task in tasks for label in labels
+        )
+        rebuild_counters([board.pk])
+        return board
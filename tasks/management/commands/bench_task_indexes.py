@@ -0,0 +1,93 @@
+import json
+import statistics
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from boards.models import Board
+from tasks.models import Task
+from tasks.seeding import SeedOptions, Seeder
+from workspaces.models import Workspace, WorkspaceMember
+
+
+class Command(BaseCommand):
+    """
+    Seed a synthetic dataset with tasks.seeding (unless one of the
+    requested size exists) and report query plans and timings for the
+    hot task access patterns that the composite and partial indexes serve.
+    """
+    help = "Benchmark the task access-pattern indexes on a seeded dataset."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tasks", type=int, default=1_000_000)
+        parser.add_argument("--users", type=int, default=2_000)
+        parser.add_argument("--workspaces", type=int, default=200)
+        parser.add_argument("--boards", type=int, default=2_000)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--repeat", type=int, default=20, help="Runs per query.")
+        parser.add_argument("--analyze", action="store_true", help="Use EXPLAIN ANALYZE (PostgreSQL).")
+        parser.add_argument("--json", action="store_true", help="Print machine-readable results.")
+
+    def handle(self, *args, **options):
+        if Task.objects.count() < options["tasks"]:
+            started = time.perf_counter()
+            seed_options = SeedOptions(
+                users=options["users"], workspaces=options["workspaces"], boards=options["boards"],
+                tasks=options["tasks"], seed=options["seed"],
+            )
+            Seeder(seed_options).run()
+            self.stderr.write(f"Seeded in {time.perf_counter() - started:.1f}s")
+
+        results = [self.measure(name, queryset, options) for name, queryset in self.queries()]
+
+        if options["json"]:
+            self.stdout.write(json.dumps({"vendor": connection.vendor, "queries": results}, indent=2))
+            return
+        for result in results:
+            self.stdout.write(self.style.MIGRATE_HEADING(result["name"]))
+            self.stdout.write(result["plan"])
+            self.stdout.write(
+                f"rows={result['rows']} min={result['min_ms']:.2f}ms "
+                f"median={result['median_ms']:.2f}ms p95={result['p95_ms']:.2f}ms\n"
+            )
+
+    def queries(self):
+        """Yield the benchmarked access patterns with realistic parameters."""
+        hot_board = Board.objects.order_by("id").values_list("id", flat=True).first()
+        user_id = WorkspaceMember.objects.order_by("id").values_list("user_id", flat=True).first()
+        workspace_id = WorkspaceMember.objects.filter(user_id=user_id).values_list("workspace_id", flat=True).first()
+        today = date.today()
+
+        yield "board + status", Task.objects.filter(board_id=hot_board, status="DOING")
+        yield "assignee + status", Task.objects.filter(assignee_id=user_id, status="TODO")
+        yield "my tasks due this month", Task.objects.filter(assignee_id=user_id).visible_to(user_id).filter(
+            status__in=["TODO", "DOING"], due_date__gte=today, due_date__lte=today + timedelta(days=30)
+        ).order_by("created_at", "id")[:50]
+        yield "open tasks due this week", Task.objects.open().filter(
+            due_date__gte=today, due_date__lt=today + timedelta(days=7)
+        ).order_by("due_date")[:200]
+        yield "workspaces of a user", Workspace.objects.visible_to(user_id).order_by("created_at", "id")
+        yield "role of a user", WorkspaceMember.objects.filter(
+            user_id=user_id, workspace_id=workspace_id
+        ).values("role")
+
+    def measure(self, name, queryset, options) -> dict:
+        explain_options = {"analyze": True} if options["analyze"] and connection.vendor == "postgresql" else {}
+        plan = queryset.explain(**explain_options)
+        timings = []
+        rows = 0
+        for _ in range(options["repeat"]):
+            started = time.perf_counter()
+            rows = len(list(queryset.all()))
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        return {
+            "name": name,
+            "plan": plan,
+            "rows": rows,
+            "min_ms": timings[0],
+            "median_ms": statistics.median(timings),
+            "p95_ms": timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+        }
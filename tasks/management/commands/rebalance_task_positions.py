@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from tasks.models import Task
+from tasks.ranking import rebalance_column
+
+
+class Command(BaseCommand):
+    """
+    Respace the task positions of status columns evenly, keeping their
+    order. Moves schedule this automatically for columns that became too
+    dense; run it after bulk imports that left positions unset.
+    """
+    help = "Rebalance the fractional task positions of board columns."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--board", type=int, action="append", dest="boards",
+            help="Only rebalance this board (may be repeated).",
+        )
+
+    def handle(self, *args, boards=None, **options):
+        columns = Task.objects.order_by("board_id", "status").values_list("board_id", "status").distinct()
+        if boards:
+            columns = columns.filter(board_id__in=boards)
+
+        total = 0
+        for board_id, status in columns:
+            total += rebalance_column(board_id, status)
+        self.stdout.write(self.style.SUCCESS(f"{len(columns)} column(s), {total} task(s) rebalanced."))
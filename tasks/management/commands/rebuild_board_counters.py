@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from tasks.counters import rebuild_counters
+
+
+class Command(BaseCommand):
+    """
+    Recompute the per-board status and label counters from the task
+    table and fix any that drifted.
+    """
+    help = "Rebuild or check the denormalized board status and label counters."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--board", type=int, action="append", dest="boards",
+            help="Only reconcile this board (may be repeated).",
+        )
+        parser.add_argument(
+            "--check", action="store_true",
+            help="Report drifted counters without changing them.",
+        )
+
+    def handle(self, *args, boards=None, check=False, **options):
+        changes = rebuild_counters(board_ids=boards, dry_run=check)
+        for change in changes:
+            self.stdout.write(change)
+
+        if check:
+            self.stdout.write(f"{len(changes)} counter(s) out of date.")
+        else:
+            self.stdout.write(self.style.SUCCESS(f"{len(changes)} counter(s) fixed."))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from tasks.search import get_search_backend
+
+
+class Command(BaseCommand):
+    """
+    Rebuild the full-text task search index from the task table.
+    """
+    help = "Rebuild the full-text task search index."
+
+    def handle(self, *args, **options):
+        get_search_backend().rebuild()
+        self.stdout.write(self.style.SUCCESS("Search index rebuilt."))
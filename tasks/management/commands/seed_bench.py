@@ -0,0 +1,52 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+
+from tasks.seeding import SeedOptions, Seeder
+
+
+class Command(BaseCommand):
+    """
+    Fill the database with a deterministic synthetic dataset for the
+    benchmarks (see tasks.seeding). Run it on a dedicated database:
+    it adds thousands of users, workspaces and boards.
+    """
+    help = "Seed synthetic users, workspaces, boards, labels and tasks for benchmarking."
+
+    def add_arguments(self, parser):
+        defaults = SeedOptions()
+        parser.add_argument("--users", type=int, default=defaults.users)
+        parser.add_argument("--workspaces", type=int, default=defaults.workspaces)
+        parser.add_argument("--boards", type=int, default=defaults.boards)
+        parser.add_argument("--tasks", type=int, default=defaults.tasks)
+        parser.add_argument("--labels", type=int, default=defaults.labels, help="Labels per board.")
+        parser.add_argument("--members", type=int, default=defaults.members, help="Members per workspace.")
+        parser.add_argument("--seed", type=int, default=defaults.seed)
+        parser.add_argument("--batch-size", type=int, default=defaults.batch_size)
+        parser.add_argument("--skip-search-index", action="store_true", help="Do not rebuild the search index.")
+        parser.add_argument("--json", action="store_true", help="Print machine-readable results.")
+
+    def handle(self, *args, **options):
+        seed_options = SeedOptions(
+            users=options["users"],
+            workspaces=options["workspaces"],
+            boards=options["boards"],
+            tasks=options["tasks"],
+            labels=options["labels"],
+            members=options["members"],
+            seed=options["seed"],
+            batch_size=options["batch_size"],
+            search_index=not options["skip_search_index"],
+        )
+        progress = None if options["json"] else (lambda message: self.stderr.write(message))
+        started = time.perf_counter()
+        counts = Seeder(seed_options, progress).run()
+        elapsed = time.perf_counter() - started
+
+        if options["json"]:
+            self.stdout.write(json.dumps({"seconds": elapsed, "rows": counts}, indent=2))
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded in {elapsed:.1f}s: " + ", ".join(f"{count} {kind}" for kind, count in counts.items())
+        ))
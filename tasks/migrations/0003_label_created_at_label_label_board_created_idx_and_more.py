@@ -0,0 +1,31 @@
+# Generated by Django 5.0.3 on 2026-10-18 18:21
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boards', '0002_board_board_workspace_created_idx'),
+        ('tasks', '0002_label_task_labels'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='label',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name='label',
+            index=models.Index(fields=['board', 'created_at', 'id'], name='label_board_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['board', 'created_at', 'id'], name='task_board_created_idx'),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.0.3 on 2026-10-18 18:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_counters(apps, schema_editor):
+    """Populate the new counters from the existing tasks."""
+    Task = apps.get_model("tasks", "Task")
+    Label = apps.get_model("tasks", "Label")
+    BoardStatusCount = apps.get_model("tasks", "BoardStatusCount")
+
+    BoardStatusCount.objects.bulk_create(
+        BoardStatusCount(board_id=row["board_id"], status=row["status"], count=row["count"])
+        for row in Task.objects.values("board_id", "status").annotate(count=Count("id")).order_by()
+    )
+    labels = list(Label.objects.annotate(actual=Count("tasks")))
+    for label in labels:
+        label.task_count = label.actual
+    Label.objects.bulk_update(labels, ["task_count"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boards', '0002_board_board_workspace_created_idx'),
+        ('tasks', '0003_label_created_at_label_label_board_created_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='label',
+            name='task_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.CreateModel(
+            name='BoardStatusCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('TODO', 'To Do'), ('DOING', 'Doing'), ('DONE', 'Done'), ('SUSPEND', 'Suspend')], max_length=20)),
+                ('count', models.IntegerField(default=0)),
+                ('board', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='status_counts', to='boards.board')),
+            ],
+            options={
+                'unique_together': {('board', 'status')},
+            },
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
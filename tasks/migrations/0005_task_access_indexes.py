@@ -0,0 +1,32 @@
+# Generated by Django 5.0.3 on 2026-10-18 18:27
+
+from django.conf import settings
+from django.db import migrations, models
+
+from Trello.migration_operations import AddIndexConcurrentlyIfPostgres
+
+
+class Migration(migrations.Migration):
+    # indexes are built with CREATE INDEX CONCURRENTLY on PostgreSQL
+    atomic = False
+
+    dependencies = [
+        ('boards', '0003_board_version'),
+        ('tasks', '0004_board_counters'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrentlyIfPostgres(
+            model_name='task',
+            index=models.Index(fields=['board', 'status'], name='task_board_status_idx'),
+        ),
+        AddIndexConcurrentlyIfPostgres(
+            model_name='task',
+            index=models.Index(fields=['assignee', 'status'], name='task_assignee_status_idx'),
+        ),
+        AddIndexConcurrentlyIfPostgres(
+            model_name='task',
+            index=models.Index(condition=models.Q(models.Q(('status', 'DONE'), _negated=True), ('due_date__isnull', False)), fields=['due_date'], name='task_open_due_idx'),
+        ),
+    ]
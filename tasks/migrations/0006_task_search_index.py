@@ -0,0 +1,50 @@
+from django.db import migrations
+
+POSTGRES_DOCUMENT = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+)
+
+
+def create_search_index(apps, schema_editor):
+    """Create and fill the full-text index used by tasks.search."""
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute(
+            "CREATE TABLE tasks_task_search ("
+            "task_id bigint PRIMARY KEY REFERENCES tasks_task (id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+            "document tsvector NOT NULL)"
+        )
+        schema_editor.execute(
+            "CREATE INDEX tasks_task_search_document_idx ON tasks_task_search USING GIN (document)"
+        )
+        schema_editor.execute(
+            f"INSERT INTO tasks_task_search (task_id, document) SELECT id, {POSTGRES_DOCUMENT} FROM tasks_task"
+        )
+    elif vendor == "sqlite":
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE tasks_task_fts USING fts5(title, description, tokenize = 'porter unicode61')"
+        )
+        schema_editor.execute(
+            "INSERT INTO tasks_task_fts (rowid, title, description) "
+            "SELECT id, title, coalesce(description, '') FROM tasks_task"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute("DROP TABLE IF EXISTS tasks_task_search")
+    elif vendor == "sqlite":
+        schema_editor.execute("DROP TABLE IF EXISTS tasks_task_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0005_task_access_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
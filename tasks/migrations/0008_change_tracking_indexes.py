@@ -0,0 +1,26 @@
+# Generated by Django 5.0.3 on 2026-10-18 18:31
+
+from django.db import migrations, models
+
+from Trello.migration_operations import AddIndexConcurrentlyIfPostgres
+
+
+class Migration(migrations.Migration):
+    # the indexes on the task and label tables are built with CREATE INDEX
+    # CONCURRENTLY on PostgreSQL, which cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('tasks', '0007_change_tracking'),
+    ]
+
+    operations = [
+        AddIndexConcurrentlyIfPostgres(
+            model_name='label',
+            index=models.Index(fields=['board', 'change_seq'], name='label_board_change_seq_idx'),
+        ),
+        AddIndexConcurrentlyIfPostgres(
+            model_name='task',
+            index=models.Index(fields=['board', 'change_seq'], name='task_board_change_seq_idx'),
+        ),
+    ]
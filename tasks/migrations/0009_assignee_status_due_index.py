@@ -0,0 +1,29 @@
+# Generated by Django 5.0.3 on 2026-10-18 18:42
+
+from django.conf import settings
+from django.db import migrations, models
+
+from Trello.migration_operations import AddIndexConcurrentlyIfPostgres, RemoveIndexConcurrentlyIfPostgres
+
+
+class Migration(migrations.Migration):
+    # indexes are built with CREATE INDEX CONCURRENTLY on PostgreSQL
+    atomic = False
+
+    dependencies = [
+        ('boards', '0003_board_version'),
+        ('tasks', '0008_change_tracking_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # build the wider index before dropping the one it replaces
+        AddIndexConcurrentlyIfPostgres(
+            model_name='task',
+            index=models.Index(fields=['assignee', 'status', 'due_date'], name='task_assignee_status_due_idx'),
+        ),
+        RemoveIndexConcurrentlyIfPostgres(
+            model_name='task',
+            name='task_assignee_status_idx',
+        ),
+    ]
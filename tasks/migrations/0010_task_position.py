@@ -0,0 +1,40 @@
+# Generated by Django 5.0.3 on 2026-10-18 18:44
+
+from django.conf import settings
+from django.db import migrations, models
+
+POSITION_STEP = 1024.0
+
+
+def backfill_positions(apps, schema_editor):
+    """Rank the existing tasks of each column in creation order."""
+    Task = apps.get_model("tasks", "Task")
+    batch, column, rank = [], None, 0
+    for pk, board_id, status in Task.objects.order_by("board_id", "status", "created_at", "id").values_list(
+        "id", "board_id", "status"
+    ).iterator(chunk_size=10_000):
+        if (board_id, status) != column:
+            column, rank = (board_id, status), 0
+        rank += 1
+        batch.append(Task(pk=pk, position=rank * POSITION_STEP))
+        if len(batch) == 10_000:
+            Task.objects.bulk_update(batch, ["position"])
+            batch = []
+    Task.objects.bulk_update(batch, ["position"])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('boards', '0003_board_version'),
+        ('tasks', '0009_assignee_status_due_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='position',
+            field=models.FloatField(default=0.0, editable=False),
+        ),
+        migrations.RunPython(backfill_positions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.0.3 on 2026-10-18 18:44
+
+from django.db import migrations, models
+
+from Trello.migration_operations import AddIndexConcurrentlyIfPostgres, RemoveIndexConcurrentlyIfPostgres
+
+
+class Migration(migrations.Migration):
+    # the indexes are built and dropped CONCURRENTLY on PostgreSQL,
+    # which cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('tasks', '0010_task_position'),
+    ]
+
+    operations = [
+        # build the column index before dropping the (board, status) index
+        # it also covers
+        AddIndexConcurrentlyIfPostgres(
+            model_name='task',
+            index=models.Index(fields=['board', 'status', 'position', 'id'], name='task_column_position_idx'),
+        ),
+        RemoveIndexConcurrentlyIfPostgres(
+            model_name='task',
+            name='task_board_status_idx',
+        ),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 5.0.3 on 2026-10-18 18:48
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('boards', '0003_board_version'),
+        ('tasks', '0011_task_column_position_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedTask',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=255)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('start_date', models.DateField(blank=True, null=True)),
+                ('due_date', models.DateField(blank=True, null=True)),
+                ('status', models.CharField(choices=[('TODO', 'To Do'), ('DOING', 'Doing'), ('DONE', 'Done'), ('SUSPEND', 'Suspend')], max_length=20)),
+                ('position', models.FloatField(default=0.0)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('change_seq', models.PositiveBigIntegerField(default=0)),
+                ('archived_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedTaskLabel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='archivedtask',
+            name='assignee',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='archivedtask',
+            name='board',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_tasks', to='boards.board'),
+        ),
+        migrations.AddField(
+            model_name='archivedtasklabel',
+            name='label',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='tasks.label'),
+        ),
+        migrations.AddField(
+            model_name='archivedtasklabel',
+            name='task',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='tasks.archivedtask'),
+        ),
+        migrations.AddField(
+            model_name='archivedtask',
+            name='labels',
+            field=models.ManyToManyField(blank=True, related_name='archived_tasks', through='tasks.ArchivedTaskLabel', to='tasks.label'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='archivedtasklabel',
+            unique_together={('task', 'label')},
+        ),
+        migrations.AddIndex(
+            model_name='archivedtask',
+            index=models.Index(fields=['board', 'created_at', 'id'], name='archived_board_created_idx'),
+        ),
+    ]
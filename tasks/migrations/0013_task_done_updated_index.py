@@ -0,0 +1,22 @@
+# Generated by Django 5.0.3 on 2026-10-18 18:48
+
+from django.db import migrations, models
+
+from Trello.migration_operations import AddIndexConcurrentlyIfPostgres
+
+
+class Migration(migrations.Migration):
+    # the index is built with CREATE INDEX CONCURRENTLY on PostgreSQL,
+    # which cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('tasks', '0012_task_archive'),
+    ]
+
+    operations = [
+        AddIndexConcurrentlyIfPostgres(
+            model_name='task',
+            index=models.Index(condition=models.Q(('status', 'DONE')), fields=['updated_at'], name='task_done_updated_idx'),
+        ),
+    ]
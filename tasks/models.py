@@ -1,9 +1,65 @@
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
 from boards.models import Board
 from typing import Optional
 
 
+class TaskQuerySet(models.QuerySet):
+    """
+    QuerySet for tasks.
+    """
+    def with_related(self) -> "TaskQuerySet":
+        """
+        Load the assignee, board, workspace and labels rendered by
+        TaskSerializer in a fixed number of queries.
+        """
+        return self.select_related("assignee", "board__workspace").prefetch_related(
+            models.Prefetch("labels", queryset=Label.objects.with_related().order_by("id"))
+        )
+
+    def open(self) -> "TaskQuerySet":
+        """
+        Return tasks that are not done.
+
+        Written as ``status <> 'DONE'`` so that it matches the predicate
+        of the partial ``task_open_due_idx`` index.
+        """
+        return self.exclude(status="DONE")
+
+    def column(self, board_id: int, status: str) -> "TaskQuerySet":
+        """
+        Return the tasks of one status column of a board in display
+        order, served by ``task_column_position_idx``.
+        """
+        return self.filter(board_id=board_id, status=status).order_by("position", "id")
+
+    def end_position(self, board_id: int, status: str) -> float:
+        """Return the position right after the last task of a column."""
+        last = self.column(board_id, status).values_list("position", flat=True).last()
+        return (last or 0.0) + Task.POSITION_STEP
+
+    def visible_to(self, user) -> "TaskQuerySet":
+        """
+        Return tasks in workspaces the user owns or is a member of.
+
+        Membership is a single ``EXISTS`` per row, so the cost depends on
+        the tasks selected and not on how many workspaces the user joined.
+        """
+        from workspaces.models import WorkspaceMember
+
+        membership = WorkspaceMember.objects.filter(workspace=models.OuterRef("board__workspace"), user=user)
+        return self.filter(models.Q(board__workspace__owner=user) | models.Exists(membership))
+
+
+class LabelQuerySet(models.QuerySet):
+    """
+    QuerySet for labels.
+    """
+    def with_related(self) -> "LabelQuerySet":
+        """Load the board and workspace rendered by LabelSerializer."""
+        return self.select_related("board__workspace")
+
+
 class Task(models.Model):
     """
     Represents a task inside a board.
@@ -16,8 +72,18 @@ class Task(models.Model):
         status (str): Current status (To Do, Doing, Done, Suspend).
         assignee (User): The user assigned to the task (nullable).
         board (Board): The board where this task belongs.
+        position (float): Fractional rank of the task inside its status
+            column; moves write a value between the two neighbours.
         created_at (datetime): When the task was created.
+        updated_at (datetime): When the task was last changed.
+        change_seq (int): Board change sequence of the task's last change.
     """
+    # gap between consecutive positions when a column is appended to or
+    # rebalanced (see tasks.ranking)
+    POSITION_STEP: float = 1024.0
+
+    # stored values the save receivers compare against (see tasks.signals)
+    TRACKED_FIELDS: tuple[str, ...] = ("status", "board_id", "title", "description", "position")
 
     STATUS_CHOICES: list[tuple[str, str]] = [
         ("TODO", "To Do"),
@@ -35,13 +101,84 @@ class Task(models.Model):
         settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True
     )
     board = models.ForeignKey(Board, on_delete=models.CASCADE, related_name="tasks")
+    position: float = models.FloatField(default=0.0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    change_seq: int = models.PositiveBigIntegerField(default=0, editable=False)
     labels = models.ManyToManyField("Label", related_name="tasks", blank=True)
 
+    objects = TaskQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["board", "created_at", "id"], name="task_board_created_idx"),
+            models.Index(fields=["board", "change_seq"], name="task_board_change_seq_idx"),
+            # a status column in display order
+            models.Index(fields=["board", "status", "position", "id"], name="task_column_position_idx"),
+            # "my tasks": assignee + status filter, then a due date range
+            models.Index(fields=["assignee", "status", "due_date"], name="task_assignee_status_due_idx"),
+            models.Index(
+                fields=["due_date"],
+                condition=~models.Q(status="DONE") & models.Q(due_date__isnull=False),
+                name="task_open_due_idx",
+            ),
+            # candidates for archiving: completed tasks by last change
+            models.Index(fields=["updated_at"], condition=models.Q(status="DONE"), name="task_done_updated_idx"),
+        ]
+
     def __str__(self) -> str:
         """Return human-readable representation of the task."""
         return f"{self.title} ({self.get_status_display()})"
-    
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Remember the stored status and board so that signal receivers
+        can tell what changed on save.
+        """
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def save(self, *args, **kwargs):
+        """
+        Save the task and its board counters in one transaction.
+
+        New tasks, and tasks moved to another column without a new
+        position, go to the end of their column.
+        """
+        with transaction.atomic(using=kwargs.get("using")):
+            if not self._state.adding:
+                self._lock_stored_values(kwargs.get("using"))
+            loaded = getattr(self, "_loaded_values", None)
+            if self._state.adding and not self.position:
+                self.position = Task.objects.end_position(self.board_id, self.status)
+            elif loaded and loaded.get("position") == self.position and (
+                (loaded.get("board_id"), loaded.get("status")) != (self.board_id, self.status)
+            ):
+                self.position = Task.objects.end_position(self.board_id, self.status)
+            super().save(*args, **kwargs)
+
+    def _lock_stored_values(self, using: Optional[str] = None) -> None:
+        """
+        Lock the row and re-read its stored status, board and text.
+
+        The counter deltas computed on save must start from what is in
+        the table now, not from when this instance was loaded: another
+        save may have moved the task since, and instances loaded with
+        ``only()`` / ``defer()`` may not have the fields at all. The
+        position keeps its loaded value (when there is one) since it
+        tells whether the caller gave the task a new place.
+        """
+        loaded = getattr(self, "_loaded_values", None) or {}
+        fields = [field for field in self.TRACKED_FIELDS if field != "position" or field not in loaded]
+        stored = (
+            Task.objects.using(using or self._state.db).select_for_update()
+            .filter(pk=self.pk).values(*fields).first()
+        )
+        if stored is not None:
+            self._loaded_values = {**loaded, **stored}
+
 
 class Label(models.Model):
     """
@@ -51,12 +188,152 @@ class Label(models.Model):
         name (str): The name of the label.
         color (str): Hex color code for the label.
         board (Board): The board this label belongs to.
+        created_at (datetime): When the label was created.
+        task_count (int): Number of tasks with this label, maintained on writes.
+        updated_at (datetime): When the label was last changed.
+        change_seq (int): Board change sequence of the label's last change.
     """
     name: str = models.CharField(max_length=100)
     color: Optional[str] = models.CharField(max_length=7, default="#000000")  # HEX code
     board = models.ForeignKey(Board, on_delete=models.CASCADE, related_name="labels")
+    created_at = models.DateTimeField(auto_now_add=True)
+    task_count: int = models.IntegerField(default=0, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+    change_seq: int = models.PositiveBigIntegerField(default=0, editable=False)
+
+    objects = LabelQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["board", "created_at", "id"], name="label_board_created_idx"),
+            models.Index(fields=["board", "change_seq"], name="label_board_change_seq_idx"),
+        ]
 
     def __str__(self) -> str:
         """Return human-readable representation of the label."""
         return f"{self.name} ({self.color})"
 
+
+class BoardStatusCount(models.Model):
+    """
+    Denormalized number of tasks per status on a board.
+
+    Kept up to date on every task write (see tasks.counters) so that
+    board reports do not have to aggregate over tasks.
+
+    Attributes:
+        board (Board): The board the counter belongs to.
+        status (str): Task status being counted.
+        count (int): Number of tasks of the board with this status.
+    """
+    board = models.ForeignKey(Board, on_delete=models.CASCADE, related_name="status_counts")
+    status: str = models.CharField(max_length=20, choices=Task.STATUS_CHOICES)
+    count: int = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ("board", "status")
+
+    def __str__(self) -> str:
+        """Return human-readable representation of the counter."""
+        return f"{self.board_id}:{self.status}={self.count}"
+
+
+class Tombstone(models.Model):
+    """
+    Record of a deleted task or label, so that sync clients learn about
+    deletions through the changes feed.
+
+    Attributes:
+        board (Board): The board the object was deleted from.
+        kind (str): What was deleted (task or label).
+        object_id (int): Primary key of the deleted object.
+        seq (int): Board change sequence of the deletion.
+        deleted_at (datetime): When the object was deleted.
+    """
+    KIND_CHOICES: list[tuple[str, str]] = [
+        ("task", "Task"),
+        ("label", "Label"),
+    ]
+
+    board = models.ForeignKey(Board, on_delete=models.CASCADE, related_name="tombstones")
+    kind: str = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id: int = models.PositiveBigIntegerField()
+    seq: int = models.PositiveBigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["board", "seq"], name="tombstone_board_seq_idx"),
+        ]
+
+    def __str__(self) -> str:
+        """Return human-readable representation of the tombstone."""
+        return f"{self.kind} {self.object_id} deleted at seq {self.seq}"
+
+
+class ArchivedTask(models.Model):
+    """
+    A completed task moved out of the hot ``tasks_task`` table.
+
+    Rows keep the id and columns of the task they were archived from,
+    so that restoring puts the same task back.
+
+    Attributes:
+        id (int): Primary key of the original task.
+        title (str): Title of the task.
+        description (str): Optional details about the task.
+        start_date (date): Optional start date of the task.
+        due_date (date): Optional due date of the task.
+        status (str): Status of the task when it was archived.
+        assignee (User): The user the task was assigned to (nullable).
+        board (Board): The board the task belongs to.
+        position (float): Position of the task in its status column.
+        created_at (datetime): When the task was created.
+        updated_at (datetime): When the task was last changed.
+        change_seq (int): Board change sequence of the task's last change.
+        archived_at (datetime): When the task was archived.
+    """
+    id: int = models.BigIntegerField(primary_key=True)
+    title: str = models.CharField(max_length=255)
+    description: Optional[str] = models.TextField(null=True, blank=True)
+    start_date: Optional[models.DateField] = models.DateField(null=True, blank=True)
+    due_date: Optional[models.DateField] = models.DateField(null=True, blank=True)
+    status: str = models.CharField(max_length=20, choices=Task.STATUS_CHOICES)
+    assignee = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+    board = models.ForeignKey(Board, on_delete=models.CASCADE, related_name="archived_tasks")
+    position: float = models.FloatField(default=0.0)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    change_seq: int = models.PositiveBigIntegerField(default=0)
+    archived_at = models.DateTimeField()
+    labels = models.ManyToManyField("Label", through="ArchivedTaskLabel", related_name="archived_tasks", blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["board", "created_at", "id"], name="archived_board_created_idx"),
+        ]
+
+    def __str__(self) -> str:
+        """Return human-readable representation of the archived task."""
+        return f"{self.title} (archived)"
+
+
+class ArchivedTaskLabel(models.Model):
+    """
+    Label link of an archived task.
+
+    Attributes:
+        task (ArchivedTask): The archived task.
+        label (Label): The label it carried.
+    """
+    task = models.ForeignKey(ArchivedTask, on_delete=models.CASCADE)
+    label = models.ForeignKey("Label", on_delete=models.CASCADE)
+
+    class Meta:
+        unique_together = ("task", "label")
+
+    def __str__(self) -> str:
+        """Return human-readable representation of the link."""
+        return f"{self.task_id} -> {self.label_id}"
@@ -0,0 +1,114 @@
+"""
+Fractional ranks for ordering tasks inside a status column.
+
+A move writes one row: the task gets a position halfway between its new
+neighbours. Repeated moves into the same gap halve it each time, so once
+a gap becomes too small for float precision the column is rebalanced to
+evenly spaced positions. Rebalancing runs after the move commits, on a
+background thread by default (``settings.TASK_RANK_REBALANCE``), or with
+``python manage.py rebalance_task_positions``.
+"""
+import logging
+import threading
+from typing import Optional
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from .changes import mark_tasks_changed
+from .models import Task
+
+logger = logging.getLogger("trello_app")
+
+# gaps smaller than this fraction of the positions around them are "dense"
+MIN_GAP_RATIO = 1e-9
+
+_pending: set[tuple[int, str]] = set()
+_pending_lock = threading.Lock()
+
+
+def is_dense(low: float, high: float) -> bool:
+    """Return whether there is too little room left between two positions."""
+    return high - low < max(abs(low), abs(high), 1.0) * MIN_GAP_RATIO
+
+
+def position_after(board_id: int, status: str, after: Optional[dict], exclude: int) -> tuple[float, bool]:
+    """
+    Return the position for a task placed right after ``after`` (a dict
+    with ``id`` and ``position``) in a column, or at its top when
+    ``after`` is ``None``, and whether the column needs rebalancing.
+
+    Reads at most one neighbour through the column index.
+    """
+    column = Task.objects.column(board_id, status).exclude(pk=exclude)
+    if after is None:
+        first = column.values_list("position", flat=True).first()
+        if first is None:
+            return Task.POSITION_STEP, False
+        # positions stay positive: halve towards zero instead of going below it
+        return first / 2, is_dense(0.0, first)
+
+    following = (
+        column.filter(position__gte=after["position"])
+        .exclude(position=after["position"], id__lte=after["id"])
+        .values_list("position", flat=True)
+        .first()
+    )
+    if following is None:
+        return after["position"] + Task.POSITION_STEP, False
+    return (after["position"] + following) / 2, is_dense(after["position"], following)
+
+
+def rebalance_column(board_id: int, status: str) -> int:
+    """
+    Respace the positions of a column evenly, keeping its order.
+
+    Returns the number of tasks in the column. The tasks are stamped
+    with a new change sequence so sync clients pick up the positions.
+    """
+    with transaction.atomic():
+        task_ids = list(
+            Task.objects.column(board_id, status).select_for_update().values_list("id", flat=True)
+        )
+        Task.objects.bulk_update(
+            [Task(pk=pk, position=(rank + 1) * Task.POSITION_STEP) for rank, pk in enumerate(task_ids)],
+            ["position"],
+            batch_size=1000,
+        )
+        if task_ids:
+            mark_tasks_changed(board_id, task_ids)
+    return len(task_ids)
+
+
+def schedule_rebalance(board_id: int, status: str) -> None:
+    """
+    Rebalance a column once the current transaction commits.
+
+    With ``TASK_RANK_REBALANCE = "thread"`` (the default) it runs on a
+    daemon thread and concurrent requests for the same column collapse
+    into one; ``"inline"`` runs it in the committing thread.
+    """
+    def run():
+        if getattr(settings, "TASK_RANK_REBALANCE", "thread") == "inline":
+            rebalance_column(board_id, status)
+            return
+        with _pending_lock:
+            if (board_id, status) in _pending:
+                return
+            _pending.add((board_id, status))
+        threading.Thread(
+            target=_rebalance_in_background, args=(board_id, status), name="rank-rebalance", daemon=True
+        ).start()
+
+    transaction.on_commit(run)
+
+
+def _rebalance_in_background(board_id: int, status: str) -> None:
+    try:
+        rebalance_column(board_id, status)
+    except Exception:
+        logger.exception("Rebalancing column %s of board %s failed", status, board_id)
+    finally:
+        with _pending_lock:
+            _pending.discard((board_id, status))
+        connection.close()
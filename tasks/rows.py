@@ -0,0 +1,80 @@
+"""
+Task rows for the fast read path (see Trello.fast_read).
+
+Builds, from ``values()`` dicts, the same rows ``TaskSerializer``
+renders for a task list: one query for the page and one for its labels.
+Keep ``TASK_VALUES`` and ``build_task_rows()`` in step with the fields
+of ``TaskSerializer`` and ``LabelSerializer``.
+"""
+from django.utils import timezone
+from rest_framework import serializers
+
+from Trello.fast_read import floats_match_repr
+from .models import Task
+
+TASK_VALUES = (
+    "id", "title", "description", "start_date", "due_date", "status", "assignee__username",
+    "board__title", "board__workspace__name", "position", "created_at", "updated_at",
+)
+
+LABEL_VALUES = ("task_id", "label_id", "label__name", "label__color", "label__board__title", "label__board__workspace__name")
+
+
+def task_values(queryset):
+    """Return the values queryset of ``queryset`` the rows are built from."""
+    return queryset.prefetch_related(None).values(*TASK_VALUES)
+
+
+def label_values(task_ids: list[int]):
+    """Return the label links of the given tasks, in the order TaskSerializer lists them."""
+    return (
+        Task.labels.through.objects.filter(task_id__in=task_ids)
+        .order_by("task_id", "label_id")
+        .values_list(*LABEL_VALUES)
+    )
+
+
+def task_rows(rows: list[dict]) -> tuple[list[dict], bool]:
+    """
+    Return the serialized rows of a page of ``task_values()`` dicts and
+    whether their floats may be encoded by orjson.
+    """
+    links = list(label_values([row["id"] for row in rows])) if rows else []
+    return build_task_rows(rows, links)
+
+
+async def atask_rows(rows: list[dict]) -> tuple[list[dict], bool]:
+    """Async version of :func:`task_rows`."""
+    links = [link async for link in label_values([row["id"] for row in rows])] if rows else []
+    return build_task_rows(rows, links)
+
+
+def build_task_rows(rows: list[dict], links: list[tuple]) -> tuple[list[dict], bool]:
+    date = serializers.DateField().to_representation
+    # look the time zone up once, not once per value
+    datetime = serializers.DateTimeField(default_timezone=timezone.get_current_timezone()).to_representation
+
+    labels: dict[int, list[dict]] = {}
+    for task_id, label_id, name, color, board_title, workspace_name in links:
+        labels.setdefault(task_id, []).append(
+            {"id": label_id, "name": name, "color": color, "board": f"{board_title} (Workspace: {workspace_name})"}
+        )
+
+    result = [
+        {
+            "id": row["id"],
+            "title": row["title"],
+            "description": row["description"],
+            "start_date": date(row["start_date"]) if row["start_date"] is not None else None,
+            "due_date": date(row["due_date"]) if row["due_date"] is not None else None,
+            "status": row["status"],
+            "assignee": row["assignee__username"],
+            "board": f"{row['board__title']} (Workspace: {row['board__workspace__name']})",
+            "labels": labels.get(row["id"], []),
+            "position": row["position"],
+            "created_at": datetime(row["created_at"]),
+            "updated_at": datetime(row["updated_at"]),
+        }
+        for row in rows
+    ]
+    return result, floats_match_repr(row["position"] for row in rows)
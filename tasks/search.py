@@ -0,0 +1,167 @@
+"""
+Full-text search over task titles and descriptions.
+
+The index lives outside the ``tasks_task`` table and is updated
+incrementally from the task write paths (see tasks.signals and the bulk
+serializer):
+
+* PostgreSQL: ``tasks_task_search(task_id, document tsvector)`` with a
+  GIN index. Rows cascade away with their task.
+* SQLite: an FTS5 virtual table ``tasks_task_fts`` whose rowid is the
+  task id.
+* Other backends have no index and fall back to ``icontains``.
+
+The tables are created by migration ``0006_task_search_index``.
+"""
+import re
+from typing import Iterable
+
+from django.db import connection
+from django.db.models import Q, QuerySet
+
+from .models import Task
+
+POSTGRES_DOCUMENT = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+)
+
+
+class FallbackSearchBackend:
+    """Unindexed ``icontains`` search, ranked by recency."""
+
+    def index_tasks(self, task_ids: Iterable[int]) -> None:
+        pass
+
+    def remove_tasks(self, task_ids: Iterable[int]) -> None:
+        pass
+
+    def remove_matching(self, tasks: QuerySet) -> None:
+        """Remove every task of a queryset, in one statement whatever its size."""
+
+    def rebuild(self) -> None:
+        pass
+
+    def search(self, workspace_id: int, text: str, limit: int, offset: int) -> list[int]:
+        words = text.split()
+        if not words:
+            return []
+        queryset = Task.objects.filter(board__workspace_id=workspace_id)
+        for word in words:
+            queryset = queryset.filter(Q(title__icontains=word) | Q(description__icontains=word))
+        return list(queryset.order_by("-created_at", "-id").values_list("id", flat=True)[offset:offset + limit])
+
+
+class PostgresSearchBackend(FallbackSearchBackend):
+    """``tsvector`` documents with a GIN index, ranked by ``ts_rank``."""
+
+    def index_tasks(self, task_ids: Iterable[int]) -> None:
+        task_ids = list(task_ids)
+        if not task_ids:
+            return
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO tasks_task_search (task_id, document) "
+                f"SELECT id, {POSTGRES_DOCUMENT} FROM tasks_task WHERE id = ANY(%s) "
+                f"ON CONFLICT (task_id) DO UPDATE SET document = EXCLUDED.document",
+                [task_ids],
+            )
+
+    def remove_tasks(self, task_ids: Iterable[int]) -> None:
+        # rows are removed by ON DELETE CASCADE
+        pass
+
+    def remove_matching(self, tasks: QuerySet) -> None:
+        pass
+
+    def rebuild(self) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute("TRUNCATE tasks_task_search")
+            cursor.execute(
+                f"INSERT INTO tasks_task_search (task_id, document) "
+                f"SELECT id, {POSTGRES_DOCUMENT} FROM tasks_task"
+            )
+
+    def search(self, workspace_id: int, text: str, limit: int, offset: int) -> list[int]:
+        if not text.strip():
+            return []
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT s.task_id FROM tasks_task_search s "
+                "JOIN tasks_task t ON t.id = s.task_id "
+                "JOIN boards_board b ON b.id = t.board_id, "
+                "websearch_to_tsquery('english', %s) query "
+                "WHERE b.workspace_id = %s AND s.document @@ query "
+                "ORDER BY ts_rank(s.document, query) DESC, s.task_id DESC "
+                "LIMIT %s OFFSET %s",
+                [text, workspace_id, limit, offset],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+class SQLiteSearchBackend(FallbackSearchBackend):
+    """FTS5 table ranked by ``bm25`` with titles weighted over descriptions."""
+
+    def index_tasks(self, task_ids: Iterable[int]) -> None:
+        task_ids = list(task_ids)
+        if not task_ids:
+            return
+        placeholders = ", ".join(["%s"] * len(task_ids))
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM tasks_task_fts WHERE rowid IN ({placeholders})", task_ids)
+            cursor.execute(
+                f"INSERT INTO tasks_task_fts (rowid, title, description) "
+                f"SELECT id, title, coalesce(description, '') FROM tasks_task WHERE id IN ({placeholders})",
+                task_ids,
+            )
+
+    def remove_tasks(self, task_ids: Iterable[int]) -> None:
+        task_ids = list(task_ids)
+        if not task_ids:
+            return
+        placeholders = ", ".join(["%s"] * len(task_ids))
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM tasks_task_fts WHERE rowid IN ({placeholders})", task_ids)
+
+    def remove_matching(self, tasks: QuerySet) -> None:
+        sql, params = tasks.values("id").query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM tasks_task_fts WHERE rowid IN ({sql})", params)
+
+    def rebuild(self) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM tasks_task_fts")
+            cursor.execute(
+                "INSERT INTO tasks_task_fts (rowid, title, description) "
+                "SELECT id, title, coalesce(description, '') FROM tasks_task"
+            )
+
+    def search(self, workspace_id: int, text: str, limit: int, offset: int) -> list[int]:
+        # quote every word so user input cannot use FTS5 query syntax;
+        # the last word is matched as a prefix for search-as-you-type
+        words = re.findall(r"\w+", text)
+        if not words:
+            return []
+        match = " ".join(f'"{word}"' for word in words) + "*"
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT f.rowid FROM tasks_task_fts f "
+                "JOIN tasks_task t ON t.id = f.rowid "
+                "JOIN boards_board b ON b.id = t.board_id "
+                "WHERE tasks_task_fts MATCH %s AND b.workspace_id = %s "
+                "ORDER BY bm25(tasks_task_fts, 10.0, 1.0), f.rowid DESC "
+                "LIMIT %s OFFSET %s",
+                [match, workspace_id, limit, offset],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+_BACKENDS = {
+    "postgresql": PostgresSearchBackend,
+    "sqlite": SQLiteSearchBackend,
+}
+
+
+def get_search_backend() -> FallbackSearchBackend:
+    """Return the search backend for the default database."""
+    return _BACKENDS.get(connection.vendor, FallbackSearchBackend)()
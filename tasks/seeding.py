@@ -0,0 +1,182 @@
+"""
+Deterministic synthetic data for benchmarks.
+
+:class:`Seeder` bulk-inserts users, workspaces, memberships, boards,
+labels and tasks with the skew of a real installation: a Zipf-like
+share of the tasks goes to a few hot boards, tasks are assigned to
+members of their workspace, and a few labels carry most of the links.
+The same seed always yields the same rows (ids aside), and a million
+tasks take a few minutes since nothing is saved row by row.
+
+Used by ``manage.py seed_bench`` and the benchmark commands.
+"""
+import random
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Callable, Optional
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Max
+
+from boards.models import Board
+from workspaces.models import Workspace, WorkspaceMember
+from .counters import rebuild_counters
+from .models import Label, Task
+from .search import get_search_backend
+
+User = get_user_model()
+
+WORDS = (
+    "fix", "update", "review", "deploy", "design", "test", "write", "refactor", "plan", "release",
+    "login", "billing", "search", "report", "api", "dashboard", "mobile", "email", "export", "import",
+)
+LABEL_COLORS = ("#e11d48", "#f59e0b", "#10b981", "#3b82f6", "#8b5cf6", "#64748b")
+STATUS_WEIGHTS = {"TODO": 30, "DOING": 15, "DONE": 50, "SUSPEND": 5}
+LABELS_PER_TASK_WEIGHTS = (40, 35, 18, 7)  # tasks with 0, 1, 2 and 3 labels
+
+
+@dataclass
+class SeedOptions:
+    users: int = 2_000
+    workspaces: int = 200
+    boards: int = 2_000
+    tasks: int = 1_000_000
+    labels: int = 6  # per board
+    members: int = 20  # per workspace, besides the owner
+    seed: int = 42
+    batch_size: int = 10_000
+    search_index: bool = True
+
+
+class Seeder:
+    """
+    Fill the database up to the sizes of a :class:`SeedOptions`.
+
+    Users, workspaces, boards and labels are only created when there
+    are no boards yet; tasks are topped up to ``options.tasks``, so a
+    seeded database can be grown in steps.
+    """
+
+    def __init__(self, options: SeedOptions, progress: Optional[Callable[[str], None]] = None):
+        self.options = options
+        # one generator per phase, so tasks come out the same whether or
+        # not this run also created the boards
+        self.rng = random.Random(f"{options.seed}:structure")
+        self.task_rng = random.Random(f"{options.seed}:tasks")
+        self.progress = progress or (lambda message: None)
+
+    def run(self) -> dict:
+        """Seed and return the number of rows of each kind."""
+        with transaction.atomic():
+            if not Board.objects.exists():
+                self.seed_structure()
+            created = self.seed_tasks()
+            if created:
+                self.progress("Rebuilding counters")
+                rebuild_counters()
+        if created and self.options.search_index:
+            self.progress("Rebuilding the search index")
+            get_search_backend().rebuild()
+        return {
+            "users": User.objects.count(),
+            "workspaces": Workspace.objects.count(),
+            "boards": Board.objects.count(),
+            "labels": Label.objects.count(),
+            "tasks": Task.objects.count(),
+        }
+
+    def seed_structure(self) -> None:
+        """Create the users, workspaces, memberships, boards and labels."""
+        rng, options, batch = self.rng, self.options, self.options.batch_size
+        users = User.objects.bulk_create(
+            (User(username=f"bench{i}", email=f"bench{i}@example.com", password="!") for i in range(options.users)),
+            batch_size=batch,
+        )
+        workspaces = Workspace.objects.bulk_create(
+            (Workspace(name=f"Workspace {i}", owner=rng.choice(users)) for i in range(options.workspaces)),
+            batch_size=batch,
+        )
+        members = {}
+        for workspace in workspaces:
+            members[(workspace.pk, workspace.owner_id)] = WorkspaceMember(
+                workspace=workspace, user_id=workspace.owner_id, role="OWNER"
+            )
+            for user in rng.sample(users, min(len(users), options.members)):
+                members.setdefault(
+                    (workspace.pk, user.pk), WorkspaceMember(workspace=workspace, user=user, role="MEMBER")
+                )
+        WorkspaceMember.objects.bulk_create(members.values(), batch_size=batch)
+        boards = Board.objects.bulk_create(
+            (Board(title=f"Board {i}", workspace=rng.choice(workspaces)) for i in range(options.boards)),
+            batch_size=batch,
+        )
+        Label.objects.bulk_create(
+            (
+                Label(name=f"{WORDS[(board.pk + i) % len(WORDS)]} {i}", color=LABEL_COLORS[i % len(LABEL_COLORS)],
+                      board=board)
+                for board in boards
+                for i in range(options.labels)
+            ),
+            batch_size=batch,
+        )
+        self.progress(f"Created {len(users)} users, {len(workspaces)} workspaces and {len(boards)} boards")
+
+    def seed_tasks(self) -> int:
+        """Top the tasks up to ``options.tasks``; return how many were created."""
+        rng, options = self.task_rng, self.options
+        remaining = options.tasks - Task.objects.count()
+        if remaining <= 0:
+            return 0
+
+        boards = list(Board.objects.order_by("id").values_list("id", "workspace_id"))
+        board_weights = [1 / (rank + 1) for rank in range(len(boards))]
+        members: dict[int, list[int]] = {}
+        for workspace_id, user_id in WorkspaceMember.objects.order_by("id").values_list("workspace_id", "user_id"):
+            members.setdefault(workspace_id, []).append(user_id)
+        labels: dict[int, list[int]] = {}
+        for board_id, label_id in Label.objects.order_by("id").values_list("board_id", "id"):
+            labels.setdefault(board_id, []).append(label_id)
+        positions = {
+            (row["board_id"], row["status"]): row["end"]
+            for row in Task.objects.values("board_id", "status").annotate(end=Max("position")).order_by()
+        }
+        statuses, status_weights = list(STATUS_WEIGHTS), list(STATUS_WEIGHTS.values())
+        today = date.today()
+
+        created = 0
+        while remaining > 0:
+            size = min(options.batch_size, remaining)
+            tasks = []
+            for board_id, workspace_id in rng.choices(boards, weights=board_weights, k=size):
+                status = rng.choices(statuses, weights=status_weights)[0]
+                position = positions.get((board_id, status), 0.0) + Task.POSITION_STEP
+                positions[(board_id, status)] = position
+                assignees = members.get(workspace_id)
+                tasks.append(Task(
+                    title=f"{rng.choice(WORDS).capitalize()} {rng.choice(WORDS)} {created + len(tasks)}",
+                    board_id=board_id,
+                    status=status,
+                    position=position,
+                    assignee_id=rng.choice(assignees) if assignees and rng.random() < 0.8 else None,
+                    due_date=today + timedelta(days=rng.randint(-60, 60)) if rng.random() < 0.7 else None,
+                ))
+            tasks = Task.objects.bulk_create(tasks)
+            Task.labels.through.objects.bulk_create(self.label_links(tasks, labels), batch_size=options.batch_size)
+            created += size
+            remaining -= size
+            self.progress(f"{created} tasks")
+        return created
+
+    def label_links(self, tasks: list[Task], labels: dict[int, list[int]]):
+        """Yield task-label links, most of them to the first labels of each board."""
+        rng = self.task_rng
+        for task in tasks:
+            board_labels = labels.get(task.board_id)
+            if not board_labels:
+                continue
+            count = rng.choices(range(len(LABELS_PER_TASK_WEIGHTS)), weights=LABELS_PER_TASK_WEIGHTS)[0]
+            weights = [1 / (rank + 1) for rank in range(len(board_labels))]
+            chosen = {rng.choices(board_labels, weights=weights)[0] for _ in range(count)}
+            for label_id in sorted(chosen):
+                yield Task.labels.through(task_id=task.pk, label_id=label_id)
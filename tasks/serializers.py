@@ -1,7 +1,20 @@
+from collections import Counter
+from typing import Optional
+from django.db import transaction
+from django.utils import timezone
 from rest_framework import serializers
-from .models import Task, Label
+from boards.events import publish_board_event
+from boards.models import Board
+from boards.versioning import bump_board_version
+from workspaces.models import WorkspaceMember
+from . import counters, ranking
+from .changes import clear_tombstones, record_deletions
+from .models import ArchivedTask, Task, Label
+from .search import get_search_backend
+from .signals import suspend_task_signals
+from Trello.instrumentation import TimedListSerializer, TimedSerializerMixin
 
-class LabelSerializer(serializers.ModelSerializer):
+class LabelSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for Label model.
     """
@@ -10,9 +23,10 @@ class LabelSerializer(serializers.ModelSerializer):
     class Meta:
         model = Label
         fields = ["id", "name", "color", "board"]
+        list_serializer_class = TimedListSerializer
 
 
-class TaskSerializer(serializers.ModelSerializer):
+class TaskSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for Task model.
     """
@@ -36,8 +50,11 @@ class TaskSerializer(serializers.ModelSerializer):
             "board",
             "labels",
             "label_ids",
+            "position",
             "created_at",
+            "updated_at",
         ]
+        list_serializer_class = TimedListSerializer
 
     def create(self, validated_data):
         labels = validated_data.pop("label_ids", [])
@@ -51,3 +68,412 @@ class TaskSerializer(serializers.ModelSerializer):
         if labels is not None:
             task.labels.set(labels)
         return task
+
+
+class ArchivedTaskSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """
+    Read-only serializer for archived tasks.
+    """
+    assignee = serializers.StringRelatedField(read_only=True)
+    board = serializers.StringRelatedField(read_only=True)
+    labels = LabelSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = ArchivedTask
+        fields = [
+            "id",
+            "title",
+            "description",
+            "start_date",
+            "due_date",
+            "status",
+            "assignee",
+            "board",
+            "labels",
+            "created_at",
+            "updated_at",
+            "archived_at",
+        ]
+        read_only_fields = fields
+        list_serializer_class = TimedListSerializer
+
+
+class TaskMoveSerializer(serializers.Serializer):
+    """
+    Serializer for moving a task to a status column, right after another
+    task of that column or to its top when ``after`` is null.
+    """
+    status = serializers.ChoiceField(choices=Task.STATUS_CHOICES, required=False)
+    after = serializers.IntegerField(required=False, allow_null=True)
+
+    def validate(self, attrs: dict) -> dict:
+        task = self.context["task"]
+        attrs.setdefault("status", task.status)
+        after_id = attrs.get("after")
+        if after_id is not None:
+            after = (
+                Task.objects.filter(board_id=task.board_id, status=attrs["status"], pk=after_id)
+                .exclude(pk=task.pk)
+                .values("id", "position")
+                .first()
+            )
+            if after is None:
+                raise serializers.ValidationError({"after": ["Task not found in the target column."]})
+            attrs["after"] = after
+        return attrs
+
+    def save(self, **kwargs) -> Task:
+        """Write the task's new status and position, and nothing else."""
+        task = self.context["task"]
+        status = self.validated_data["status"]
+        position, dense = ranking.position_after(
+            task.board_id, status, self.validated_data.get("after"), exclude=task.pk
+        )
+        task.status, task.position = status, position
+        task.save()
+        if dense:
+            ranking.schedule_rebalance(task.board_id, status)
+        return task
+
+
+class TaskBulkItemSerializer(TaskSerializer):
+    """
+    Serializer for a single task inside a bulk request.
+
+    Label ids are checked against the board's labels passed in the
+    context instead of issuing one query per id.
+    """
+    label_ids = serializers.ListField(
+        child=serializers.IntegerField(), write_only=True, required=False
+    )
+
+    def validate_label_ids(self, value: list[int]) -> list[int]:
+        board_label_ids = self.context["board_label_ids"]
+        for pk in value:
+            if pk not in board_label_ids:
+                raise serializers.ValidationError(f'Invalid pk "{pk}" - object does not exist.')
+        return list(dict.fromkeys(value))
+
+
+class TaskBulkSerializer(serializers.Serializer):
+    """
+    Serializer for creating, updating and deleting many tasks of a
+    board at once.
+
+    All items are validated in one pass with a fixed number of queries;
+    if any item is invalid nothing is written and the errors are
+    reported per item.
+    """
+    MAX_ITEMS = 1000
+
+    create = serializers.ListField(child=serializers.DictField(), required=False, max_length=MAX_ITEMS)
+    update = serializers.ListField(child=serializers.DictField(), required=False, max_length=MAX_ITEMS)
+    delete = serializers.ListField(child=serializers.IntegerField(), required=False, max_length=MAX_ITEMS)
+
+    def validate(self, attrs: dict) -> dict:
+        board = self.context["board"]
+        creates = attrs.get("create", [])
+        updates = attrs.get("update", [])
+        deletes = attrs.get("delete", [])
+
+        item_context = {
+            **self.context,
+            "board_label_ids": set(board.labels.values_list("id", flat=True)),
+        }
+        update_ids = [item.get("id") for item in updates]
+        tasks = Task.objects.filter(
+            board=board, id__in=[pk for pk in update_ids + deletes if isinstance(pk, int)]
+        ).in_bulk()
+
+        errors = {"create": [], "update": [], "delete": []}
+        validated = {"create": [], "update": [], "delete": []}
+
+        for item in creates:
+            serializer = TaskBulkItemSerializer(data=item, context=item_context)
+            if serializer.is_valid():
+                validated["create"].append(serializer.validated_data)
+            errors["create"].append(serializer.errors)
+
+        seen = set()
+        for pk, item in zip(update_ids, updates):
+            if not isinstance(pk, int) or pk not in tasks:
+                errors["update"].append({"id": ["Task not found."]})
+                continue
+            if pk in seen:
+                errors["update"].append({"id": ["Duplicate task id."]})
+                continue
+            seen.add(pk)
+            data = {key: value for key, value in item.items() if key != "id"}
+            serializer = TaskBulkItemSerializer(tasks[pk], data=data, partial=True, context=item_context)
+            if serializer.is_valid():
+                validated["update"].append((tasks[pk], serializer.validated_data))
+            errors["update"].append(serializer.errors)
+
+        seen = set()
+        for pk in deletes:
+            if pk not in tasks:
+                errors["delete"].append({"id": ["Task not found."]})
+            elif pk in seen:
+                errors["delete"].append({"id": ["Duplicate task id."]})
+            else:
+                seen.add(pk)
+                validated["delete"].append(tasks[pk])
+                errors["delete"].append({})
+
+        if any(error for items in errors.values() for error in items):
+            raise serializers.ValidationError(
+                {key: items for key, items in errors.items() if any(items)}
+            )
+        return validated
+
+    @transaction.atomic
+    def save(self, **kwargs) -> dict:
+        """
+        Write all items with bulk queries and return per-item results.
+
+        Per-row signal receivers are suspended; board and label counters
+        are updated once from the aggregated changes instead, and every
+        written task is stamped with one board change sequence.
+        """
+        board = self.context["board"]
+        through = Task.labels.through
+        label_rows = []
+        status_deltas, label_deltas = Counter(), Counter()
+        seq = bump_board_version(board.pk)[board.pk]
+        now = timezone.now()
+        end_positions = {}
+
+        def append_position(status: str) -> float:
+            # tasks created or moved by the request go to the end of their column
+            if status not in end_positions:
+                end_positions[status] = Task.objects.end_position(board.pk, status)
+            else:
+                end_positions[status] += Task.POSITION_STEP
+            return end_positions[status]
+
+        with suspend_task_signals():
+            created = [
+                Task(
+                    board=board,
+                    change_seq=seq,
+                    **{key: value for key, value in data.items() if key != "label_ids"},
+                )
+                for data in self.validated_data["create"]
+            ]
+            for task in created:
+                task.position = append_position(task.status)
+            Task.objects.bulk_create(created)
+            for task, data in zip(created, self.validated_data["create"]):
+                status_deltas[task.status] += 1
+                label_rows.extend(through(task_id=task.pk, label_id=pk) for pk in data.get("label_ids", []))
+
+            updated, fields, relabeled = [], set(), []
+            for task, data in self.validated_data["update"]:
+                if "status" in data and data["status"] != task.status:
+                    status_deltas[task.status] -= 1
+                    status_deltas[data["status"]] += 1
+                    task.position = append_position(data["status"])
+                    fields.add("position")
+                for key, value in data.items():
+                    if key == "label_ids":
+                        relabeled.append(task.pk)
+                        label_rows.extend(through(task_id=task.pk, label_id=pk) for pk in value)
+                    else:
+                        setattr(task, key, value)
+                        fields.add(key)
+                task.change_seq, task.updated_at = seq, now
+                updated.append(task)
+            if updated:
+                Task.objects.bulk_update(updated, sorted(fields | {"change_seq", "updated_at"}))
+            if relabeled:
+                label_deltas.subtract(counters.label_counts_for_tasks(relabeled))
+                through.objects.filter(task_id__in=relabeled).delete()
+            if label_rows:
+                through.objects.bulk_create(label_rows)
+                label_deltas.update(row.label_id for row in label_rows)
+
+            deleted = [task.pk for task in self.validated_data["delete"]]
+            if deleted:
+                status_deltas.subtract(task.status for task in self.validated_data["delete"])
+                label_deltas.subtract(counters.label_counts_for_tasks(deleted))
+                Task.objects.filter(board=board, id__in=deleted).delete()
+                record_deletions(board.pk, "task", deleted, seq)
+
+        counters.apply_status_deltas(board.pk, status_deltas)
+        counters.apply_label_deltas(label_deltas)
+        search = get_search_backend()
+        search.index_tasks(
+            [task.pk for task in created]
+            + ([task.pk for task in updated] if fields & {"title", "description"} else [])
+        )
+        search.remove_tasks(deleted)
+        for event_type, task_ids in (
+            ("task.created", [task.pk for task in created]),
+            ("task.updated", [task.pk for task in updated]),
+        ):
+            if task_ids:
+                publish_board_event(board.pk, event_type, seq, task_ids)
+
+        return {
+            "create": [{"id": task.pk, "status": "created"} for task in created],
+            "update": [{"id": task.pk, "status": "updated"} for task in updated],
+            "delete": [{"id": pk, "status": "deleted"} for pk in deleted],
+        }
+
+
+class TaskBulkMoveSerializer(serializers.Serializer):
+    """
+    Serializer for moving many tasks of a workspace to another board,
+    status and/or assignee at once.
+
+    Tasks are changed with a few set-based UPDATEs, never loaded as
+    models. Labels follow the tasks to the target board by name and
+    colour, and are created there when missing.
+    """
+    MAX_ITEMS = 1000
+
+    tasks = serializers.ListField(
+        child=serializers.IntegerField(), min_length=1, max_length=MAX_ITEMS
+    )
+    board = serializers.IntegerField(required=False)
+    status = serializers.ChoiceField(choices=Task.STATUS_CHOICES, required=False)
+    assignee = serializers.IntegerField(required=False, allow_null=True)
+
+    def validate(self, attrs: dict) -> dict:
+        workspace_id = self.context["workspace_id"]
+        if not {"board", "status", "assignee"} & attrs.keys():
+            raise serializers.ValidationError("Give at least one of board, status or assignee.")
+
+        attrs["tasks"] = list(dict.fromkeys(attrs["tasks"]))
+        self._task_rows(attrs["tasks"])
+
+        if "board" in attrs and not Board.objects.filter(pk=attrs["board"], workspace_id=workspace_id).exists():
+            raise serializers.ValidationError({"board": ["Board not found in this workspace."]})
+        if attrs.get("assignee") is not None and not WorkspaceMember.objects.filter(
+            workspace_id=workspace_id, user_id=attrs["assignee"]
+        ).exists():
+            raise serializers.ValidationError({"assignee": ["User is not a member of this workspace."]})
+        return attrs
+
+    @transaction.atomic
+    def save(self, **kwargs) -> dict:
+        """
+        Apply the move and keep counters, label links, versions, change
+        sequences and tombstones consistent. Returns the moved ids.
+        """
+        data = self.validated_data
+        # the rows read by validate() may have changed since; lock and
+        # read them again so the counter deltas match what is updated
+        rows = self._task_rows(data["tasks"], lock=True)
+        target_of = {
+            pk: (data.get("board", board_id), data.get("status", status)) for pk, board_id, status in rows
+        }
+        moved_boards = {pk: board_id for pk, board_id, _ in rows if target_of[pk][0] != board_id}
+        seqs = bump_board_version(*{board_id for _, board_id, _ in rows}, *{board for board, _ in target_of.values()})
+        now = timezone.now()
+
+        with suspend_task_signals():
+            # tasks changing column go after its last task, one step apart,
+            # keeping their relative order
+            positions = []
+            arriving: dict[tuple, list[int]] = {}
+            for pk, board_id, status in rows:
+                if target_of[pk] != (board_id, status):
+                    arriving.setdefault(target_of[pk], []).append(pk)
+            for (board_id, status), task_ids in arriving.items():
+                end = Task.objects.end_position(board_id, status)
+                positions.extend(
+                    Task(pk=pk, position=end + rank * Task.POSITION_STEP) for rank, pk in enumerate(task_ids)
+                )
+            Task.objects.bulk_update(positions, ["position"], batch_size=self.MAX_ITEMS)
+
+            # one UPDATE per target column for the other fields
+            columns: dict[tuple, list[int]] = {}
+            for pk in target_of:
+                columns.setdefault(target_of[pk], []).append(pk)
+            for (board_id, status), task_ids in columns.items():
+                values = {"board_id": board_id, "status": status, "change_seq": seqs[board_id], "updated_at": now}
+                if "assignee" in data:
+                    values["assignee_id"] = data["assignee"]
+                Task.objects.filter(pk__in=task_ids).update(**values)
+
+            label_deltas = self._remap_labels(moved_boards, data.get("board"), seqs)
+
+        status_deltas: dict[int, Counter] = {}
+        for pk, board_id, status in rows:
+            if target_of[pk] != (board_id, status):
+                status_deltas.setdefault(board_id, Counter())[status] -= 1
+                target_board, target_status = target_of[pk]
+                status_deltas.setdefault(target_board, Counter())[target_status] += 1
+        for board_id, deltas in status_deltas.items():
+            counters.apply_status_deltas(board_id, deltas)
+        counters.apply_label_deltas(label_deltas)
+
+        left: dict[int, list[int]] = {}
+        for pk, board_id in moved_boards.items():
+            left.setdefault(board_id, []).append(pk)
+        for board_id, task_ids in left.items():
+            record_deletions(board_id, "task", task_ids, seqs[board_id])
+        arrived: dict[int, list[int]] = {}
+        for pk, (board_id, _) in target_of.items():
+            arrived.setdefault(board_id, []).append(pk)
+        for board_id, task_ids in arrived.items():
+            # tasks moved back to a board they left earlier are live there again
+            clear_tombstones(board_id, "task", [pk for pk in task_ids if pk in moved_boards])
+            publish_board_event(board_id, "task.updated", seqs[board_id], task_ids)
+
+        return {"moved": data["tasks"]}
+
+    def _task_rows(self, task_ids: list[int], lock: bool = False) -> list[tuple]:
+        """
+        Return ``(id, board_id, status)`` of the tasks in column order,
+        or raise a validation error naming those not in the workspace.
+        """
+        queryset = Task.objects.filter(pk__in=task_ids, board__workspace_id=self.context["workspace_id"])
+        if lock:
+            queryset = queryset.select_for_update(of=("self",))
+        rows = list(queryset.order_by("board_id", "status", "position", "id").values_list("id", "board_id", "status"))
+        missing = set(task_ids) - {pk for pk, _, _ in rows}
+        if missing:
+            raise serializers.ValidationError(
+                {"tasks": [f'Task "{pk}" not found in this workspace.' for pk in sorted(missing)]}
+            )
+        return rows
+
+    def _remap_labels(self, moved_boards: dict[int, int], target_board: Optional[int], seqs: dict) -> Counter:
+        """
+        Point the label links of tasks that changed board at the target
+        board's labels with the same name and colour, creating those that
+        are missing. Returns the label counter deltas.
+        """
+        deltas = Counter()
+        if not moved_boards:
+            return deltas
+        through = Task.labels.through
+        links = list(
+            through.objects.filter(task_id__in=list(moved_boards)).values_list(
+                "task_id", "label_id", "label__name", "label__color"
+            )
+        )
+        if not links:
+            return deltas
+
+        target_labels = {
+            (name, color): pk
+            for pk, name, color in Label.objects.filter(board_id=target_board).values_list("id", "name", "color")
+        }
+        missing = {(name, color) for _, _, name, color in links} - target_labels.keys()
+        if missing:
+            created = Label.objects.bulk_create(
+                Label(board_id=target_board, name=name, color=color, change_seq=seqs[target_board])
+                for name, color in sorted(missing)
+            )
+            target_labels.update({(label.name, label.color): label.pk for label in created})
+            publish_board_event(target_board, "label.created", seqs[target_board], [label.pk for label in created])
+
+        through.objects.filter(task_id__in=list(moved_boards)).delete()
+        new_links = {(task_id, target_labels[name, color]) for task_id, _, name, color in links}
+        through.objects.bulk_create(through(task_id=task_id, label_id=label_id) for task_id, label_id in new_links)
+        deltas.subtract(label_id for _, label_id, _, _ in links)
+        deltas.update(label_id for _, label_id in new_links)
+        return deltas
@@ -0,0 +1,198 @@
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db.models import F
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from boards.events import publish_board_event
+from boards.models import Board
+from boards.versioning import announce_board_changes, bump_board_version
+from workspaces.models import Workspace
+from . import counters
+from .changes import mark_tasks_changed, record_deletions
+from .models import ArchivedTask, Label, Task
+from .search import get_search_backend
+
+_suspended: ContextVar[bool] = ContextVar("task_signals_suspended", default=False)
+
+
+@contextmanager
+def suspend_task_signals():
+    """
+    Turn the task receivers below into no-ops.
+
+    Used by bulk code paths that apply their own aggregated updates
+    instead of one per row.
+    """
+    token = _suspended.set(True)
+    try:
+        yield
+    finally:
+        _suspended.reset(token)
+
+
+def _is_task_deletion(origin) -> bool:
+    """
+    Return whether a delete started from tasks themselves.
+
+    Tasks deleted through a board or workspace cascade take their
+    counters with them, so there is nothing to maintain.
+    """
+    return isinstance(origin, Task) or getattr(origin, "model", None) is Task
+
+
+@receiver(pre_save, sender=Task)
+def task_saving(sender, instance: Task, **kwargs):
+    # stamp the row with the board's next change sequence as it is written
+    if not _suspended.get():
+        instance.change_seq = bump_board_version(instance.board_id)[instance.board_id]
+
+
+@receiver(post_save, sender=Task)
+def task_saved(sender, instance: Task, created: bool, **kwargs):
+    loaded = getattr(instance, "_loaded_values", None)
+    instance._loaded_values = {field: getattr(instance, field) for field in Task.TRACKED_FIELDS}
+    if _suspended.get():
+        return
+
+    event_type = "task.created" if created else "task.updated"
+    publish_board_event(instance.board_id, event_type, instance.change_seq, [instance.pk])
+    if created or loaded is None:
+        if created:
+            counters.apply_status_deltas(instance.board_id, Counter({instance.status: 1}))
+        get_search_backend().index_tasks([instance.pk])
+        return
+
+    old_status, old_board_id = loaded.get("status"), loaded.get("board_id")
+    if (old_status, old_board_id) != (instance.status, instance.board_id):
+        counters.apply_status_deltas(old_board_id, Counter({old_status: -1}))
+        counters.apply_status_deltas(instance.board_id, Counter({instance.status: 1}))
+    if (loaded.get("title"), loaded.get("description")) != (instance.title, instance.description):
+        get_search_backend().index_tasks([instance.pk])
+    if old_board_id != instance.board_id:
+        # the task left its old board: sync clients of that board drop it
+        seq = bump_board_version(old_board_id)[old_board_id]
+        record_deletions(old_board_id, "task", [instance.pk], seq)
+
+
+@receiver(pre_delete, sender=Task)
+def task_deleting(sender, instance: Task, origin=None, **kwargs):
+    # the label links are gone by post_delete
+    if _suspended.get() or not _is_task_deletion(origin):
+        return
+    # task_deleted needs the status and board, which can no longer be
+    # loaded once the row is gone
+    deferred = instance.get_deferred_fields() & {"status", "board_id"}
+    if deferred:
+        instance.refresh_from_db(fields=sorted(deferred))
+    Label.objects.filter(tasks=instance).update(task_count=F("task_count") - 1)
+
+
+@receiver(post_delete, sender=Task)
+def task_deleted(sender, instance: Task, origin=None, **kwargs):
+    if _suspended.get() or not _is_task_deletion(origin):
+        return
+    get_search_backend().remove_tasks([instance.pk])
+    status = getattr(instance, "_loaded_values", {}).get("status", instance.status)
+    counters.apply_status_deltas(instance.board_id, Counter({status: -1}))
+    seq = bump_board_version(instance.board_id)[instance.board_id]
+    record_deletions(instance.board_id, "task", [instance.pk], seq)
+
+
+@receiver(pre_save, sender=settings.AUTH_USER_MODEL)
+def user_saving(sender, instance, update_fields=None, **kwargs):
+    # usernames appear in task (assignee) and workspace (owner) strings
+    # of board responses; remember whether this save renames the user
+    if instance.pk is None or (update_fields is not None and "username" not in update_fields):
+        return
+    stored = sender.objects.filter(pk=instance.pk).values_list("username", flat=True).first()
+    instance._renamed = stored is not None and stored != instance.username
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def user_saved(sender, instance, **kwargs):
+    if not getattr(instance, "_renamed", False):
+        return
+    instance._renamed = False
+    board_ids = {
+        *Task.objects.filter(assignee=instance).values_list("board_id", flat=True).distinct(),
+        *ArchivedTask.objects.filter(assignee=instance).values_list("board_id", flat=True).distinct(),
+        *Board.objects.filter(workspace__owner=instance).values_list("pk", flat=True),
+    }
+    announce_board_changes(board_ids)
+
+
+@receiver(pre_delete, sender=Workspace)
+def workspace_deleting(sender, instance: Workspace, **kwargs):
+    # drop the tasks of every board from the search index in one statement
+    get_search_backend().remove_matching(Task.objects.filter(board__workspace=instance))
+
+
+@receiver(pre_delete, sender=Board)
+def board_deleting(sender, instance: Board, origin=None, **kwargs):
+    # one statement rather than one per cascaded task; a workspace
+    # deletion has already removed them
+    if not isinstance(origin, Workspace):
+        get_search_backend().remove_matching(Task.objects.filter(board=instance))
+
+
+@receiver(m2m_changed, sender=Task.labels.through)
+def task_labels_changed(sender, instance, action: str, reverse: bool, pk_set, **kwargs):
+    """
+    Keep label counters and task change sequences in step with
+    ``task.labels`` and ``label.tasks``.
+
+    ``pre_remove`` and ``pre_clear`` record which links really exist,
+    because ``pk_set`` may name objects that were never linked.
+    """
+    if _suspended.get():
+        return
+
+    through = Task.labels.through
+    field, other = ("label_id", "task_id") if reverse else ("task_id", "label_id")
+    links = through.objects.filter(**{field: instance.pk})
+
+    if action == "pre_remove":
+        instance._removed_links = list(links.filter(**{f"{other}__in": pk_set}).values_list(other, flat=True))
+    elif action == "pre_clear":
+        instance._removed_links = list(links.values_list(other, flat=True))
+    elif action in ("post_remove", "post_clear"):
+        _links_changed(instance, reverse, instance._removed_links, -1)
+    elif action == "post_add":
+        _links_changed(instance, reverse, pk_set, 1)
+
+
+@receiver(pre_save, sender=Label)
+def label_saving(sender, instance: Label, **kwargs):
+    if not _suspended.get():
+        instance.change_seq = bump_board_version(instance.board_id)[instance.board_id]
+
+
+@receiver(post_save, sender=Label)
+def label_saved(sender, instance: Label, created: bool, **kwargs):
+    if not _suspended.get():
+        event_type = "label.created" if created else "label.updated"
+        publish_board_event(instance.board_id, event_type, instance.change_seq, [instance.pk])
+
+
+@receiver(post_delete, sender=Label)
+def label_deleted(sender, instance: Label, origin=None, **kwargs):
+    if _suspended.get():
+        return
+    if isinstance(origin, Label) or getattr(origin, "model", None) is Label:
+        seq = bump_board_version(instance.board_id)[instance.board_id]
+        record_deletions(instance.board_id, "label", [instance.pk], seq)
+
+
+def _links_changed(instance, reverse: bool, pks, delta: int) -> None:
+    if not pks:
+        return
+    if reverse:
+        counters.apply_label_deltas(Counter({instance.pk: delta * len(pks)}))
+        mark_tasks_changed(instance.board_id, pks)
+    else:
+        counters.apply_label_deltas(Counter({label_id: delta for label_id in pks}))
+        mark_tasks_changed(instance.board_id, [instance.pk])
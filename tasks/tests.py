@@ -1,10 +1,25 @@
+import io
+from datetime import date, timedelta
 import pytest
-from django.urls import reverse
-from rest_framework.test import APIClient
+from asgiref.sync import async_to_sync
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+from django.utils import timezone
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+from rest_framework_simplejwt.tokens import AccessToken
 from accounts.models import User
 from workspaces.models import Workspace, WorkspaceMember
 from boards.models import Board
-from tasks.models import Task
+from tasks import ranking
+from tasks.models import BoardStatusCount, Task, Label
+from tasks.counters import rebuild_counters
+from tasks.search import get_search_backend
+from tasks.seeding import SeedOptions, Seeder
+from tasks.views import BoardReportView
+from django.db.models import Count, F
+from boards.cache import response_cache
 
 @pytest.mark.django_db
 def test_create_task():
@@ -16,7 +31,7 @@ def test_create_task():
     client = APIClient()
     client.force_authenticate(user=user)
 
-    url = reverse("task-list-create", kwargs={"board_pk": board.id})
+    url = reverse("task-list-create", kwargs={"workspace_pk": workspace.id, "board_pk": board.id})
     response = client.post(url, {
         "title": "Test Task",
         "description": "Just a test"
@@ -24,3 +39,690 @@ def test_create_task():
 
     assert response.status_code == 201
     assert Task.objects.filter(title="Test Task", board=board).exists()
+
+
+def _create_board_with_tasks(count):
+    user = User.objects.create_user(username=f"user{count}", email=f"u{count}@example.com", password="pass1234")
+    workspace = Workspace.objects.create(name="Workspace", owner=user)
+    WorkspaceMember.objects.create(workspace=workspace, user=user, role="OWNER")
+    board = Board.objects.create(title="Board", workspace=workspace)
+    labels = [Label.objects.create(name=f"Label {i}", board=board) for i in range(3)]
+    for i in range(count):
+        task = Task.objects.create(title=f"Task {i}", board=board, assignee=user)
+        task.labels.set(labels[: i % 3 + 1])
+    return user, workspace, board
+
+
+@pytest.mark.django_db
+def test_task_list_query_count_is_constant():
+    query_counts = []
+    for count in (3, 30):
+        user, workspace, board = _create_board_with_tasks(count)
+        client = APIClient()
+        client.force_authenticate(user=user)
+        url = reverse("task-list-create", kwargs={"workspace_pk": workspace.id, "board_pk": board.id})
+
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+
+        assert response.status_code == 200
+        results = response.data["results"]
+        assert len(results) == count
+        assert results[0]["board"] == "Board (Workspace: Workspace)"
+        assert results[0]["labels"][0]["board"] == "Board (Workspace: Workspace)"
+        query_counts.append(len(context.captured_queries))
+
+    # board version, membership, board, tasks with joins, labels prefetch
+    assert query_counts == [5, 5]
+
+
+@pytest.mark.django_db
+def test_task_list_keyset_pagination():
+    user, workspace, board = _create_board_with_tasks(7)
+    client = APIClient()
+    client.force_authenticate(user=user)
+    url = reverse("task-list-create", kwargs={"workspace_pk": workspace.id, "board_pk": board.id})
+
+    seen, query_counts = [], []
+    next_url = f"{url}?page_size=3"
+    while next_url:
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(next_url)
+        assert response.status_code == 200
+        query_counts.append(len(context.captured_queries))
+        seen.extend(task["id"] for task in response.data["results"])
+        last_page = response.data
+        next_url = response.data["next"]
+
+    expected = list(Task.objects.filter(board=board).order_by("created_at", "id").values_list("id", flat=True))
+    assert seen == expected
+    # the first request also resolves the membership role
+    assert len(set(query_counts[1:])) == 1
+
+    previous = client.get(last_page["previous"])
+    assert [task["id"] for task in previous.data["results"]] == expected[3:6]
+    assert client.get(f"{url}?cursor=not-a-cursor").status_code == 404
+
+
+@pytest.mark.django_db
+def test_bulk_create_update_delete_tasks():
+    user, workspace, board = _create_board_with_tasks(2)
+    first, second = Task.objects.filter(board=board).order_by("id")
+    label = Label.objects.filter(board=board).first()
+    client = APIClient()
+    client.force_authenticate(user=user)
+    url = reverse("task-bulk", kwargs={"workspace_pk": workspace.id, "board_pk": board.id})
+
+    response = client.post(url, {
+        "create": [
+            {"title": "New 1", "label_ids": [label.id]},
+            {"title": "New 2", "status": "DOING"},
+        ],
+        "update": [{"id": first.id, "status": "DONE", "label_ids": []}],
+        "delete": [second.id],
+    }, format="json")
+
+    assert response.status_code == 200
+    assert [item["status"] for item in response.data["create"]] == ["created", "created"]
+    new_task = Task.objects.get(pk=response.data["create"][0]["id"])
+    assert list(new_task.labels.all()) == [label]
+    first.refresh_from_db()
+    assert first.status == "DONE"
+    assert not first.labels.exists()
+    assert not Task.objects.filter(pk=second.id).exists()
+    assert rebuild_counters(dry_run=True) == []
+    assert set(get_search_backend().search(workspace.id, "new", 10, 0)) == {
+        item["id"] for item in response.data["create"]
+    }
+
+
+@pytest.mark.django_db
+def test_bulk_tasks_invalid_item_writes_nothing():
+    user, workspace, board = _create_board_with_tasks(1)
+    other_board = Board.objects.create(title="Other", workspace=workspace)
+    foreign_label = Label.objects.create(name="Foreign", board=other_board)
+    client = APIClient()
+    client.force_authenticate(user=user)
+    url = reverse("task-bulk", kwargs={"workspace_pk": workspace.id, "board_pk": board.id})
+
+    response = client.post(url, {
+        "create": [{"title": "Valid"}, {"title": "Bad", "label_ids": [foreign_label.id]}],
+        "delete": [999999],
+    }, format="json")
+
+    assert response.status_code == 400
+    assert response.data["create"][0] == {}
+    assert "label_ids" in response.data["create"][1]
+    assert response.data["delete"] == [{"id": ["Task not found."]}]
+    assert Task.objects.filter(board=board).count() == 1
+
+
+@pytest.mark.django_db
+def test_board_report_served_from_counters(django_assert_num_queries):
+    user, workspace, board = _create_board_with_tasks(6)
+    label_a, label_b, label_c = Label.objects.filter(board=board).order_by("id")
+    tasks = list(Task.objects.filter(board=board).order_by("id"))
+    tasks[0].status = "DONE"
+    tasks[0].save()
+    tasks[1].labels.remove(label_a)
+    tasks[2].labels.clear()
+    label_c.tasks.add(tasks[0])
+    tasks[3].delete()
+
+    client = APIClient()
+    client.force_authenticate(user=user)
+    url = reverse("board-report", kwargs={"workspace_pk": workspace.id, "board_pk": board.id})
+    response = client.get(url)
+
+    assert response.status_code == 200
+    assert sorted((row["status"], row["count"]) for row in response.data["tasks_by_status"]) == [
+        ("DONE", 1), ("TODO", 4),
+    ]
+    expected = {label.name: label.tasks.count() for label in (label_a, label_b, label_c)}
+    assert {row["name"]: row["count"] for row in response.data["tasks_by_label"]} == expected
+
+    # board version, board, then the two counter queries; membership is cached
+    response_cache().clear()
+    with django_assert_num_queries(4):
+        client.get(url)
+
+    BoardStatusCount.objects.filter(board=board).update(count=0)
+    Label.objects.filter(board=board).update(task_count=42)
+    call_command("rebuild_board_counters", board=[board.id], stdout=io.StringIO())
+    response_cache().clear()
+    assert client.get(url).data == response.data
+
+
+@pytest.mark.django_db
+def test_board_report_async_view_matches_sync(settings):
+    user, workspace, board = _create_board_with_tasks(4)
+    url = reverse("board-report", kwargs={"workspace_pk": workspace.id, "board_pk": board.id})
+    client = APIClient()
+    client.force_authenticate(user=user)
+    expected = client.get(url).data
+
+    settings.ASYNC_READ_VIEWS = True
+    request = APIRequestFactory().get(url)
+    request.resolver_match = resolve(url)
+    force_authenticate(request, user=user)
+    response_cache().clear()
+    response = async_to_sync(BoardReportView.as_view())(request, workspace_pk=workspace.id, board_pk=board.id)
+    assert response.status_code == 200
+    assert response.data == expected
+
+
+@pytest.mark.django_db
+def test_counters_follow_stored_status_of_stale_and_partial_instances():
+    user, workspace, board = _create_board_with_tasks(3)
+    task = Task.objects.filter(board=board).order_by("id").first()
+    first, stale = Task.objects.get(pk=task.pk), Task.objects.get(pk=task.pk)
+    first.status = "DOING"
+    first.save()
+    # loaded while the task was still TODO
+    stale.status = "DONE"
+    stale.save()
+    assert rebuild_counters(dry_run=True) == []
+
+    partial = Task.objects.only("id", "title").get(pk=task.pk)
+    partial.title = "Renamed"
+    partial.save()
+    assert rebuild_counters(dry_run=True) == []
+    Task.objects.only("id").get(pk=task.pk).delete()
+    assert rebuild_counters(dry_run=True) == []
+
+
+@pytest.mark.django_db
+def test_conditional_get_uses_board_version(django_assert_num_queries):
+    user, workspace, board = _create_board_with_tasks(3)
+    client = APIClient()
+    client.force_authenticate(user=user)
+    kwargs = {"workspace_pk": workspace.id, "board_pk": board.id}
+    urls = [
+        reverse("task-list-create", kwargs=kwargs),
+        reverse("label-list-create", kwargs=kwargs),
+        reverse("board-report", kwargs=kwargs),
+    ]
+
+    etags = {}
+    for url in urls:
+        response = client.get(url)
+        assert response.status_code == 200
+        etags[url] = response["ETag"]
+        assert response["Last-Modified"]
+
+    for url in urls:
+        # only the board version lookup; membership is cached
+        with django_assert_num_queries(1):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+        assert response.status_code == 304
+        assert response["ETag"] == etags[url]
+
+    client.post(urls[0], {"title": "Another task"})
+    for url in urls:
+        response = client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+        assert response.status_code == 200
+        assert response["ETag"] != etags[url]
+
+    # the workspace name and the assignee's username are in the task list
+    member = User.objects.create_user(username="helper", email="helper@example.com", password="pass1234")
+    Task.objects.filter(board=board).update(assignee=member)
+    client.post(urls[0], {"title": "Yet another task"})
+    etag = client.get(urls[0])["ETag"]
+    workspace.name = "Renamed workspace"
+    workspace.save()
+    response = client.get(urls[0], HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert "Renamed workspace" in response.content.decode()
+
+    etag = response["ETag"]
+    member.save(update_fields=["last_login"])
+    assert client.get(urls[0], HTTP_IF_NONE_MATCH=etag).status_code == 304
+    member.username = "renamed-helper"
+    member.save()
+    response = client.get(urls[0], HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert "renamed-helper" in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_if_modified_since_alone_never_hides_a_same_second_write():
+    user, workspace, board = _create_board_with_tasks(2)
+    client = APIClient()
+    client.force_authenticate(user=user)
+    url = reverse("task-list-create", kwargs={"workspace_pk": workspace.id, "board_pk": board.id})
+    first = client.get(url)
+    updated_at = Board.objects.get(pk=board.pk).updated_at
+
+    assert client.post(url, {"title": "Same second"}).status_code == 201
+    # as if the write landed within the second of the first response
+    Board.objects.filter(pk=board.pk).update(updated_at=updated_at)
+    response = client.get(url, HTTP_IF_MODIFIED_SINCE=first["Last-Modified"])
+    assert response.status_code == 200
+    assert "Same second" in [task["title"] for task in response.data["results"]]
+
+
+@pytest.mark.django_db
+def test_board_snapshot_in_fixed_queries(django_assert_num_queries):
+    user, workspace, board = _create_board_with_tasks(12)
+    Task.objects.filter(board=board, title="Task 0").update(status="DONE")
+    client = APIClient()
+    client.force_authenticate(user=user)
+    url = reverse("board-snapshot", kwargs={"workspace_pk": workspace.id, "board_pk": board.id})
+    client.get(url)
+    response_cache().clear()
+
+    # board version, board, labels, label links, tasks, assignees
+    with django_assert_num_queries(6):
+        response = client.get(url)
+
+    assert response.status_code == 200
+    assert response.data["board"]["workspace"] == {"id": workspace.id, "name": "Workspace"}
+    assert len(response.data["labels"]) == 3
+    assert len(response.data["tasks"]["TODO"]) == 11
+    assert [task["title"] for task in response.data["tasks"]["DONE"]] == ["Task 0"]
+    assert response.data["tasks"]["DONE"][0]["label_ids"] == [
+        label.id for label in Task.objects.get(title="Task 0").labels.order_by("id")
+    ]
+    assert response.data["assignees"] == [{"id": user.id, "username": user.username}]
+
+
+@pytest.mark.django_db
+def test_workspace_task_search():
+    user, workspace, board = _create_board_with_tasks(0)
+    outsider = User.objects.create_user(username="outsider", email="out@example.com", password="pass1234")
+    described = Task.objects.create(title="Misc", description="fix the login redirect", board=board)
+    titled = Task.objects.create(title="Login page crashes", board=board)
+    renamed = Task.objects.create(title="Old name", board=board)
+    removed = Task.objects.create(title="Login cleanup", board=board)
+    other_workspace = Workspace.objects.create(name="Other", owner=outsider)
+    Task.objects.create(title="Login elsewhere", board=Board.objects.create(title="B", workspace=other_workspace))
+
+    renamed.title = "Logins audit"
+    renamed.save()
+    removed.delete()
+
+    client = APIClient()
+    client.force_authenticate(user=user)
+    url = reverse("workspace-search", kwargs={"workspace_pk": workspace.id})
+
+    response = client.get(url, {"q": "login"})
+    assert response.status_code == 200
+    ids = [task["id"] for task in response.data["results"]]
+    # title matches outrank description matches; the prefix matches "Logins"
+    assert set(ids) == {titled.id, renamed.id, described.id}
+    assert ids[-1] == described.id
+
+    response = client.get(url, {"q": "login", "page_size": 2})
+    assert len(response.data["results"]) == 2
+    assert response.data["next"]
+    assert [task["id"] for task in client.get(response.data["next"]).data["results"]] == [ids[2]]
+
+    client.force_authenticate(user=outsider)
+    assert client.get(url, {"q": "login"}).status_code == 403
+
+    # deleting a board or a workspace takes its tasks out of the index
+    board.delete()
+    other_workspace.delete()
+    if connection.vendor == "sqlite":
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT count(*) FROM tasks_task_fts")
+            assert cursor.fetchone() == (0,)
+
+
+@pytest.mark.django_db
+def test_board_changes_since_sequence():
+    user, workspace, board = _create_board_with_tasks(3)
+    other_board = Board.objects.create(title="Other", workspace=workspace)
+    client = APIClient()
+    client.force_authenticate(user=user)
+    url = reverse("board-changes", kwargs={"workspace_pk": workspace.id, "board_pk": board.id})
+
+    response = client.get(url)
+    assert response.status_code == 200
+    assert len(response.data["tasks"]) == 3
+    assert len(response.data["labels"]) == 3
+    assert response.data["deleted"] == {"tasks": [], "labels": []}
+    since = response.data["seq"]
+    assert client.get(url, {"since": since}).data["tasks"] == []
+
+    edited, relabeled, moved = Task.objects.filter(board=board).order_by("id")
+    edited.title = "Edited"
+    edited.save()
+    relabeled.labels.clear()
+    moved.board = other_board
+    moved.save()
+    label = Label.objects.filter(board=board).first()
+    label_id = label.id
+    label.delete()
+    created = Task.objects.create(title="New", board=board)
+
+    response = client.get(url, {"since": since})
+    assert {task["id"] for task in response.data["tasks"]} == {edited.id, relabeled.id, created.id}
+    assert response.data["labels"] == []
+    assert response.data["deleted"] == {"tasks": [moved.id], "labels": [label_id]}
+    assert response.data["seq"] > since
+
+    since = response.data["seq"]
+    client.post(
+        reverse("task-bulk", kwargs={"workspace_pk": workspace.id, "board_pk": board.id}),
+        {"create": [{"title": "Bulk"}], "update": [{"id": edited.id, "status": "DONE"}], "delete": [created.id]},
+        format="json",
+    )
+    response = client.get(url, {"since": since})
+    assert {task["title"] for task in response.data["tasks"]} == {"Bulk", "Edited"}
+    assert response.data["deleted"] == {"tasks": [created.id], "labels": []}
+    assert client.get(url, {"since": "abc"}).status_code == 400
+
+
+@pytest.mark.django_db
+def test_workspace_dashboard_in_fixed_queries(django_assert_num_queries):
+    user, workspace, board = _create_board_with_tasks(3)
+    Task.objects.filter(board=board, title="Task 0").update(due_date=date.today() - timedelta(days=2))
+    Board.objects.create(title="Quiet", workspace=workspace)
+    busy = Board.objects.create(title="Busy", workspace=workspace)
+    Task.objects.create(title="Late", board=busy, status="DOING", due_date=date.today() - timedelta(days=1))
+    Task.objects.create(title="Late but done", board=busy, status="DONE", due_date=date.today() - timedelta(days=1))
+    Task.objects.create(title="Not late", board=busy, due_date=date.today())
+
+    client = APIClient()
+    client.force_authenticate(user=user)
+    url = reverse("workspace-dashboard", kwargs={"workspace_pk": workspace.id})
+
+    # membership, workspace, boards, status counters, overdue counts
+    with django_assert_num_queries(5):
+        response = client.get(url)
+
+    assert response.status_code == 200
+    assert response.data["workspace"] == {"id": workspace.id, "name": "Workspace"}
+    boards = {item["title"]: item for item in response.data["boards"]}
+    assert list(boards) == ["Board", "Quiet", "Busy"]
+    assert boards["Board"]["tasks_by_status"]["TODO"] == 3 and boards["Board"]["overdue"] == 1
+    assert boards["Quiet"]["total"] == 0 and boards["Quiet"]["overdue"] == 0
+    assert boards["Busy"]["tasks_by_status"] == {"TODO": 1, "DOING": 1, "DONE": 1, "SUSPEND": 0}
+    assert boards["Busy"]["overdue"] == 1
+    assert boards["Busy"]["last_activity"] > boards["Quiet"]["last_activity"]
+
+    outsider = User.objects.create_user(username="outsider", email="out@example.com", password="pass1234")
+    client.force_authenticate(user=outsider)
+    assert client.get(url).status_code == 403
+
+
+@pytest.mark.django_db
+def test_my_tasks_across_workspaces(django_assert_num_queries):
+    user, workspace, board = _create_board_with_tasks(2)
+    other_owner = User.objects.create_user(username="lead", email="lead@example.com", password="pass1234")
+    joined = Workspace.objects.create(name="Joined", owner=other_owner)
+    WorkspaceMember.objects.create(workspace=joined, user=user, role="MEMBER")
+    joined_board = Board.objects.create(title="Joined board", workspace=joined)
+    left = Workspace.objects.create(name="Left", owner=other_owner)
+    left_board = Board.objects.create(title="Left board", workspace=left)
+
+    today = date.today()
+    soon = Task.objects.create(title="Soon", board=joined_board, assignee=user, status="DOING", due_date=today)
+    Task.objects.create(title="Later", board=joined_board, assignee=user, due_date=today + timedelta(days=30))
+    Task.objects.create(title="Not mine", board=joined_board, assignee=other_owner)
+    Task.objects.create(title="No longer visible", board=left_board, assignee=user)
+
+    client = APIClient()
+    client.force_authenticate(user=user)
+    url = reverse("my-tasks")
+
+    # tasks with membership check and joins, labels prefetch
+    with django_assert_num_queries(2):
+        response = client.get(url)
+    assert response.status_code == 200
+    assert {task["title"] for task in response.data["results"]} == {"Task 0", "Task 1", "Soon", "Later"}
+
+    response = client.get(url, {"status": "DOING,DONE"})
+    assert [task["id"] for task in response.data["results"]] == [soon.id]
+    response = client.get(url, {"due_after": today.isoformat(), "due_before": (today + timedelta(days=7)).isoformat()})
+    assert [task["title"] for task in response.data["results"]] == ["Soon"]
+
+    response = client.get(url, {"page_size": 3})
+    assert len(response.data["results"]) == 3
+    assert len(client.get(response.data["next"]).data["results"]) == 1
+
+    assert client.get(url, {"status": "LATE"}).status_code == 400
+    assert client.get(url, {"due_after": "2024-13-01"}).status_code == 400
+
+
+@pytest.mark.django_db
+def test_move_task_between_neighbours(settings, django_capture_on_commit_callbacks):
+    settings.TASK_RANK_REBALANCE = "inline"
+    user, workspace, board = _create_board_with_tasks(3)
+    first, second, third = Task.objects.column(board.id, "TODO")
+    assert [first.position, second.position, third.position] == [1024.0, 2048.0, 3072.0]
+
+    client = APIClient()
+    client.force_authenticate(user=user)
+    kwargs = {"workspace_pk": workspace.id, "board_pk": board.id}
+
+    def move(task, **data):
+        return client.post(reverse("task-move", kwargs={**kwargs, "pk": task.id}), data, format="json")
+
+    response = move(third, after=first.id)
+    assert response.status_code == 200
+    assert response.data["position"] == 1536.0
+    assert list(Task.objects.column(board.id, "TODO")) == [first, third, second]
+
+    assert move(second, after=None).data["position"] == 512.0
+    response = move(first, status="DOING", after=None)
+    assert response.data["status"] == "DOING"
+    assert response.data["position"] == Task.POSITION_STEP
+    assert move(first, status="DONE", after=second.id).status_code == 400
+
+    listing = client.get(reverse("task-list-create", kwargs=kwargs), {"status": "TODO"})
+    assert [task["id"] for task in listing.data["results"]] == [second.id, third.id]
+
+    # a gap too small to split again makes the move rebalance the column after commit
+    Task.objects.filter(pk=third.pk).update(position=512.0 + 1e-8)
+    with django_capture_on_commit_callbacks(execute=True):
+        assert move(first, status="TODO", after=second.id).status_code == 200
+    assert list(Task.objects.column(board.id, "TODO")) == [second, first, third]
+    positions = list(Task.objects.column(board.id, "TODO").values_list("position", flat=True))
+    assert positions == [1024.0, 2048.0, 3072.0]
+    assert not ranking.is_dense(positions[0], positions[1])
+
+    Task.objects.create(title="Appended", board=board)
+    assert Task.objects.column(board.id, "TODO").last().title == "Appended"
+
+
+@pytest.mark.django_db
+def test_bulk_move_tasks_across_boards(django_assert_max_num_queries):
+    user, workspace, board = _create_board_with_tasks(4)
+    member = User.objects.create_user(username="mover", email="mover@example.com", password="pass1234")
+    WorkspaceMember.objects.create(workspace=workspace, user=member, role="MEMBER")
+    target = Board.objects.create(title="Next sprint", workspace=workspace)
+    Label.objects.create(name="Label 0", board=target)
+    kept = Task.objects.create(title="Already there", board=target)
+    tasks = list(Task.objects.filter(board=board, title__startswith="Task").order_by("id"))
+    moved = tasks[:3]
+    version = Board.objects.get(pk=board.pk).version
+
+    client = APIClient()
+    client.force_authenticate(user=user)
+    url = reverse("workspace-task-move", kwargs={"workspace_pk": workspace.id})
+
+    # bounded by boards, columns and labels touched, not by the number of tasks
+    with django_assert_max_num_queries(30):
+        response = client.post(
+            url,
+            {"tasks": [task.id for task in moved], "board": target.id, "status": "DOING", "assignee": member.id},
+            format="json",
+        )
+    assert response.status_code == 200
+    assert response.data == {"moved": [task.id for task in moved]}
+
+    assert set(Task.objects.filter(board=target, status="DOING", assignee=member)) == set(moved)
+    assert list(Task.objects.column(target.id, "TODO")) == [kept]
+    assert list(Task.objects.column(target.id, "DOING")) == moved
+    for task in moved:
+        assert {label.board_id for label in task.labels.all()} == {target.id}
+    # "Label 0" was reused, the other two were created on the target board
+    assert Label.objects.filter(board=target).count() == 3
+    assert Task.objects.get(pk=moved[2].pk).labels.count() == 3
+    assert rebuild_counters(dry_run=True) == []
+    assert Board.objects.get(pk=board.pk).version > version
+
+    changes = client.get(
+        reverse("board-changes", kwargs={"workspace_pk": workspace.id, "board_pk": board.id}), {"since": version}
+    )
+    assert sorted(changes.data["deleted"]["tasks"]) == [task.id for task in moved]
+
+    response = client.post(url, {"tasks": [tasks[3].id], "status": "DONE"}, format="json")
+    assert response.status_code == 200
+    assert Task.objects.get(pk=tasks[3].pk).status == "DONE"
+    assert rebuild_counters(dry_run=True) == []
+
+    # tasks from two source columns get distinct positions, and moving
+    # back clears the tombstones left when they moved away
+    back = [moved[0].id, kept.id]
+    assert client.post(url, {"tasks": back, "board": board.id, "status": "TODO"}, format="json").status_code == 200
+    positions = list(Task.objects.filter(pk__in=back).values_list("position", flat=True))
+    assert len(set(positions)) == 2
+    changes = client.get(
+        reverse("board-changes", kwargs={"workspace_pk": workspace.id, "board_pk": board.id}), {"since": 0}
+    )
+    assert moved[0].id in [row["id"] for row in changes.data["tasks"]]
+    changes = client.get(
+        reverse("board-changes", kwargs={"workspace_pk": workspace.id, "board_pk": board.id}), {"since": 1}
+    )
+    assert moved[0].id not in changes.data["deleted"]["tasks"]
+    assert rebuild_counters(dry_run=True) == []
+
+    assert client.post(url, {"tasks": [tasks[3].id]}, format="json").status_code == 400
+    assert client.post(url, {"tasks": [999999], "status": "DONE"}, format="json").status_code == 400
+    outsider = User.objects.create_user(username="outsider", email="out@example.com", password="pass1234")
+    assert client.post(url, {"tasks": [tasks[3].id], "assignee": outsider.id}, format="json").status_code == 400
+
+
+@pytest.mark.django_db
+def test_archive_and_restore_done_tasks():
+    user, workspace, board = _create_board_with_tasks(5)
+    tasks = list(Task.objects.filter(board=board).order_by("id"))
+    old = timezone.now() - timedelta(days=365)
+    Task.objects.filter(pk__in=[tasks[0].pk, tasks[1].pk, tasks[2].pk]).update(status="DONE", updated_at=old)
+    Task.objects.filter(pk=tasks[3].pk).update(status="DONE")
+    rebuild_counters()
+    version = Board.objects.get(pk=board.pk).version
+
+    out = io.StringIO()
+    call_command("archive_done_tasks", "--days", "30", "--batch-size", "2", stdout=out)
+    assert "3 task(s) archived." in out.getvalue()
+    assert sorted(Task.objects.filter(board=board).values_list("id", flat=True)) == [tasks[3].pk, tasks[4].pk]
+    assert rebuild_counters(dry_run=True) == []
+
+    client = APIClient()
+    client.force_authenticate(user=user)
+    kwargs = {"workspace_pk": workspace.id, "board_pk": board.id}
+    assert len(client.get(reverse("task-list-create", kwargs=kwargs)).data["results"]) == 2
+    changes = client.get(reverse("board-changes", kwargs=kwargs), {"since": version})
+    assert sorted(changes.data["deleted"]["tasks"]) == [task.pk for task in tasks[:3]]
+
+    archived = client.get(reverse("board-archive", kwargs=kwargs)).data["results"]
+    assert [row["id"] for row in archived] == [task.pk for task in tasks[:3]]
+    assert [label["name"] for label in archived[2]["labels"]] == ["Label 0", "Label 1", "Label 2"]
+
+    response = client.post(reverse("archived-task-restore", kwargs={**kwargs, "pk": tasks[2].pk}))
+    assert response.status_code == 200
+    assert response.data["id"] == tasks[2].pk
+    assert len(response.data["labels"]) == 3
+    assert rebuild_counters(dry_run=True) == []
+    assert len(client.get(reverse("board-archive", kwargs=kwargs)).data["results"]) == 2
+    changes = client.get(reverse("board-changes", kwargs=kwargs), {"since": version})
+    assert tasks[2].pk in [row["id"] for row in changes.data["tasks"]]
+    assert sorted(changes.data["deleted"]["tasks"]) == [task.pk for task in tasks[:2]]
+    assert client.post(reverse("archived-task-restore", kwargs={**kwargs, "pk": tasks[2].pk})).status_code == 403
+
+    outsider = User.objects.create_user(username="outsider", email="out@example.com", password="pass1234")
+    client.force_authenticate(user=outsider)
+    assert client.get(reverse("board-archive", kwargs=kwargs)).status_code == 403
+
+
+@pytest.mark.django_db
+def test_fast_read_path_matches_serializer_bytes(settings):
+    user, workspace, board = _create_board_with_tasks(6)
+    tasks = list(Task.objects.filter(board=board).order_by("id"))
+    Task.objects.filter(pk=tasks[0].pk).update(
+        title="Ünïcode   \"quoted\"", description="line\nbreak", due_date=date(2030, 1, 2), assignee=None
+    )
+    # orjson and repr() disagree on floats this small
+    Task.objects.filter(pk=tasks[1].pk).update(position=1e-9)
+    Task.objects.filter(pk=tasks[2].pk).update(position=1536.25)
+
+    client = APIClient()
+    client.force_authenticate(user=user)
+    kwargs = {"workspace_pk": workspace.id, "board_pk": board.id}
+    requests = [
+        (reverse("task-list-create", kwargs=kwargs), {}),
+        (reverse("task-list-create", kwargs=kwargs), {"page_size": 2}),
+        (reverse("task-list-create", kwargs=kwargs), {"status": "TODO"}),
+        (reverse("my-tasks"), {}),
+    ]
+    for url, params in requests:
+        settings.FAST_READ_PATH = False
+        expected = client.get(url, params)
+        settings.FAST_READ_PATH = True
+        fast = client.get(url, params)
+        assert fast.status_code == expected.status_code == 200
+        assert fast["Content-Type"] == expected["Content-Type"]
+        assert fast.content == expected.content
+
+    # other renderers keep the serializer path
+    response = client.get(reverse("my-tasks"), HTTP_ACCEPT="text/html")
+    assert response["Content-Type"].startswith("text/html")
+
+
+@pytest.mark.django_db
+def test_seeder_is_deterministic():
+    options = SeedOptions(users=6, workspaces=2, boards=4, tasks=120, labels=3, members=3, batch_size=50)
+    counts = Seeder(options).run()
+    assert counts == {"users": 6, "workspaces": 2, "boards": 4, "labels": 12, "tasks": 120}
+    assert rebuild_counters(dry_run=True) == []
+    snapshot = list(Task.objects.order_by("id").values_list("title", "status", "position", "due_date"))
+    links = Task.labels.through.objects.count()
+
+    # every task is assigned within its workspace and the hottest board gets the most tasks
+    assert not Task.objects.filter(assignee__isnull=False).exclude(
+        board__workspace__members__user=F("assignee")
+    ).exists()
+    per_board = list(Task.objects.values("board_id").annotate(count=Count("id")).order_by("board_id"))
+    assert per_board[0]["count"] == max(row["count"] for row in per_board)
+
+    Task.objects.all().delete()
+    Seeder(options).run()
+    assert list(Task.objects.order_by("id").values_list("title", "status", "position", "due_date")) == snapshot
+    assert Task.labels.through.objects.count() == links
+
+
+@pytest.mark.django_db
+def test_request_metrics_server_timing_and_log(settings, app_log):
+    user, workspace, board = _create_board_with_tasks(3)
+    url = reverse("task-list-create", kwargs={"workspace_pk": workspace.id, "board_pk": board.id})
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+    settings.REQUEST_METRICS_SAMPLE_RATE = 1.0
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    timing = response["Server-Timing"]
+    assert 'db;dur=' in timing and f'desc="{len(queries)} queries"' in timing
+    for name in ("auth", "membership", "serialize", "render", "total"):
+        assert f"{name};dur=" in timing
+    metrics = app_log.records[-1].request_metrics
+    assert metrics["view"] == "task-list-create"
+    assert metrics["status"] == 200
+    assert metrics["queries"] == len(queries)
+    assert 0 < len(metrics["slow_queries"]) <= settings.REQUEST_METRICS_TOP_QUERIES
+
+    # unsampled requests get no header and are only logged when slow
+    settings.REQUEST_METRICS_SAMPLE_RATE = 0
+    app_log.clear()
+    response = client.get(url, {"page_size": 1})
+    assert "Server-Timing" not in response
+    assert app_log.records == []
+
+    settings.REQUEST_METRICS_SLOW_REQUEST_MS = 0
+    response = client.get(url, {"page_size": 2})
+    assert "Server-Timing" not in response
+    assert app_log.records[-1].levelname == "WARNING"
+    assert app_log.records[-1].request_metrics["slow_queries"] == []
@@ -1,7 +1,9 @@
 from django.urls import path
-from .views import TaskListCreateView, TaskDetailView
+from .views import TaskListCreateView, TaskDetailView, TaskBulkView, TaskMoveView
 
 urlpatterns = [
     path("", TaskListCreateView.as_view(), name="task-list-create"),
     path("<int:pk>/", TaskDetailView.as_view(), name="task-detail"),
+    path("<int:pk>/move/", TaskMoveView.as_view(), name="task-move"),
+    path("bulk/", TaskBulkView.as_view(), name="task-bulk"),
 ]
@@ -1,68 +1,99 @@
+from django.contrib.auth import get_user_model
 from rest_framework import generics, permissions
-from rest_framework.exceptions import PermissionDenied
+from rest_framework.exceptions import PermissionDenied, ValidationError
 from boards.models import Board
-from workspaces.models import WorkspaceMember
-from .models import Task, Label
-from .serializers import TaskSerializer, LabelSerializer
+from boards.versioning import BoardConditionalGetMixin
+from workspaces.models import Workspace
+from workspaces.membership import ADMIN_ROLES, get_member_role
+from .archive import restore_tasks
+from .changes import changes_since
+from .models import ArchivedTask, BoardStatusCount, Task, Label
+from .rows import atask_rows, task_rows, task_values
+from .search import get_search_backend
+from .serializers import (
+    ArchivedTaskSerializer,
+    TaskSerializer,
+    LabelSerializer,
+    TaskBulkSerializer,
+    TaskBulkMoveSerializer,
+    TaskMoveSerializer,
+)
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Count
+from rest_framework.utils.urls import replace_query_param
+from Trello.async_views import AsyncReadMixin
+from Trello.fast_read import FastListMixin
+from Trello.pagination import KeysetPagination
+from django.db.models import Count, F, Prefetch
+from django.utils import timezone
+from django.utils.dateparse import parse_date
 from boards.models import Board
 
+User = get_user_model()
 
-class BoardReportView(APIView):
+
+class BoardReportView(AsyncReadMixin, BoardConditionalGetMixin, APIView):
     """
     API endpoint to return reports for a specific board.
-    Includes tasks by status and tasks by label.
+    Includes tasks by status and tasks by label, served from the
+    counters maintained in tasks.counters.
+    GET runs as an async view under ASGI (see Trello.async_views).
     """
     permission_classes = [IsAuthenticated]
+    query_budget = 8
 
-    def get_board(self, board_pk, user):
-        try:
-            board = Board.objects.get(pk=board_pk)
-        except Board.DoesNotExist:
-            raise PermissionDenied("Board not found.")
+    def get(self, request, workspace_pk, board_pk):
+        return self.conditional_get(self.get_report, request, workspace_pk, board_pk)
 
-        membership = WorkspaceMember.objects.filter(
-            workspace=board.workspace, user=user
-        ).first()
-        if not membership:
-            raise PermissionDenied("You are not a member of this workspace.")
-        return board
+    async def aget(self, request, workspace_pk, board_pk):
+        return await self.aconditional_get(self.aget_report, request, workspace_pk, board_pk)
 
-    def get(self, request, workspace_pk, board_pk):
-        board = self.get_board(board_pk, request.user)
-        if board.workspace_id != workspace_pk:
-            raise PermissionDenied("Board does not belong to this workspace.")
+    # membership was checked by (a)conditional_get; both handlers run the
+    # queries of report_querysets() and build the body with report()
 
+    def get_report(self, request, workspace_pk, board_pk):
+        board, tasks_by_status, tasks_by_label = self.report_querysets(board_pk)
+        return self.report(board.first(), workspace_pk, list(tasks_by_status), list(tasks_by_label))
 
-        tasks_by_status = (
-            Task.objects.filter(board=board)
-            .values("status")
-            .annotate(count=Count("id"))
+    async def aget_report(self, request, workspace_pk, board_pk):
+        board, tasks_by_status, tasks_by_label = self.report_querysets(board_pk)
+        return self.report(
+            await board.afirst(), workspace_pk,
+            [row async for row in tasks_by_status], [row async for row in tasks_by_label],
         )
 
-        tasks_by_label = (
-            Label.objects.filter(board=board)
-            .annotate(count=Count("tasks"))
-            .values("name", "color", "count")
+    @staticmethod
+    def report_querysets(board_pk: int) -> tuple:
+        """Return the board, status counter and label counter querysets of the report."""
+        return (
+            Board.objects.filter(pk=board_pk).values("title", "workspace_id"),
+            BoardStatusCount.objects.filter(board_id=board_pk, count__gt=0).values("status", "count"),
+            Label.objects.filter(board_id=board_pk).values("name", "color", count=F("task_count")),
         )
 
+    @staticmethod
+    def report(board, workspace_pk: int, tasks_by_status: list, tasks_by_label: list) -> Response:
+        if board is None:
+            raise PermissionDenied("Board not found.")
+        if board["workspace_id"] != workspace_pk:
+            raise PermissionDenied("Board does not belong to this workspace.")
         return Response(
             {
-                "board": board.title,
-                "tasks_by_status": list(tasks_by_status),
-                "tasks_by_label": list(tasks_by_label),
+                "board": board["title"],
+                "tasks_by_status": tasks_by_status,
+                "tasks_by_label": tasks_by_label,
             }
         )
 
-class LabelListCreateView(generics.ListCreateAPIView):
+
+class LabelListCreateView(BoardConditionalGetMixin, generics.ListCreateAPIView):
     """
     API endpoint to list or create labels for a board.
     """
     serializer_class = LabelSerializer
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = {"GET": 7, "POST": 8}
 
     def get_board(self) -> Board:
         board_id = self.kwargs["board_pk"]
@@ -73,29 +104,24 @@ class LabelListCreateView(generics.ListCreateAPIView):
 
     def get_queryset(self):
         board = self.get_board()
-        membership = WorkspaceMember.objects.filter(
-            workspace=board.workspace, user=self.request.user
-        ).first()
-        if not membership:
+        if get_member_role(self.request, board.workspace_id) is None:
             raise PermissionDenied("You are not a member of this workspace.")
-        return Label.objects.filter(board=board)
+        return Label.objects.filter(board=board).with_related()
 
     def perform_create(self, serializer):
         board = self.get_board()
-        membership = WorkspaceMember.objects.filter(
-            workspace=board.workspace, user=self.request.user
-        ).first()
-        if not membership or membership.role not in ["OWNER", "ADMIN"]:
+        if get_member_role(self.request, board.workspace_id) not in ADMIN_ROLES:
             raise PermissionDenied("Only Owner/Admin can create labels.")
         serializer.save(board=board)
 
 
-class LabelDetailView(generics.RetrieveUpdateDestroyAPIView):
+class LabelDetailView(BoardConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     API endpoint to retrieve, update, or delete a label.
     """
     serializer_class = LabelSerializer
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = {"GET": 7, "PUT": 8, "PATCH": 8, "DELETE": 11}
 
     def get_queryset(self):
         board_id = self.kwargs["board_pk"]
@@ -103,22 +129,36 @@ class LabelDetailView(generics.RetrieveUpdateDestroyAPIView):
         if not board:
             raise PermissionDenied("Board not found.")
 
-        membership = WorkspaceMember.objects.filter(
-            workspace=board.workspace, user=self.request.user
-        ).first()
-        if not membership:
+        if get_member_role(self.request, board.workspace_id) is None:
             raise PermissionDenied("You are not a member of this workspace.")
 
-        return Label.objects.filter(board=board)
+        return Label.objects.filter(board=board).with_related()
 
 
-class TaskListCreateView(generics.ListCreateAPIView):
+class TaskListCreateView(AsyncReadMixin, BoardConditionalGetMixin, FastListMixin, generics.ListCreateAPIView):
     """
     API endpoint to list all tasks in a board or create a new task.
+    With ?status= it lists that column in display order.
     Only workspace members can view or create tasks.
+    GET runs as an async view under ASGI (see Trello.async_views) and
+    skips the serializer with FAST_READ_PATH (see Trello.fast_read).
     """
     serializer_class = TaskSerializer
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = {"GET": 7, "POST": 25}
+
+    @property
+    def keyset_ordering(self):
+        # a column is paged in position order, straight from its index
+        if self.request.query_params.get("status"):
+            return ("position", "id")
+        return None
+
+    def filter_column(self, queryset):
+        status = self.request.query_params.get("status")
+        if status:
+            queryset = queryset.filter(status=status)
+        return queryset
 
     def get_board(self) -> Board:
         board_id = self.kwargs["board_pk"]
@@ -129,34 +169,48 @@ class TaskListCreateView(generics.ListCreateAPIView):
 
     def get_queryset(self):
         board = self.get_board()
-        membership = WorkspaceMember.objects.filter(
-            workspace=board.workspace, user=self.request.user
-        ).first()
-
-        if not membership:
+        if get_member_role(self.request, board.workspace_id) is None:
             raise PermissionDenied("You are not a member of this workspace.")
 
-        return Task.objects.filter(board=board)
+        return self.filter_column(Task.objects.filter(board=board)).with_related()
 
     def perform_create(self, serializer):
         board = self.get_board()
-        membership = WorkspaceMember.objects.filter(
-            workspace=board.workspace, user=self.request.user
-        ).first()
-
-        if not membership:
+        if get_member_role(self.request, board.workspace_id) is None:
             raise PermissionDenied("You are not allowed to add tasks here.")
 
         serializer.save(board=board)
 
+    def fast_values(self, queryset):
+        return task_values(queryset)
+
+    def fast_rows(self, rows):
+        return task_rows(rows)
 
-class TaskDetailView(generics.RetrieveUpdateDestroyAPIView):
+    async def afast_rows(self, rows):
+        return await atask_rows(rows)
+
+    async def aget(self, request, workspace_pk, board_pk):
+        return await self.aconditional_get(self.alist, request, workspace_pk, board_pk)
+
+    async def alist(self, request, workspace_pk, board_pk):
+        # membership was checked by aconditional_get
+        queryset = self.filter_column(Task.objects.filter(board_id=board_pk)).with_related()
+        if self.use_fast_path(request):
+            return await self.afast_list(queryset)
+        page = await self.paginator.apaginate_queryset(queryset, request, view=self)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+
+class TaskDetailView(BoardConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     API endpoint to retrieve, update, or delete a specific task.
     Only members of the workspace can access it.
     """
     serializer_class = TaskSerializer
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = {"GET": 8, "PUT": 18, "PATCH": 18, "DELETE": 14}
 
     def get_queryset(self):
         board_id = self.kwargs["board_pk"]
@@ -164,11 +218,361 @@ class TaskDetailView(generics.RetrieveUpdateDestroyAPIView):
         if not board:
             raise PermissionDenied("Board not found.")
 
-        membership = WorkspaceMember.objects.filter(
-            workspace=board.workspace, user=self.request.user
-        ).first()
+        if get_member_role(self.request, board.workspace_id) is None:
+            raise PermissionDenied("You are not a member of this workspace.")
+
+        return Task.objects.filter(board=board).with_related()
+
+
+class MyTaskListView(FastListMixin, generics.ListAPIView):
+    """
+    API endpoint to list the tasks assigned to the logged-in user across
+    all the workspaces they belong to.
+    Filter with ?status= (repeatable or comma-separated) and the
+    inclusive ?due_after= / ?due_before= dates (YYYY-MM-DD).
+    Skips the serializer with FAST_READ_PATH (see Trello.fast_read).
+    """
+    serializer_class = TaskSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    query_budget = 5
+
+    def get_queryset(self):
+        user = self.request.user
+        queryset = Task.objects.filter(assignee=user).visible_to(user)
+
+        statuses = [
+            status
+            for value in self.request.query_params.getlist("status")
+            for status in value.split(",")
+            if status
+        ]
+        if statuses:
+            valid = {status for status, _ in Task.STATUS_CHOICES}
+            invalid = [status for status in statuses if status not in valid]
+            if invalid:
+                raise ValidationError({"status": [f'"{status}" is not a valid choice.' for status in invalid]})
+            queryset = queryset.filter(status__in=statuses)
+
+        for param, lookup in (("due_after", "due_date__gte"), ("due_before", "due_date__lte")):
+            value = self.request.query_params.get(param)
+            if value:
+                queryset = queryset.filter(**{lookup: self.parse_date(param, value)})
+
+        return queryset.with_related()
+
+    def fast_values(self, queryset):
+        return task_values(queryset)
+
+    def fast_rows(self, rows):
+        return task_rows(rows)
+
+    @staticmethod
+    def parse_date(param: str, value: str):
+        try:
+            parsed = parse_date(value)
+        except ValueError:
+            parsed = None
+        if parsed is None:
+            raise ValidationError({param: ["Date has wrong format. Use YYYY-MM-DD."]})
+        return parsed
+
+
+class TaskMoveView(APIView):
+    """
+    API endpoint to move a task to a status column, right after another
+    task (or to the top), by writing only the moved task.
+    Only workspace members can move tasks.
+    """
+    permission_classes = [IsAuthenticated]
+    query_budget = {"POST": 20}
+
+    def post(self, request, workspace_pk, board_pk, pk):
+        task = Task.objects.filter(pk=pk, board_id=board_pk).select_related("board").first()
+        if task is None:
+            raise PermissionDenied("Task not found.")
+        if get_member_role(request, task.board.workspace_id) is None:
+            raise PermissionDenied("You are not allowed to change tasks here.")
+
+        serializer = TaskMoveSerializer(data=request.data, context={"request": request, "task": task})
+        serializer.is_valid(raise_exception=True)
+        task = serializer.save()
+        task = Task.objects.with_related().get(pk=task.pk)
+        return Response(TaskSerializer(task, context={"request": request}).data)
+
+
+class ArchivedTaskListView(generics.ListAPIView):
+    """
+    API endpoint to browse the archived tasks of a board.
+    Only workspace members can view archived tasks.
+    """
+    serializer_class = ArchivedTaskSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    query_budget = 7
+
+    def get_queryset(self):
+        board = Board.objects.filter(pk=self.kwargs["board_pk"], workspace_id=self.kwargs["workspace_pk"]).first()
+        if board is None:
+            raise PermissionDenied("Board not found.")
+        if get_member_role(self.request, board.workspace_id) is None:
+            raise PermissionDenied("You are not a member of this workspace.")
+
+        return (
+            ArchivedTask.objects.filter(board=board)
+            .select_related("assignee", "board__workspace")
+            .prefetch_related(Prefetch("labels", queryset=Label.objects.with_related().order_by("id")))
+        )
+
+
+class ArchivedTaskRestoreView(APIView):
+    """
+    API endpoint to move an archived task back onto its board.
+    Only workspace members can restore tasks.
+    """
+    permission_classes = [IsAuthenticated]
+    query_budget = {"POST": 22}
+
+    def post(self, request, workspace_pk, board_pk, pk):
+        board = Board.objects.filter(pk=board_pk, workspace_id=workspace_pk).first()
+        if board is None:
+            raise PermissionDenied("Board not found.")
+        if get_member_role(request, board.workspace_id) is None:
+            raise PermissionDenied("You are not allowed to change tasks here.")
+
+        if not restore_tasks(board.pk, [pk]):
+            raise PermissionDenied("Task not found.")
+        task = Task.objects.with_related().get(pk=pk)
+        return Response(TaskSerializer(task, context={"request": request}).data)
+
+
+class TaskBulkView(APIView):
+    """
+    API endpoint to create, update and delete many tasks of a board
+    in one request.
+    Only workspace members can use it.
+    """
+    permission_classes = [IsAuthenticated]
+    query_budget = {"POST": 40}
+
+    def get_board(self) -> Board:
+        try:
+            board = Board.objects.get(pk=self.kwargs["board_pk"])
+        except Board.DoesNotExist:
+            raise PermissionDenied("Board not found.")
+
+        if get_member_role(self.request, board.workspace_id) is None:
+            raise PermissionDenied("You are not allowed to change tasks here.")
+        return board
+
+    def post(self, request, workspace_pk, board_pk):
+        board = self.get_board()
+        serializer = TaskBulkSerializer(data=request.data, context={"request": request, "board": board})
+        serializer.is_valid(raise_exception=True)
+        return Response(serializer.save())
+
+
+class TaskBulkMoveView(APIView):
+    """
+    API endpoint to move many tasks of a workspace to another board,
+    status and/or assignee in one transaction.
+    Only workspace members can use it.
+    """
+    permission_classes = [IsAuthenticated]
+    query_budget = {"POST": 30}
 
-        if not membership:
+    def post(self, request, workspace_pk):
+        if get_member_role(request, workspace_pk) is None:
             raise PermissionDenied("You are not a member of this workspace.")
 
-        return Task.objects.filter(board=board)
+        serializer = TaskBulkMoveSerializer(
+            data=request.data, context={"request": request, "workspace_id": workspace_pk}
+        )
+        serializer.is_valid(raise_exception=True)
+        return Response(serializer.save())
+
+
+class BoardSnapshotView(BoardConditionalGetMixin, APIView):
+    """
+    API endpoint returning everything needed to open a board in one
+    response: the board, its labels, its tasks grouped by status in
+    column order and the users they are assigned to.
+    Built from plain ``values()`` rows with a fixed number of queries.
+    """
+    permission_classes = [IsAuthenticated]
+    query_budget = 10
+
+    def get(self, request, workspace_pk, board_pk):
+        return self.conditional_get(self.get_snapshot, request, workspace_pk, board_pk)
+
+    def get_snapshot(self, request, workspace_pk, board_pk):
+        board = (
+            Board.objects.filter(pk=board_pk, workspace_id=workspace_pk)
+            .values("id", "title", "created_at", "version", "workspace_id", "workspace__name")
+            .first()
+        )
+        if board is None:
+            raise PermissionDenied("Board does not belong to this workspace.")
+
+        labels = list(Label.objects.filter(board_id=board_pk).order_by("id").values("id", "name", "color"))
+
+        label_ids: dict[int, list[int]] = {}
+        for task_id, label_id in Task.labels.through.objects.filter(
+            task__board_id=board_pk
+        ).order_by("label_id").values_list("task_id", "label_id"):
+            label_ids.setdefault(task_id, []).append(label_id)
+
+        tasks_by_status: dict[str, list[dict]] = {status: [] for status, _ in Task.STATUS_CHOICES}
+        assignee_ids = set()
+        for task in Task.objects.filter(board_id=board_pk).order_by("status", "position", "id").values(
+            "id", "title", "description", "start_date", "due_date", "status", "assignee_id", "position", "created_at"
+        ):
+            task["label_ids"] = label_ids.get(task["id"], [])
+            tasks_by_status.setdefault(task.pop("status"), []).append(task)
+            if task["assignee_id"] is not None:
+                assignee_ids.add(task["assignee_id"])
+
+        assignees = list(
+            User.objects.filter(pk__in=assignee_ids).order_by("id").values("id", "username")
+        )
+
+        return Response(
+            {
+                "board": {
+                    "id": board["id"],
+                    "title": board["title"],
+                    "created_at": board["created_at"],
+                    "version": board["version"],
+                    "workspace": {"id": board["workspace_id"], "name": board["workspace__name"]},
+                },
+                "labels": labels,
+                "tasks": tasks_by_status,
+                "assignees": assignees,
+            }
+        )
+
+
+class BoardChangesView(BoardConditionalGetMixin, APIView):
+    """
+    API endpoint for delta sync: the tasks and labels of a board changed
+    after ?since=<seq>, and the ids of those deleted since then.
+    Clients pass the returned "seq" as "since" on their next call;
+    without "since" every task and label is returned.
+    """
+    permission_classes = [IsAuthenticated]
+    query_budget = 10
+
+    def get(self, request, workspace_pk, board_pk):
+        return self.conditional_get(self.get_changes, request, workspace_pk, board_pk)
+
+    def get_changes(self, request, workspace_pk, board_pk):
+        if not Board.objects.filter(pk=board_pk, workspace_id=workspace_pk).exists():
+            raise PermissionDenied("Board does not belong to this workspace.")
+        try:
+            since = int(request.query_params.get("since", 0))
+        except ValueError:
+            raise ValidationError({"since": ["A valid integer is required."]})
+
+        changes = changes_since(board_pk, since)
+        context = {"request": request}
+        return Response(
+            {
+                "seq": changes["seq"],
+                "tasks": TaskSerializer(changes["tasks"], many=True, context=context).data,
+                "labels": LabelSerializer(changes["labels"], many=True, context=context).data,
+                "deleted": changes["deleted"],
+            }
+        )
+
+
+class WorkspaceDashboardView(APIView):
+    """
+    API endpoint returning every board of a workspace with its task
+    counts by status, overdue open tasks and last activity time.
+    Built from the board status counters and one grouped query, so the
+    number of queries does not grow with the number of boards.
+    Only workspace members can view it.
+    """
+    permission_classes = [IsAuthenticated]
+    query_budget = 8
+
+    def get(self, request, workspace_pk):
+        if get_member_role(request, workspace_pk) is None:
+            raise PermissionDenied("You are not a member of this workspace.")
+
+        workspace = Workspace.objects.filter(pk=workspace_pk).values("id", "name").first()
+        if workspace is None:
+            raise PermissionDenied("Workspace not found.")
+
+        statuses = [status for status, _ in Task.STATUS_CHOICES]
+        boards = {
+            board["id"]: {
+                "id": board["id"],
+                "title": board["title"],
+                "created_at": board["created_at"],
+                "last_activity": board["updated_at"],
+                "tasks_by_status": dict.fromkeys(statuses, 0),
+                "total": 0,
+                "overdue": 0,
+            }
+            for board in Board.objects.filter(workspace_id=workspace_pk)
+            .order_by("created_at", "id")
+            .values("id", "title", "created_at", "updated_at")
+        }
+
+        # filter by the boards read above: a board created since then
+        # would not be in the dict
+        for board_id, status, count in BoardStatusCount.objects.filter(
+            board_id__in=list(boards), count__gt=0
+        ).values_list("board_id", "status", "count"):
+            boards[board_id]["tasks_by_status"][status] = count
+            boards[board_id]["total"] += count
+
+        for board_id, count in (
+            Task.objects.open()
+            .filter(board_id__in=list(boards), due_date__lt=timezone.localdate())
+            .order_by()
+            .values("board_id")
+            .annotate(count=Count("id"))
+            .values_list("board_id", "count")
+        ):
+            boards[board_id]["overdue"] = count
+
+        return Response({"workspace": workspace, "boards": list(boards.values())})
+
+
+class TaskSearchView(APIView):
+    """
+    API endpoint to full-text search the tasks of a workspace.
+    Results are ranked by relevance and paginated with ?page=.
+    Only workspace members can search.
+    """
+    permission_classes = [IsAuthenticated]
+    query_budget = 7
+
+    def get(self, request, workspace_pk):
+        if get_member_role(request, workspace_pk) is None:
+            raise PermissionDenied("You are not a member of this workspace.")
+
+        text = request.query_params.get("q", "")
+        page_size = KeysetPagination().get_page_size(request)
+        try:
+            page = max(int(request.query_params.get("page", 1)), 1)
+        except ValueError:
+            page = 1
+
+        task_ids = get_search_backend().search(
+            workspace_pk, text, limit=page_size + 1, offset=(page - 1) * page_size
+        )
+        has_next = len(task_ids) > page_size
+        task_ids = task_ids[:page_size]
+        tasks = Task.objects.filter(pk__in=task_ids).with_related().in_bulk()
+
+        url = request.build_absolute_uri()
+        return Response(
+            {
+                "next": replace_query_param(url, "page", page + 1) if has_next else None,
+                "previous": replace_query_param(url, "page", page - 1) if page > 1 else None,
+                "results": TaskSerializer(
+                    [tasks[pk] for pk in task_ids if pk in tasks], many=True, context={"request": request}
+                ).data,
+            }
+        )
@@ -1,3 +1,339 @@
-from django.test import TestCase
+import json
+import logging
+import logging.handlers
+import os
+import threading
+from datetime import timedelta
 
-# Create your tests here.
+import pytest
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from accounts.models import User
+from boards.cache import response_cache
+from boards.models import Board
+from tasks.archive import archive_tasks
+from tasks.models import ArchivedTask, Label, Task
+from tasks.seeding import WORDS, SeedOptions, Seeder
+from tasks.views import MyTaskListView
+from Trello.instrumentation import QueryBudgetExceeded, view_query_budget
+from Trello.log_pipeline import JSONFormatter, QueueLogHandler, RequestIDFilter, SizedTimedRotatingFileHandler
+from Trello.metrics import REGISTRY, Counter, Registry, mark_process_dead, write_samples
+from workspaces.membership import role_cache
+
+# Not API endpoints, or (board-events) a stream that never finishes.
+UNBUDGETED = {"schema", "swagger-ui", "redoc-ui", "board-events"}
+# cascade deletes, whose queries grow with the rows they remove
+UNBUDGETED_METHODS = {("board-detail", "DELETE"), ("workspace-detail", "DELETE")}
+
+
+def _named_patterns(resolver=None):
+    """Yield the name and view of every named, non-admin URL pattern."""
+    for pattern in (resolver or get_resolver()).url_patterns:
+        if isinstance(pattern, URLResolver):
+            if pattern.app_name != "admin":
+                yield from _named_patterns(pattern)
+        elif isinstance(pattern, URLPattern) and pattern.name and pattern.name not in UNBUDGETED:
+            yield pattern.name, pattern.callback
+
+
+def _seed():
+    """A small installation: a few boards, hundreds of labelled tasks, archived tasks."""
+    Seeder(SeedOptions(users=12, workspaces=2, boards=4, tasks=400, labels=4, members=6, batch_size=200)).run()
+    board = Board.objects.order_by("id").select_related("workspace").first()
+    done = Task.objects.filter(board=board, status="DONE").order_by("id").values_list("id", flat=True)[:20]
+    Task.objects.filter(pk__in=list(done)).update(updated_at=timezone.now() - timedelta(days=365))
+    archive_tasks(timezone.now() - timedelta(days=30), board_ids=[board.pk])
+    return board
+
+
+def _requests(board):
+    """Return (url name, method, path, data) for every endpoint, writes after reads."""
+    workspace = board.workspace
+    owner = workspace.owner
+    board_kwargs = {"workspace_pk": workspace.pk, "board_pk": board.pk}
+    tasks = list(Task.objects.filter(board=board, status="TODO").order_by("position")[:6])
+    label = Label.objects.filter(board=board).order_by("id").first()
+    other_board = Board.objects.filter(workspace=workspace).exclude(pk=board.pk).order_by("id").first()
+    archived = ArchivedTask.objects.filter(board=board).order_by("id").first()
+    outsider = User.objects.exclude(memberships__workspace=workspace).order_by("id").first()
+    task_url = reverse("task-detail", kwargs={**board_kwargs, "pk": tasks[0].pk})
+    label_url = reverse("label-detail", kwargs={**board_kwargs, "pk": label.pk})
+    board_url = reverse("board-detail", kwargs={"workspace_pk": workspace.pk, "pk": board.pk})
+    return [
+        ("workspace-list-create", "get", reverse("workspace-list-create"), None),
+        ("workspace-list-create", "get", reverse("workspace-list-create") + "?with_counts=true", None),
+        ("workspace-detail", "get", reverse("workspace-detail", kwargs={"pk": workspace.pk}), None),
+        ("workspace-boards", "get", reverse("workspace-boards", kwargs={"workspace_pk": workspace.pk}), None),
+        ("workspace-search", "get",
+         reverse("workspace-search", kwargs={"workspace_pk": workspace.pk}) + f"?q={WORDS[0]}", None),
+        ("workspace-dashboard", "get", reverse("workspace-dashboard", kwargs={"workspace_pk": workspace.pk}), None),
+        ("board-cache-stats", "get", reverse("board-cache-stats"), None),
+        ("board-list-create", "get", reverse("board-list-create", kwargs={"workspace_pk": workspace.pk}), None),
+        ("board-detail", "get", board_url, None),
+        ("task-list-create", "get", reverse("task-list-create", kwargs=board_kwargs), None),
+        ("task-list-create", "get", reverse("task-list-create", kwargs=board_kwargs) + "?status=TODO", None),
+        ("task-detail", "get", task_url, None),
+        ("label-list-create", "get", reverse("label-list-create", kwargs=board_kwargs), None),
+        ("label-detail", "get", label_url, None),
+        ("board-report", "get", reverse("board-report", kwargs=board_kwargs), None),
+        ("board-snapshot", "get", reverse("board-snapshot", kwargs=board_kwargs), None),
+        ("board-changes", "get", reverse("board-changes", kwargs=board_kwargs) + f"?since={board.version - 5}", None),
+        ("board-archive", "get", reverse("board-archive", kwargs=board_kwargs), None),
+        ("my-tasks", "get", reverse("my-tasks"), None),
+        ("metrics", "get", reverse("metrics"), None),
+        ("register", "post", reverse("register"),
+         {"username": "newcomer", "email": "newcomer@example.com", "password": "pass1234"}),
+        ("login", "post", reverse("login"), {"username": "newcomer", "password": "pass1234"}),
+        ("refresh", "post", reverse("refresh"), {"refresh": str(RefreshToken.for_user(owner))}),
+        ("workspace-list-create", "post", reverse("workspace-list-create"), {"name": "Side project"}),
+        ("workspace-detail", "patch", reverse("workspace-detail", kwargs={"pk": workspace.pk}), {"name": "Renamed"}),
+        ("workspace-invite", "post", reverse("workspace-invite", kwargs={"pk": workspace.pk}),
+         {"email": outsider.email, "role": "MEMBER"}),
+        ("workspace-boards", "post", reverse("workspace-boards", kwargs={"workspace_pk": workspace.pk}),
+         {"title": "Roadmap"}),
+        ("board-detail", "patch", board_url, {"title": "Sprint"}),
+        ("task-list-create", "post", reverse("task-list-create", kwargs=board_kwargs),
+         {"title": "Write release notes", "label_ids": [label.pk]}),
+        ("task-detail", "patch", task_url, {"status": "DOING"}),
+        ("task-move", "post", reverse("task-move", kwargs={**board_kwargs, "pk": tasks[1].pk}),
+         {"after": tasks[3].pk}),
+        ("task-bulk", "post", reverse("task-bulk", kwargs=board_kwargs), {
+            "create": [{"title": f"Bulk {i}", "label_ids": [label.pk]} for i in range(5)],
+            "update": [{"id": task.pk, "status": "DONE"} for task in tasks[2:4]],
+            "delete": [tasks[4].pk],
+        }),
+        ("workspace-task-move", "post", reverse("workspace-task-move", kwargs={"workspace_pk": workspace.pk}),
+         {"tasks": [tasks[5].pk], "board": other_board.pk, "status": "DOING"}),
+        ("archived-task-restore", "post",
+         reverse("archived-task-restore", kwargs={**board_kwargs, "pk": archived.pk}), None),
+        ("label-list-create", "post", reverse("label-list-create", kwargs=board_kwargs), {"name": "Urgent"}),
+        ("label-detail", "patch", label_url, {"color": "#000000"}),
+        ("label-detail", "delete", label_url, None),
+        ("task-detail", "delete", task_url, None),
+        ("board-detail", "delete", board_url, None),
+        ("workspace-detail", "delete", reverse("workspace-detail", kwargs={"pk": workspace.pk}), None),
+    ]
+
+
+@pytest.mark.django_db
+def test_every_endpoint_within_its_query_budget():
+    board = _seed()
+    owner = board.workspace.owner
+    owner.is_staff = True  # for the cache stats
+    owner.save(update_fields=["is_staff"])
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(owner)}")
+
+    requests = _requests(board)
+    views = dict(_named_patterns())
+    assert views.keys() == {name for name, *_ in requests}
+
+    for name, method, path, data in requests:
+        budget = view_query_budget(views[name], method.upper())
+        assert (budget is None) == ((name, method.upper()) in UNBUDGETED_METHODS), f"{method.upper()} {name}"
+        # worst case: nothing cached; the middleware raises QueryBudgetExceeded when over budget
+        role_cache.clear()
+        response_cache().clear()
+        response = getattr(client, method)(path, data, format="json")
+        assert response.status_code < 400, (name, method, response.status_code, getattr(response, "data", None))
+
+
+@pytest.mark.django_db
+def test_query_budget_raises_in_debug_and_logs_in_production(settings, monkeypatch, app_log):
+    monkeypatch.setattr(MyTaskListView, "query_budget", 0)
+    client = APIClient()
+    client.force_authenticate(User.objects.create_user(username="budget", email="b@example.com", password="pass1234"))
+    with pytest.raises(QueryBudgetExceeded, match=r"GET my-tasks ran \d+ queries, over its budget of 0:\n1\. SELECT"):
+        client.get(reverse("my-tasks"))
+
+    settings.QUERY_BUDGET_RAISE = False
+    assert client.get(reverse("my-tasks")).status_code == 200
+    record = app_log.records[-1]
+    assert record.levelno == logging.ERROR
+    assert record.request_metrics["view"] == "my-tasks"
+    assert record.request_metrics["budget"] == 0
+
+
+def test_queue_logging_counts_dropped_records():
+    entered, release = threading.Event(), threading.Event()
+
+    class SlowDisk(logging.handlers.BufferingHandler):
+        def emit(self, record):
+            entered.set()
+            release.wait(5)
+            super().emit(record)
+
+    disk = SlowDisk(capacity=100)
+    sink = logging.getLogger("test_log_sink")
+    sink.propagate = False
+    sink.addHandler(disk)
+    handler = QueueLogHandler(sink="test_log_sink", queue_size=2)
+    logger = logging.getLogger("test_log_pipeline")
+    logger.propagate = False
+    logger.addHandler(handler)
+    try:
+        logger.warning("record %d", 1)
+        assert entered.wait(5)
+        # the listener is stuck on record 1: two fit in the queue, the rest are dropped
+        for number in range(2, 6):
+            logger.warning("record %d", number)
+        assert handler.dropped == 2
+        release.set()
+        handler.queue.join()
+        logger.warning("record %d", 6)
+    finally:
+        handler.close()
+        logger.removeHandler(handler)
+        sink.removeHandler(disk)
+    assert [record.getMessage() for record in disk.buffer] == [
+        "record 1", "record 2", "record 3", "record 6", "Log queue full: dropped 2 record(s) (2 in total)",
+    ]
+
+
+@pytest.mark.django_db
+def test_request_id_on_response_and_log_records(settings, app_log):
+    settings.REQUEST_METRICS_SAMPLE_RATE = 1.0
+    client = APIClient()
+    client.force_authenticate(User.objects.create_user(username="ids", email="ids@example.com", password="pass1234"))
+    app_log.handler.addFilter(RequestIDFilter())
+    response = client.get(reverse("my-tasks"), HTTP_X_REQUEST_ID="lb-1234.5")
+    generated = client.get(reverse("my-tasks"), HTTP_X_REQUEST_ID="<script>")
+
+    assert response["X-Request-ID"] == "lb-1234.5"
+    assert len(generated["X-Request-ID"]) == 32 and generated["X-Request-ID"] != "<script>"
+    assert [record.request_id for record in app_log.records] == ["lb-1234.5", generated["X-Request-ID"]]
+    entry = json.loads(JSONFormatter().format(app_log.records[0]))
+    assert entry["request_id"] == "lb-1234.5"
+    assert entry["level"] == "INFO" and entry["logger"] == "trello_app"
+    assert entry["request_metrics"]["view"] == "my-tasks"
+
+
+def test_log_file_rotates_by_size(tmp_path):
+    handler = SizedTimedRotatingFileHandler(tmp_path / "app.log", max_bytes=200, when="midnight", backupCount=2)
+    handler.setFormatter(JSONFormatter())
+    logger = logging.getLogger("test_log_rotation")
+    logger.propagate = False
+    logger.addHandler(handler)
+    try:
+        for number in range(20):
+            logger.warning("record %d", number)
+    finally:
+        logger.removeHandler(handler)
+        handler.close()
+
+    files = sorted(tmp_path.iterdir())
+    assert len(files) == 3  # app.log and two backups
+    assert all(path.stat().st_size <= 200 for path in files)
+    last = [json.loads(line)["message"] for line in (tmp_path / "app.log").read_text().splitlines()]
+    assert last[-1] == "record 19"
+
+
+def test_log_file_per_process(tmp_path):
+    handler = SizedTimedRotatingFileHandler(tmp_path / "app.{pid}.log", when="midnight")
+    handler.setFormatter(JSONFormatter())
+    logger = logging.getLogger("test_log_per_process")
+    logger.propagate = False
+    logger.addHandler(handler)
+    try:
+        logger.warning("parent")
+        pid = os.fork()
+        if pid == 0:
+            try:
+                logger.warning("child")
+            finally:
+                os._exit(0)
+        os.waitpid(pid, 0)
+        logger.warning("parent again")
+    finally:
+        logger.removeHandler(handler)
+        handler.close()
+
+    def messages(process_id):
+        path = tmp_path / f"app.{process_id}.log"
+        return [json.loads(line)["message"] for line in path.read_text().splitlines()]
+
+    assert messages(os.getpid()) == ["parent", "parent again"]
+    assert messages(pid) == ["child"]
+
+
+def _scrape(client, **headers) -> dict[str, float]:
+    response = client.get(reverse("metrics"), **headers)
+    assert response.status_code == 200
+    assert response["Content-Type"].startswith("text/plain; version=0.0.4")
+    samples = {}
+    for line in response.content.decode().splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+    return samples
+
+
+@pytest.mark.django_db
+def test_metrics_endpoint(settings):
+    REGISTRY.reset()
+    board = _seed()
+    client = APIClient()
+    client.force_authenticate(board.workspace.owner)
+    url = reverse("task-list-create", kwargs={"workspace_pk": board.workspace_id, "board_pk": board.pk})
+    assert client.get(url).status_code == 200
+    assert client.get(url).status_code == 200  # from the response cache
+
+    samples = _scrape(client)
+    view = 'view="task-list-create"'
+    assert samples[f'trello_http_requests_total{{{view},method="GET",status="200"}}'] == 2
+    assert samples[f'trello_http_request_duration_seconds_count{{{view}}}'] == 2
+    assert samples[f'trello_http_request_duration_seconds_bucket{{{view},le="+Inf"}}'] == 2
+    assert samples[f'trello_db_queries_total{{{view}}}'] > 0
+    assert samples[f'trello_board_cache_requests_total{{{view},result="hit"}}'] == 1
+    assert samples[f'trello_board_cache_hit_ratio{{{view}}}'] == 0.5
+    assert samples["trello_http_requests_in_flight"] == 1  # the scrape itself
+    assert samples['trello_db_connections_opened_total{alias="default"}'] >= 1
+    assert "trello_log_records_dropped_total" in samples
+
+    # behind a proxy or NAT every client has a private address
+    assert client.get(reverse("metrics"), REMOTE_ADDR="10.0.0.5").status_code == 403
+    settings.METRICS_TOKEN = "s3cret"
+    assert client.get(reverse("metrics")).status_code == 403
+    assert _scrape(client, HTTP_AUTHORIZATION="Bearer s3cret")["trello_http_requests_in_flight"] == 1
+
+
+def test_metrics_of_finished_threads_are_folded():
+    registry = Registry()
+    counter = Counter("test_thread_requests_total", "Requests.", registry=registry)
+    for _ in range(5):
+        thread = threading.Thread(target=counter.inc)
+        thread.start()
+        thread.join()
+    counter.inc()
+    assert len(registry._shards) == 1  # only this thread's
+    assert registry.local_samples()[("test_thread_requests_total", ())] == 6
+
+
+@pytest.mark.django_db
+def test_metrics_add_up_worker_files(settings, tmp_path):
+    REGISTRY.reset()
+    settings.METRICS_MULTIPROC_DIR = str(tmp_path)
+    other_worker = {
+        ("trello_http_requests_total", ("metrics", "GET", "200")): 4,
+        ("trello_http_request_duration_seconds", ("metrics",)): [1, 3, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0.02],
+        ("trello_http_requests_in_flight", ()): 2,
+    }
+    write_samples(str(tmp_path / "metrics_999999.json"), other_worker)
+    client = APIClient()
+
+    _scrape(client)
+    samples = _scrape(client)
+    # this worker's first scrape is counted once it has finished
+    assert samples['trello_http_requests_total{view="metrics",method="GET",status="200"}'] == 5
+    assert samples['trello_http_request_duration_seconds_bucket{view="metrics",le="0.005"}'] >= 1
+    assert samples['trello_http_request_duration_seconds_count{view="metrics"}'] == 5
+    assert samples["trello_http_requests_in_flight"] == 3
+
+    mark_process_dead(999999, str(tmp_path))
+    samples = _scrape(client)
+    assert samples['trello_http_requests_total{view="metrics",method="GET",status="200"}'] == 6
+    assert samples["trello_http_requests_in_flight"] == 1
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["archive.json", f"metrics_{os.getpid()}.json"]
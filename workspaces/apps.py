@@ -1,6 +1,14 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
 
 
 class WorkspacesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'workspaces'
+
+    def ready(self):
+        from .membership import invalidate_membership
+        from .models import WorkspaceMember
+
+        post_save.connect(invalidate_membership, sender=WorkspaceMember)
+        post_delete.connect(invalidate_membership, sender=WorkspaceMember)
@@ -0,0 +1,149 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from django.conf import settings
+
+from Trello.instrumentation import span
+from .models import WorkspaceMember
+
+ADMIN_ROLES: tuple[str, ...] = ("OWNER", "ADMIN")
+
+_MISSING = object()
+
+
+class RoleCache:
+    """
+    Bounded LRU cache of ``(user_id, workspace_id) -> role`` with a TTL.
+
+    Entries for non-members are cached as ``None`` so repeated denied
+    requests do not hit the database either. The cache is per process:
+    writes in this process invalidate it through signals, and the TTL
+    bounds how long other worker processes can serve a stale role.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl: float = 30.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int, workspace_id: int):
+        """Return the cached role, ``None`` for a non-member, or ``_MISSING``."""
+        key = (user_id, workspace_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return _MISSING
+            role, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return _MISSING
+            self._entries.move_to_end(key)
+            return role
+
+    def set(self, user_id: int, workspace_id: int, role: Optional[str]) -> None:
+        if self.max_size <= 0 or self.ttl <= 0:
+            return
+        key = (user_id, workspace_id)
+        with self._lock:
+            self._entries[key] = (role, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int, workspace_id: int) -> None:
+        with self._lock:
+            self._entries.pop((user_id, workspace_id), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+role_cache = RoleCache(
+    max_size=getattr(settings, "WORKSPACE_ROLE_CACHE_SIZE", 10000),
+    ttl=getattr(settings, "WORKSPACE_ROLE_CACHE_TTL", 30.0),
+)
+
+
+def _request_roles(request) -> dict:
+    """
+    Return the per-request role memo.
+
+    It is stored on the underlying ``HttpRequest`` so that the DRF
+    ``Request`` wrapper, permission classes and views all share it.
+    """
+    http_request = getattr(request, "_request", request)
+    roles = getattr(http_request, "_workspace_roles", None)
+    if roles is None:
+        roles = {}
+        http_request._workspace_roles = roles
+    return roles
+
+
+def get_member_role(request, workspace_id: int) -> Optional[str]:
+    """
+    Return the role of ``request.user`` in the workspace, or ``None``
+    if the user is not a member.
+
+    Lookups are memoized for the whole request and cached across
+    requests in ``role_cache``.
+    """
+    user = request.user
+    if not user or not user.is_authenticated:
+        return None
+
+    roles = _request_roles(request)
+    if workspace_id in roles:
+        return roles[workspace_id]
+
+    role = role_cache.get(user.pk, workspace_id)
+    if role is _MISSING:
+        with span("membership"):
+            role = (
+                WorkspaceMember.objects.filter(workspace_id=workspace_id, user_id=user.pk)
+                .values_list("role", flat=True)
+                .first()
+            )
+        role_cache.set(user.pk, workspace_id, role)
+
+    roles[workspace_id] = role
+    return role
+
+
+async def aget_member_role(request, workspace_id: int) -> Optional[str]:
+    """
+    Async version of :func:`get_member_role` for async views, sharing
+    the same request memo and ``role_cache``.
+    """
+    user = request.user
+    if not user or not user.is_authenticated:
+        return None
+
+    roles = _request_roles(request)
+    if workspace_id in roles:
+        return roles[workspace_id]
+
+    role = role_cache.get(user.pk, workspace_id)
+    if role is _MISSING:
+        with span("membership"):
+            role = await (
+                WorkspaceMember.objects.filter(workspace_id=workspace_id, user_id=user.pk)
+                .values_list("role", flat=True)
+                .afirst()
+            )
+        role_cache.set(user.pk, workspace_id, role)
+
+    roles[workspace_id] = role
+    return role
+
+
+def invalidate_membership(sender, instance: WorkspaceMember, **kwargs) -> None:
+    """
+    Signal receiver dropping cached roles after a membership is
+    created, changed or deleted.
+    """
+    if instance.user_id is not None:
+        role_cache.invalidate(instance.user_id, instance.workspace_id)
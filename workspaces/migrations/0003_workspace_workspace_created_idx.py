@@ -0,0 +1,19 @@
+# Generated by Django 5.0.3 on 2026-10-18 18:21
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workspaces', '0002_alter_workspacemember_user'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='workspace',
+            index=models.Index(fields=['created_at', 'id'], name='workspace_created_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.3 on 2026-10-18 18:27
+
+from django.conf import settings
+from django.db import migrations, models
+
+from Trello.migration_operations import AddIndexConcurrentlyIfPostgres
+
+
+class Migration(migrations.Migration):
+    # indexes are built with CREATE INDEX CONCURRENTLY on PostgreSQL
+    atomic = False
+
+    dependencies = [
+        ('workspaces', '0003_workspace_workspace_created_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrentlyIfPostgres(
+            model_name='workspacemember',
+            index=models.Index(fields=['user', 'workspace'], name='member_user_workspace_idx'),
+        ),
+    ]
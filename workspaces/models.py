@@ -1,8 +1,60 @@
+from django.apps import apps
 from django.db import models
+from django.db.models import Count, Exists, IntegerField, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
 from django.conf import settings
 from typing import Optional
 
 
+def _count_subquery(queryset, workspace_field: str, aggregate) -> Coalesce:
+    """Correlated ``SELECT aggregate ... WHERE <workspace_field> = outer.id``."""
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{workspace_field: OuterRef("pk")})
+            .order_by()
+            .values(workspace_field)
+            .annotate(total=aggregate)
+            .values("total"),
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+
+
+class WorkspaceQuerySet(models.QuerySet):
+    """
+    QuerySet for workspaces.
+    """
+    def visible_to(self, user) -> "WorkspaceQuerySet":
+        """
+        Return the workspaces the user owns or is a member of.
+
+        Membership is an ``EXISTS`` served by ``member_user_workspace_idx``
+        rather than a join, so every workspace appears once and the
+        ordering and pagination over ``workspace_created_idx`` stay stable.
+        """
+        membership = WorkspaceMember.objects.filter(workspace=OuterRef("pk"), user=user)
+        return self.filter(Q(owner=user) | Exists(membership))
+
+    def with_counts(self) -> "WorkspaceQuerySet":
+        """
+        Annotate ``board_count``, ``member_count`` and ``open_task_count``.
+
+        Each is a correlated subquery in the same statement, so the
+        counts never multiply each other's rows. Open tasks are summed
+        from the per-board status counters.
+        """
+        Board = apps.get_model("boards", "Board")
+        BoardStatusCount = apps.get_model("tasks", "BoardStatusCount")
+        return self.annotate(
+            board_count=_count_subquery(Board.objects.all(), "workspace", Count("*")),
+            member_count=_count_subquery(WorkspaceMember.objects.all(), "workspace", Count("*")),
+            open_task_count=_count_subquery(
+                BoardStatusCount.objects.exclude(status="DONE"), "board__workspace", Sum("count")
+            ),
+        )
+
+
 class Workspace(models.Model):
     """
     Represents a collaborative workspace where users can work together.
@@ -22,6 +74,13 @@ class Workspace(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = WorkspaceQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="workspace_created_idx"),
+        ]
+
     def __str__(self) -> str:
         """Return human-readable representation of the workspace."""
         return f"{self.name} (Owner: {self.owner.username})"
@@ -54,6 +113,10 @@ class WorkspaceMember(models.Model):
 
     class Meta:
         unique_together = ("workspace", "user")
+        indexes = [
+            # user-first lookups: workspace listing and role checks
+            models.Index(fields=["user", "workspace"], name="member_user_workspace_idx"),
+        ]
 
     def __str__(self) -> str:
         """Return human-readable representation of the membership."""
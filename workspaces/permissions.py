@@ -1,5 +1,10 @@
 from rest_framework.permissions import BasePermission
-from .models import WorkspaceMember
+from .membership import ADMIN_ROLES, get_member_role
+
+
+def _workspace_id(obj) -> int:
+    """Return the workspace id of a workspace or a workspace-scoped object."""
+    return getattr(obj, "workspace_id", obj.pk)
 
 
 class IsWorkspaceMember(BasePermission):
@@ -7,7 +12,7 @@ class IsWorkspaceMember(BasePermission):
     Allow access only to members of the workspace.
     """
     def has_object_permission(self, request, view, obj):
-        return WorkspaceMember.objects.filter(workspace=obj, user=request.user).exists()
+        return get_member_role(request, _workspace_id(obj)) is not None
 
 
 class IsWorkspaceOwnerOrAdmin(BasePermission):
@@ -15,5 +20,4 @@ class IsWorkspaceOwnerOrAdmin(BasePermission):
     Allow access only to owners or admins of the workspace.
     """
     def has_object_permission(self, request, view, obj):
-        membership = WorkspaceMember.objects.filter(workspace=obj, user=request.user).first()
-        return membership and membership.role in ["OWNER", "ADMIN"]
+        return get_member_role(request, _workspace_id(obj)) in ADMIN_ROLES
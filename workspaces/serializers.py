@@ -1,5 +1,6 @@
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
+from Trello.instrumentation import TimedListSerializer, TimedSerializerMixin
 from .models import Workspace, WorkspaceMember
 
 User = get_user_model()
@@ -33,7 +34,7 @@ class WorkspaceInviteSerializer(serializers.ModelSerializer):
             role=validated_data.get("role", "MEMBER")
         )
 
-class WorkspaceSerializer(serializers.ModelSerializer):
+class WorkspaceSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for Workspace model.
     """
@@ -42,9 +43,23 @@ class WorkspaceSerializer(serializers.ModelSerializer):
     class Meta:
         model = Workspace
         fields = ["id", "name", "description", "owner", "created_at"]
+        list_serializer_class = TimedListSerializer
 
 
-class WorkspaceMemberSerializer(serializers.ModelSerializer):
+class WorkspaceWithCountsSerializer(WorkspaceSerializer):
+    """
+    Serializer for Workspace model with the counts annotated by
+    ``WorkspaceQuerySet.with_counts()``.
+    """
+    board_count = serializers.IntegerField(read_only=True)
+    member_count = serializers.IntegerField(read_only=True)
+    open_task_count = serializers.IntegerField(read_only=True)
+
+    class Meta(WorkspaceSerializer.Meta):
+        fields = WorkspaceSerializer.Meta.fields + ["board_count", "member_count", "open_task_count"]
+
+
+class WorkspaceMemberSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for WorkspaceMember model.
     """
@@ -54,3 +69,4 @@ class WorkspaceMemberSerializer(serializers.ModelSerializer):
     class Meta:
         model = WorkspaceMember
         fields = ["id", "workspace", "user", "role", "joined_at"]
+        list_serializer_class = TimedListSerializer
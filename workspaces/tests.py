@@ -1,8 +1,13 @@
 import pytest
+from asgiref.sync import async_to_sync, iscoroutinefunction
 from django.urls import reverse
-from rest_framework.test import APIClient
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
 from accounts.models import User
-from workspaces.models import Workspace
+from boards.models import Board
+from tasks.models import Task
+from workspaces.models import Workspace, WorkspaceMember
+from workspaces.views import WorkspaceListCreateView
 
 @pytest.mark.django_db
 def test_create_workspace():
@@ -18,3 +23,104 @@ def test_create_workspace():
     assert response.status_code == 201
     assert Workspace.objects.filter(name="Team A").exists()
     assert Workspace.objects.get(name="Team A").owner == user
+
+
+@pytest.mark.django_db
+def test_membership_role_is_cached_across_requests(django_assert_num_queries):
+    user = User.objects.create_user(username="sara", email="s@example.com", password="pass1234")
+    workspace = Workspace.objects.create(name="Team B", owner=user)
+    WorkspaceMember.objects.create(workspace=workspace, user=user, role="OWNER")
+    client = APIClient()
+    client.force_authenticate(user=user)
+    url = reverse("board-list-create", kwargs={"workspace_pk": workspace.id})
+
+    # workspace lookup + membership lookup + boards
+    with django_assert_num_queries(3):
+        assert client.get(url).status_code == 200
+    # membership now served from the cache
+    with django_assert_num_queries(2):
+        assert client.get(url).status_code == 200
+
+
+@pytest.mark.django_db
+def test_membership_cache_invalidated_on_write():
+    owner = User.objects.create_user(username="owner2", email="o2@example.com", password="pass1234")
+    member = User.objects.create_user(username="member2", email="m2@example.com", password="pass1234")
+    workspace = Workspace.objects.create(name="Team C", owner=owner)
+    WorkspaceMember.objects.create(workspace=workspace, user=owner, role="OWNER")
+    client = APIClient()
+    client.force_authenticate(user=member)
+    url = reverse("board-list-create", kwargs={"workspace_pk": workspace.id})
+
+    assert client.get(url).status_code == 403
+
+    membership = WorkspaceMember.objects.create(workspace=workspace, user=member, role="MEMBER")
+    assert client.get(url).status_code == 200
+    assert client.post(url, {"title": "Board"}).status_code == 403
+
+    membership.role = "ADMIN"
+    membership.save()
+    assert client.post(url, {"title": "Board"}).status_code == 201
+
+    membership.delete()
+    assert client.get(url).status_code == 403
+
+
+@pytest.mark.django_db
+def test_workspace_list_async_read_path_authenticates_jwt(settings):
+    user = User.objects.create_user(username="sara", email="sara@example.com", password="pass1234")
+    workspace = Workspace.objects.create(name="Team S", owner=user)
+    WorkspaceMember.objects.create(workspace=workspace, user=user, role="OWNER")
+    Workspace.objects.create(name="Not mine", owner=User.objects.create_user(username="x", password="pass1234"))
+    # as under Trello/asgi.py; the URLconf was built with the sync default
+    settings.ASYNC_READ_VIEWS = True
+    view = WorkspaceListCreateView.as_view()
+    assert iscoroutinefunction(view)
+
+    factory = APIRequestFactory()
+    url = reverse("workspace-list-create")
+    assert async_to_sync(view)(factory.get(url)).status_code == 401
+
+    auth = {"HTTP_AUTHORIZATION": f"Bearer {AccessToken.for_user(user)}"}
+    response = async_to_sync(view)(factory.get(url, **auth))
+    assert response.status_code == 200
+    assert [item["name"] for item in response.data["results"]] == ["Team S"]
+    assert response.data["results"][0]["owner"] == "sara"
+    assert async_to_sync(view)(factory.post(url, {"name": "Team T"}, **auth)).status_code == 201
+
+
+@pytest.mark.django_db
+def test_workspace_list_is_distinct_with_counts(django_assert_num_queries):
+    user = User.objects.create_user(username="nima", email="nima@example.com", password="pass1234")
+    others = [User.objects.create_user(username=f"other{i}", email=f"other{i}@example.com", password="pass1234") for i in range(3)]
+    owned = Workspace.objects.create(name="Owned", owner=user)
+    WorkspaceMember.objects.create(workspace=owned, user=user, role="OWNER")
+    for other in others:
+        WorkspaceMember.objects.create(workspace=owned, user=other, role="MEMBER")
+    boards = [Board.objects.create(title=f"B{i}", workspace=owned) for i in range(2)]
+    Task.objects.create(title="Open", board=boards[0])
+    Task.objects.create(title="Open too", board=boards[1], status="DOING")
+    Task.objects.create(title="Done", board=boards[1], status="DONE")
+    joined = Workspace.objects.create(name="Joined", owner=others[0])
+    WorkspaceMember.objects.create(workspace=joined, user=user, role="MEMBER")
+    Workspace.objects.create(name="Foreign", owner=others[1])
+
+    client = APIClient()
+    client.force_authenticate(user=user)
+    url = reverse("workspace-list-create")
+
+    response = client.get(url)
+    assert [item["name"] for item in response.data["results"]] == ["Owned", "Joined"]
+    assert "board_count" not in response.data["results"][0]
+
+    with django_assert_num_queries(1):
+        response = client.get(url, {"with_counts": "true"})
+    counts = {
+        item["name"]: (item["board_count"], item["member_count"], item["open_task_count"])
+        for item in response.data["results"]
+    }
+    assert counts == {"Owned": (2, 4, 2), "Joined": (0, 1, 0)}
+
+    response = client.get(url, {"page_size": 1})
+    assert [item["name"] for item in response.data["results"]] == ["Owned"]
+    assert [item["name"] for item in client.get(response.data["next"]).data["results"]] == ["Joined"]
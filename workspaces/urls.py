@@ -1,6 +1,7 @@
 from django.urls import path
 from .views import WorkspaceListCreateView, WorkspaceDetailView, WorkspaceInviteView
 from boards.views import BoardListCreateView
+from tasks.views import TaskBulkMoveView, TaskSearchView, WorkspaceDashboardView
 
 
 urlpatterns = [
@@ -8,4 +9,7 @@ urlpatterns = [
     path("<int:pk>/", WorkspaceDetailView.as_view(), name="workspace-detail"),
     path("<int:pk>/invite/", WorkspaceInviteView.as_view(), name="workspace-invite"),
     path('<int:workspace_pk>/boards/', BoardListCreateView.as_view(), name='workspace-boards'),
+    path("<int:workspace_pk>/search/", TaskSearchView.as_view(), name="workspace-search"),
+    path("<int:workspace_pk>/dashboard/", WorkspaceDashboardView.as_view(), name="workspace-dashboard"),
+    path("<int:workspace_pk>/tasks/move/", TaskBulkMoveView.as_view(), name="workspace-task-move"),
 ]
@@ -1,7 +1,14 @@
 from rest_framework import generics, permissions
 from rest_framework.exceptions import PermissionDenied
+from Trello.async_views import AsyncReadMixin
+from .membership import ADMIN_ROLES, get_member_role
 from .models import Workspace, WorkspaceMember
-from .serializers import WorkspaceSerializer, WorkspaceMemberSerializer, WorkspaceInviteSerializer
+from .serializers import (
+    WorkspaceSerializer,
+    WorkspaceMemberSerializer,
+    WorkspaceInviteSerializer,
+    WorkspaceWithCountsSerializer,
+)
 import logging
 
 logger = logging.getLogger("trello_app")
@@ -13,6 +20,7 @@ class WorkspaceInviteView(generics.CreateAPIView):
     """
     serializer_class = WorkspaceInviteSerializer
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = {"POST": 7}
 
     def get_workspace(self) -> Workspace:
         """
@@ -25,11 +33,7 @@ class WorkspaceInviteView(generics.CreateAPIView):
             raise PermissionDenied("Workspace not found.")
 
         # check if current user is owner or admin
-        membership = WorkspaceMember.objects.filter(
-            workspace=workspace, user=self.request.user
-        ).first()
-
-        if not membership or membership.role not in ["OWNER", "ADMIN"]:
+        if get_member_role(self.request, workspace.id) not in ADMIN_ROLES:
             raise PermissionDenied("You do not have permission to invite members.")
 
         return workspace
@@ -41,22 +45,39 @@ class WorkspaceInviteView(generics.CreateAPIView):
         workspace = self.get_workspace()
         serializer.save(workspace=workspace)
 
-class WorkspaceListCreateView(generics.ListCreateAPIView):
+class WorkspaceListCreateView(AsyncReadMixin, generics.ListCreateAPIView):
     """
     API endpoint to list all workspaces of the logged-in user 
     or create a new workspace.
+    Pass ?with_counts=true to include board, member and open-task counts.
+    GET runs as an async view under ASGI (see Trello.async_views).
     """
     serializer_class = WorkspaceSerializer
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = {"GET": 4, "POST": 5}
+
+    def with_counts(self) -> bool:
+        return self.request.query_params.get("with_counts", "").lower() in ("1", "true", "yes")
+
+    def get_serializer_class(self):
+        if self.request.method == "GET" and self.with_counts():
+            return WorkspaceWithCountsSerializer
+        return WorkspaceSerializer
 
     def get_queryset(self):
         """
         Return all workspaces where the user is either the owner 
         or a member.
         """
-        return Workspace.objects.filter(
-            members__user=self.request.user
-        ) | Workspace.objects.filter(owner=self.request.user)
+        queryset = Workspace.objects.visible_to(self.request.user).select_related("owner")
+        if self.with_counts():
+            queryset = queryset.with_counts()
+        return queryset
+
+    async def aget(self, request):
+        page = await self.paginator.apaginate_queryset(self.get_queryset(), request, view=self)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
 
     def perform_create(self, serializer):
         """
@@ -69,7 +90,10 @@ class WorkspaceListCreateView(generics.ListCreateAPIView):
             user=self.request.user,
             role="OWNER"
         )
-        logger.info(f"Workspace '{workspace.name}' created by {self.request.user.username}")
+        logger.info(
+            "Workspace '%s' created by %s", workspace.name, self.request.user.username,
+            extra={"workspace_id": workspace.pk},
+        )
 
 
 class WorkspaceDetailView(generics.RetrieveUpdateDestroyAPIView):
@@ -78,11 +102,11 @@ class WorkspaceDetailView(generics.RetrieveUpdateDestroyAPIView):
     """
     serializer_class = WorkspaceSerializer
     permission_classes = [permissions.IsAuthenticated]
+    # DELETE cascades to every task and label, in queries that grow with them
+    query_budget = {"GET": 4, "PUT": 5, "PATCH": 5}
 
     def get_queryset(self):
         """
         Allow access only if the user is owner or member of the workspace.
         """
-        return Workspace.objects.filter(
-            members__user=self.request.user
-        ) | Workspace.objects.filter(owner=self.request.user)
+        return Workspace.objects.visible_to(self.request.user).select_related("owner")